@@ -169,7 +169,9 @@ const Agent = ({
         // Try a few times before falling back to manual input
         for (let attempt = 0; attempt < 3 && !userInput; attempt++) {
           try {
-            const sttData = await getJson(`${baseUrl}/stt`);
+            const sttData = await getJson(
+              `${baseUrl}/stt?session_id=${encodeURIComponent(sessionId)}`
+            );
             if (sttData?.status === "ok" && sttData?.transcription) {
               userInput = sttData.transcription as string;
               break;
@@ -0,0 +1,154 @@
+"""Incremental per-answer scoring, so final feedback is an aggregation.
+
+Overall feedback used to send every Q&A pair to the LLM in one prompt once
+the interview ended, which made the last call of the session also the
+slowest, and slower the longer the interview ran. AnswerScorer scores each
+pair on a small background pool as soon as it is stored. Each result is a
+structured assessment: technical and communication scores (0-10), the
+topics touched, and a one-line strength and improvement. When the
+interview ends, aggregate() reduces the assessments to averages and a
+handful of notes. Only that fixed-size digest goes into the final
+synthesis prompt.
+
+Assessments live in this process per session id (bounded LRU). The request
+thread copies finished ones onto InterviewSession.answer_scores with sync().
+Background threads never touch the session itself, so pickling it for the
+SQLite store stays safe. Pairs with no assessment (a restart, another
+worker, a failed or still-running job past the wait) are reported as
+unscored, and the caller includes them compactly instead.
+"""
+import json
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+SCORE_FIELDS = ('technical', 'communication')
+NOTE_FIELDS = ('strength', 'improvement')
+MAX_NOTE_CHARS = 160
+_JSON_OBJECT = re.compile(r'\{.*\}', re.DOTALL)
+
+
+def parse_assessment(text):
+    """Assessment dict from the scorer's reply; raises ValueError when it holds no usable JSON object"""
+    match = _JSON_OBJECT.search(text or '')
+    if not match:
+        raise ValueError("no JSON object in scoring reply")
+    raw = json.loads(match.group(0))
+    assessment = {}
+    for field in SCORE_FIELDS:
+        assessment[field] = max(0.0, min(10.0, float(raw[field])))
+    for field in NOTE_FIELDS:
+        assessment[field] = str(raw.get(field) or '').strip()[:MAX_NOTE_CHARS]
+    topics = raw.get('topics') or []
+    assessment['topics'] = [str(topic).strip().lower() for topic in topics if str(topic).strip()][:5]
+    return assessment
+
+
+def aggregate(assessments, max_notes=3):
+    """Averages (scaled to /100), the most frequent topics and notes from the best and weakest answers"""
+    scored = [a for a in assessments if a]
+    if not scored:
+        return None
+    result = {'answers_scored': len(scored)}
+    for field in SCORE_FIELDS:
+        result[field] = round(sum(a[field] for a in scored) / len(scored) * 10)
+    by_score = sorted(scored, key=lambda a: a['technical'] + a['communication'])
+    result['strengths'] = _distinct(a['strength'] for a in reversed(by_score))[:max_notes]
+    result['improvements'] = _distinct(a['improvement'] for a in by_score)[:max_notes]
+    result['topics'] = [topic for topic, _ in Counter(t for a in scored for t in a['topics']).most_common(8)]
+    return result
+
+
+def _distinct(notes):
+    seen = []
+    for note in notes:
+        if note and note not in seen:
+            seen.append(note)
+    return seen
+
+
+class AnswerScorer:
+    def __init__(self, score_fn, max_workers=1, max_sessions=1000):
+        """score_fn(qa) -> assessment dict (see parse_assessment)"""
+        self.score_fn = score_fn
+        self.max_sessions = max_sessions
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scoring')
+        self._sessions = OrderedDict()   # session id -> {pair index: Future}
+        self._lock = threading.Lock()
+        self.scored = 0
+        self.failures = 0
+        self.score_seconds = 0.0
+
+    def submit(self, session_id, index, qa):
+        """Score pair number `index` of the session in the background"""
+        with self._lock:
+            jobs = self._sessions.get(session_id)
+            if jobs is None:
+                jobs = self._sessions[session_id] = {}
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(session_id)
+            if index not in jobs:
+                jobs[index] = self._executor.submit(self._score, session_id, dict(qa))
+
+    def _score(self, session_id, qa):
+        start = time.time()
+        try:
+            assessment = self.score_fn(qa)
+        except Exception as e:
+            print(f"⚠️ Answer scoring failed for session {session_id}: {e}")
+            with self._lock:
+                self.failures += 1
+            return None
+        with self._lock:
+            self.scored += 1
+            self.score_seconds += time.time() - start
+        return assessment
+
+    def sync(self, session):
+        """Copy finished assessments onto session.answer_scores (call from the thread that owns the session)"""
+        with self._lock:
+            jobs = dict(self._sessions.get(session.session_id) or {})
+        if not hasattr(session, 'answer_scores'):
+            session.answer_scores = []  # sessions pickled before scoring existed
+        scores = session.answer_scores
+        scores.extend([None] * (len(session.all_questions_answers) - len(scores)))
+        for index, future in jobs.items():
+            if index < len(scores) and scores[index] is None and future.done():
+                scores[index] = future.result()
+        return scores
+
+    def collect(self, session_id, qa_pairs, known=None, timeout=10):
+        """Assessment or None per pair, waiting up to timeout in total for jobs still running"""
+        with self._lock:
+            jobs = dict(self._sessions.get(session_id) or {})
+        known = list(known or [])
+        deadline = time.time() + timeout
+        assessments = []
+        for index in range(len(qa_pairs)):
+            assessment = known[index] if index < len(known) else None
+            future = jobs.get(index)
+            if assessment is None and future is not None:
+                try:
+                    assessment = future.result(max(0.0, deadline - time.time()))
+                except FutureTimeout:
+                    assessment = None
+            assessments.append(assessment)
+        return assessments
+
+    def forget(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self):
+        with self._lock:
+            pending = sum(1 for jobs in self._sessions.values() for future in jobs.values() if not future.done())
+            return {
+                'sessions': len(self._sessions),
+                'pending': pending,
+                'scored': self.scored,
+                'failures': self.failures,
+                'avg_score_seconds': round(self.score_seconds / self.scored, 3) if self.scored else None,
+            }
@@ -1,44 +1,54 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
 import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 import json
 import uuid
+import random
 from datetime import datetime
-import torch
-from omegaconf import OmegaConf
-import urllib.request
-import sounddevice as sd
-import pyttsx3
+from contextlib import nullcontext
 
 # AssemblyAI imports
 import assemblyai as aai
-from assemblyai.streaming.v3 import (
-    BeginEvent,
-    StreamingClient,
-    StreamingClientOptions,
-    StreamingError,
-    StreamingEvents,
-    StreamingParameters,
-    StreamingSessionParameters,
-    TerminationEvent,
-    TurnEvent,
-)
 import logging
-from typing import Type
 import threading
 import time
 
+from audio_ingest import AudioRingBuffer, BufferedAudioStream, make_decoder
+from answer_scoring import AnswerScorer, aggregate, parse_assessment
+from feedback_jobs import FeedbackJobManager
+from llm_client import LLMClient
+import metrics
+from model_selector import ModelSelector, gemini_probe
+from model_store import load_models_yml, load_tts_model
+from phrase_matcher import PhraseMatcher, load_vocabulary
+from prompt_context import PromptContextCache, card_key, user_content
+from session_store import MemorySessionStore, SQLiteSessionStore, SessionConflict, start_sweeper
+from stt_local import local_client_factory
+from token_budget import ConversationBudget, compact_exchange, format_exchange
+from stt_manager import SAMPLE_RATE as STT_SAMPLE_RATE, STTManager, STTSessionBusy, assemblyai_client_factory
+from tts_audio import audio_to_pcm16, pcm16_to_array, iter_wav_chunks
+from tts_cache import TTSCache, make_cache_key
+from tts_pipeline import PipelineStats, iter_pipelined_wav, split_sentences
+from tts_batcher import TTSBatchWorker, accepts_batched_texts, silero_batch_apply
+from tts_executor import TTSExecutor
+from tts_optimize import optimize_model, warm_up_speakers
+from tts_prefetch import SessionAudioPrefetcher
+
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app, supports_credentials=True)
 
+# Backends: "fake" swaps in the deterministic offline stand-ins from fakes.py (development, load tests, CI)
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'gemini')
+TTS_BACKEND = os.getenv('TTS_BACKEND', 'silero')
+
 # Configure Gemini API
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if not GEMINI_API_KEY:
+if not GEMINI_API_KEY and LLM_BACKEND != 'fake':
     raise ValueError("Please set GEMINI_API_KEY in your .env file")
 
 genai.configure(api_key=GEMINI_API_KEY)
@@ -57,6 +67,14 @@ GEMINI_MODELS = [
     'models/gemini-2.5-flash'
 ]
 
+if LLM_BACKEND == 'fake':
+    from fakes import FakeGenAI
+    genai = FakeGenAI(
+        GEMINI_MODELS,
+        latency=os.getenv('FAKE_LLM_LATENCY', 'lognormal:400,0.4'),
+        failure_rate=float(os.getenv('FAKE_LLM_FAILURE_RATE', '0')),
+    )
+
 # Interview configuration - No fixed question limit
 INTERVIEW_CONFIG = {
     "position": "Software Engineer",
@@ -91,33 +109,117 @@ The interview continues until the candidate explicitly asks to stop.
 
 # Initialize TTS models
 print("🔄 Initializing TTS models...")
-url = "https://raw.githubusercontent.com/snakers4/silero-models/master/models.yml"
-urllib.request.urlretrieve(url, "latest_silero_models.yml")
-
-models = OmegaConf.load("latest_silero_models.yml")
+# Load pinned artifacts from the local cache (see model_store.py; run `python model_store.py prefetch` once)
+models = load_models_yml() if TTS_BACKEND != 'fake' else None
 
 language = "en"
 model_id = "v3_en"
-device = torch.device("cpu")
 
-model, _ = torch.hub.load(
-    repo_or_dir="snakers4/silero-models",
-    model="silero_tts",
-    language=language,
-    speaker=model_id,
+# torch, PortAudio and espeak are only needed for real synthesis; the fake backend runs on requirements.txt alone
+if TTS_BACKEND == 'fake':
+    from fakes import FakeTTSModel
+    torch = None
+    model = FakeTTSModel(latency=os.getenv('FAKE_TTS_LATENCY', 'fixed:0'))
+else:
+    import torch
+    device = torch.device("cpu")
+    model = load_tts_model(model_id, device)
+
+def inference_mode():
+    return torch.inference_mode() if torch is not None else nullcontext()
+
+# Opt-in optimized CPU inference: int8 dynamic quantization or a frozen TorchScript graph, where the model allows it
+# (compare against the baseline with `python tts_optimize.py report`). Speakers to warm up before serving traffic.
+TTS_OPTIMIZE = os.getenv('TTS_OPTIMIZE', '0')
+TTS_WARMUP_SPEAKERS = [speaker.strip() for speaker in os.getenv('TTS_WARMUP_SPEAKERS', 'en_10').split(',') if speaker.strip()]
+tts_optimizations = []
+if TTS_OPTIMIZE != '0' and TTS_BACKEND != 'fake':
+    model, tts_optimizations = optimize_model(model, TTS_OPTIMIZE)
+    print(f"🔧 TTS optimizations: {', '.join(tts_optimizations) or 'none applicable to this model'}")
+# Optimized output differs slightly from the baseline, so it gets its own cache entries
+tts_cache_model_id = f"{model_id}+{TTS_OPTIMIZE}" if tts_optimizations else model_id
+
+if TTS_BACKEND != 'fake':
+    import pyttsx3
+    engine = pyttsx3.init()
+
+# TTS output mode: "play" speaks on the server's speakers, "stream" returns WAV audio to the caller,
+# "pipeline" streams sentence by sentence while later sentences are still being synthesized
+TTS_MODE = os.getenv('TTS_MODE', 'play')
+TTS_MODES = ('play', 'stream', 'pipeline')
+TTS_PIPELINE_PREFETCH = int(os.getenv('TTS_PIPELINE_PREFETCH', '2'))
+
+# Synthesized audio cache - repeated phrases (greetings, fallbacks, farewells) skip Silero entirely
+tts_cache = TTSCache(
+    max_memory_bytes=int(float(os.getenv('TTS_CACHE_MEMORY_MB', '64')) * 1024 * 1024),
+    disk_dir=os.getenv('TTS_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tts_cache')) or None,
+)
+tts_pipeline_stats = PipelineStats()
+
+# Under a preloading gunicorn master (PREFORK_SERVING=1) this module starts no threads or processes at
+# import: a fork taken while a thread holds a lock copies that lock into the worker, held forever. Each
+# worker starts its own in after_fork() instead.
+PREFORK_SERVING = os.getenv('PREFORK_SERVING') == '1'
+
+# Pinned replica processes, each with its own share of the cores (TTS_REPLICAS=auto or a count; 0 keeps
+# inference in this process). They fork here, before this module starts any threads.
+TTS_REPLICAS = os.getenv('TTS_REPLICAS', '0')
+tts_executor = None
+if TTS_REPLICAS != '0':
+    tts_executor = TTSExecutor(
+        model,
+        replicas=TTS_REPLICAS,
+        threads_per_replica=int(os.getenv('TTS_REPLICA_THREADS', '1')),
+        request_timeout=float(os.getenv('TTS_REPLICA_TIMEOUT_SECONDS', '60')),
+    )
+    if not PREFORK_SERVING:
+        tts_executor.start()
+
+# Dedicated inference worker - concurrent requests are batched instead of racing on the shared model.
+# TTS_BATCHING=auto (default) enables it only when apply_tts takes a list of texts. v3_en does not, and there
+# the worker only serializes requests onto one thread; measure with bench_tts_batch.py before TTS_BATCHING=1.
+TTS_BATCHING = os.getenv('TTS_BATCHING', 'auto')
+TTS_BATCHING = accepts_batched_texts(model) if TTS_BATCHING == 'auto' else TTS_BATCHING == '1'
+tts_batch_worker = None
+if TTS_BATCHING and tts_executor is None:
+    tts_batch_worker = TTSBatchWorker(
+        silero_batch_apply(model, inference_mode),
+        max_batch_size=int(os.getenv('TTS_BATCH_MAX_SIZE', '8')),
+        max_wait_ms=float(os.getenv('TTS_BATCH_MAX_WAIT_MS', '10')),
+    )
+    if not PREFORK_SERVING:
+        tts_batch_worker.start()
+
+# AssemblyAI streaming - one independent recognition per interview session
+# (STT_BACKEND=local swaps in an offline recognizer for development, STT_BACKEND=fake adds recognizer latency for load tests)
+STT_BACKEND = os.getenv('STT_BACKEND', 'assemblyai')
+if STT_BACKEND == 'fake':
+    from fakes import fake_stt_client_factory
+    stt_client_factory = fake_stt_client_factory(
+        connect_latency=os.getenv('FAKE_STT_CONNECT_LATENCY', 'fixed:50'),
+        turn_latency=os.getenv('FAKE_STT_TURN_LATENCY', 'lognormal:150,0.3'),
+    )
+elif STT_BACKEND == 'local':
+    stt_client_factory = local_client_factory()
+else:
+    stt_client_factory = assemblyai_client_factory(ASSEMBLYAI_API_KEY)
+stt_manager = STTManager(
+    stt_client_factory,
+    silence_timeout=5,
+    max_duration=30,
 )
-model.to(device)
 
-engine = pyttsx3.init()
+# Client audio uploads: how much decoded audio may queue ahead of the recognizer before the upload is throttled
+STT_INGEST_BUFFER_MS = int(os.getenv('STT_INGEST_BUFFER_MS', '2000'))
+STT_INGEST_READ_BYTES = 4096
+
+# Skills, experience levels, stop phrases and topics (vocab/*.json) compiled into one matcher;
+# each candidate answer is scanned once for all of them
+response_matcher = PhraseMatcher(load_vocabulary())
 
-# AssemblyAI Streaming Variables
-is_streaming = False
-stream_lock = threading.Lock()
-stop_event = threading.Event()
-client_instance = None
-transcribed_text = ""
-transcription_complete = False
-last_audio_time = 0
+# The interviewer's system prompt is built once per unique interview card and
+# shared by every session using that card as a stable prompt prefix
+prompt_contexts = PromptContextCache(max_cards=int(os.getenv('PROMPT_CONTEXT_MAX_CARDS', '256')))
 
 # ========== INTERVIEW SESSION CLASS ==========
 
@@ -128,6 +230,7 @@ class InterviewSession:
         self.question_count = 0
         self.start_time = datetime.now()
         self.is_completed = False
+        self.feedback_job_id = None
         
         # Store interview metadata from form
         self.interview_data = interview_data or {}
@@ -148,6 +251,13 @@ class InterviewSession:
             'areas_for_improvement': []
         }
         self.all_questions_answers = []  # Store all Q&A for feedback
+        self.answer_scores = []  # Per-answer assessment (or None while pending), aligned with all_questions_answers
+        
+        # Derived from conversation_history as messages arrive, so building a prompt never rescans it
+        self.last_user_message = None
+        self.user_turn_count = 0
+        self.topics_mentioned = []
+        
         self.topic_coverage = {
             'algorithms': 0,
             'data_structures': 0,
@@ -157,9 +267,37 @@ class InterviewSession:
             'technical_concepts': 0
         }
         
-        # Generate system prompt with interview data
-        system_prompt = self._generate_system_prompt()
-        self.add_message("system", system_prompt)
+        # System prompt for this interview card, shared with other sessions on the same card
+        self.card_key = card_key(self.role, self.level, self.techstack, self.interview_type, self.questions)
+        self.add_message("system", self.prompt_context().system_prompt)
+    
+    def prompt_context(self):
+        """Cached prompt context (compact card scope as a chat prefix) for this session's interview card"""
+        return prompt_contexts.get(self.card_key, self._generate_system_prompt, self._generate_scope_prompt)
+    
+    def _generate_scope_prompt(self):
+        """Compact card scope sent with every turn (the full system prompt is only kept in the history)"""
+        techstack_str = ", ".join(self.techstack) if isinstance(self.techstack, list) else str(self.techstack)
+        scope = f"""You are conducting a technical interview.
+
+INTERVIEW CARD SCOPE (MANDATORY):
+- Role: {self.role}
+- Level: {self.level}
+- Technologies: {techstack_str}
+- Type: {self.interview_type}"""
+        if self.questions:
+            questions_list = "\n".join(f"{i+1}. {q}" for i, q in enumerate(self.questions))
+            return f"""{scope}
+
+QUESTION SCOPE: Your questions MUST come from these prepared questions or be follow-ups/clarifications on them:
+{questions_list}
+
+DO NOT ask questions outside this scope!"""
+        return f"""{scope}
+
+QUESTION SCOPE: Your questions MUST relate to the {self.role} position, {self.level} level concepts, {techstack_str} technologies and the {self.interview_type} interview focus.
+
+DO NOT ask questions outside this scope!"""
     
     def _generate_system_prompt(self):
         """Generate system prompt based on interview metadata"""
@@ -249,49 +387,44 @@ ALL questions must be within the scope of: {self.role} role, {self.level} level,
 DO NOT deviate from this scope.
 """
         
-    def add_message(self, role, content):
+    def add_message(self, role, content, analysis=None):
         self.conversation_history.append({
             "role": role,
             "content": content,
             "timestamp": datetime.now().isoformat()
         })
+        
+        if role == 'user':
+            self.last_user_message = content
+            self.user_turn_count += 1
+            if content:
+                analysis = analysis or response_matcher.match(content)
+                for topic in analysis['topics']:
+                    if topic not in self.topics_mentioned:
+                        self.topics_mentioned.append(topic)
     
-    def extract_candidate_info(self, response):
+    def extract_candidate_info(self, response, analysis=None):
         """Extract candidate information from their responses"""
-        response_lower = response.lower()
+        analysis = analysis or response_matcher.match(response)
         
         # Extract role information
-        if "applied for" in response_lower or "role" in response_lower:
+        if 'applied_role' in analysis['intro_cues']:
             self.candidate_info['applied_role'] = response
         
         # Extract introduction and experience
-        if "introduction" in response_lower or "name" in response_lower or "experience" in response_lower:
+        if 'introduction' in analysis['intro_cues']:
             self.candidate_info['introduction'] = response
             
-            # Extract experience level
-            experience_indicators = {
-                'junior': ['junior', 'entry level', 'fresh graduate', '0-2 years', 'starting my career'],
-                'mid-level': ['mid level', 'intermediate', '2-5 years', '3-5 years', 'few years of experience'],
-                'senior': ['senior', 'lead', '5+ years', 'extensive experience', 'many years']
-            }
-            
-            for level, indicators in experience_indicators.items():
-                if any(indicator in response_lower for indicator in indicators):
-                    self.candidate_info['experience_level'] = level
-                    break
+            # Extract experience level (junior before mid-level before senior, as listed in the vocabulary)
+            level = response_matcher.first_in_vocabulary_order('experience_levels', analysis['experience_levels'])
+            if level:
+                self.candidate_info['experience_level'] = level
         
         # Extract technical skills
-        tech_skills = [
-            'python', 'java', 'javascript', 'typescript', 'react', 'node', 'angular', 'vue',
-            'aws', 'azure', 'docker', 'kubernetes', 'sql', 'nosql', 'mongodb', 'redis',
-            'rest', 'graphql', 'ci/cd', 'git', 'agile', 'scrum', 'machine learning',
-            'data structures', 'algorithms', 'system design', 'microservices'
-        ]
-        
-        found_skills = [skill for skill in tech_skills if skill in response_lower]
-        if found_skills:
-            self.candidate_info['skills_mentioned'].extend(found_skills)
-            self.candidate_info['skills_mentioned'] = list(set(self.candidate_info['skills_mentioned']))
+        skills_mentioned = self.candidate_info['skills_mentioned']
+        for skill in analysis['skills']:
+            if skill not in skills_mentioned:
+                skills_mentioned.append(skill)
     
     def add_qa_pair(self, question, answer):
         """Store question-answer pair for feedback"""
@@ -300,132 +433,258 @@ DO NOT deviate from this scope.
             'answer': answer,
             'timestamp': datetime.now().isoformat()
         })
+        conversation_budget.observe(self.session_id, self.all_questions_answers)
+        if answer_scorer is not None:
+            answer_scorer.submit(self.session_id, len(self.all_questions_answers) - 1, self.all_questions_answers[-1])
+            answer_scorer.sync(self)
+
+def create_session_store():
+    """Session backend from SESSION_STORE: "memory" (default) or "sqlite" (survives restarts, shared across workers)"""
+    idle_ttl = float(os.getenv('SESSION_IDLE_TTL_SECONDS', '3600'))
+    completed_ttl = float(os.getenv('SESSION_COMPLETED_TTL_SECONDS', '900'))
+    if os.getenv('SESSION_STORE', 'memory') == 'sqlite':
+        return SQLiteSessionStore(
+            os.getenv('SESSION_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sessions.db')),
+            idle_ttl_seconds=idle_ttl,
+            completed_ttl_seconds=completed_ttl,
+            max_sessions=int(os.getenv('SESSION_MAX_COUNT', '10000')),
+        )
+    return MemorySessionStore(
+        idle_ttl_seconds=idle_ttl,
+        completed_ttl_seconds=completed_ttl,
+        max_sessions=int(os.getenv('SESSION_MAX_COUNT', '1000')),
+        max_memory_bytes=int(float(os.getenv('SESSION_MAX_MEMORY_MB', '256')) * 1024 * 1024),
+        max_jobs=int(os.getenv('FEEDBACK_JOB_MAX_COUNT', '1000')),
+    )
 
-# Store active interview sessions
-interview_sessions = {}
+# Store active interview sessions (bounded and evicting; call interview_sessions.save() after mutating a session)
+interview_sessions = create_session_store()
+if not PREFORK_SERVING:
+    start_sweeper(interview_sessions)
 
-# ========== ASSEMBLYAI EVENT HANDLERS ==========
+# ========== METRICS ==========
 
-def on_begin(self: Type[StreamingClient], event: BeginEvent):
-    print(f"Session started: {event.id}")
+TTS_SYNTHESIS = metrics.histogram(
+    'tts_synthesis_seconds',
+    'Silero apply_tts time per synthesized text (cache misses only)',
+    ['path'],
+)
+TTS_REAL_TIME_FACTOR = metrics.histogram(
+    'tts_real_time_factor',
+    'Synthesis time divided by the duration of the audio produced (below 1 is faster than real time)',
+    buckets=(0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0),
+)
+HTTP_LATENCY = metrics.histogram(
+    'http_request_duration_seconds',
+    'Request latency per route (time to response headers for streamed responses)',
+    ['method', 'route', 'status'],
+)
+metrics.gauge(
+    'interview_sessions',
+    'Interview sessions held by the session store, by state',
+    ['state'],
+).set_function(lambda: {(state,): interview_sessions.stats()[state] for state in ('active', 'completed')})
+metrics.gauge(
+    'stt_active_recognitions',
+    'Speech recognitions currently streaming',
+).set_function(lambda: {(): len(stt_manager.active_keys())})
+metrics.gauge(
+    'feedback_jobs',
+    'Background feedback jobs held in memory, by status',
+    ['status'],
+).set_function(lambda: {(status,): count for status, count in feedback_jobs.stats().items()})
+
+if tts_executor is not None:
+    metrics.gauge(
+        'tts_replica_utilization',
+        'Fraction of its uptime each TTS replica spent synthesizing',
+        ['replica'],
+    ).set_function(lambda: {(r['index'],): r['utilization'] or 0 for r in tts_executor.stats()['replicas']})
+    metrics.gauge(
+        'tts_replica_queue_depth',
+        'TTS requests waiting for a replica',
+    ).set_function(lambda: {(): tts_executor.stats()['queue_depth']})
+
+def tts_path():
+    if tts_executor is not None:
+        return 'replicas'
+    return 'batched' if tts_batch_worker is not None else 'direct'
+
+def record_tts_synthesis(seconds, audio_seconds):
+    TTS_SYNTHESIS.observe(seconds, path=tts_path())
+    if audio_seconds > 0:
+        TTS_REAL_TIME_FACTOR.observe(seconds / audio_seconds)
 
-def on_turn(self: Type[StreamingClient], event: TurnEvent):
-    global transcribed_text, transcription_complete, last_audio_time
-    
-    # Update last audio time whenever we get any transcript
-    last_audio_time = time.time()
-    
-    # Skip empty transcripts
-    if event.transcript.strip():
-        print(f"Transcribed: {event.transcript} ({event.end_of_turn})")
-        transcribed_text = event.transcript
-
-    if event.end_of_turn and not event.turn_is_formatted:
-        params = StreamingSessionParameters(
-            format_turns=True,
-        )
-        self.set_params(params)
-    
-    # Mark transcription as complete when we have a full turn
-    if event.end_of_turn and event.transcript.strip():
-        transcription_complete = True
+# ========== UTILITY FUNCTIONS ==========
 
-def on_terminated(self: Type[StreamingClient], event: TerminationEvent):
-    print(f"Session terminated: {event.audio_duration_seconds} seconds of audio processed")
+def list_generate_models():
+    """All models the API offers that support generateContent"""
+    return [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
+
+# Probe candidates concurrently and persist the choice; a cached choice skips probing at startup
+GEMINI_PROBE_TIMEOUT = float(os.getenv('GEMINI_PROBE_TIMEOUT_SECONDS', '8'))
+model_selector = ModelSelector(
+    GEMINI_MODELS,
+    probe=gemini_probe(genai, timeout=GEMINI_PROBE_TIMEOUT),
+    list_candidates=list_generate_models,
+    cache_path=os.getenv('GEMINI_MODEL_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_cache', 'gemini_model.json')),
+    ttl_seconds=float(os.getenv('GEMINI_MODEL_TTL_SECONDS', str(6 * 3600))),
+    probe_timeout=GEMINI_PROBE_TIMEOUT,
+)
 
-def on_error(self: Type[StreamingClient], error: StreamingError):
-    print(f"Error occurred: {error}")
+if not model_selector.select(revalidate_stale=not PREFORK_SERVING):
+    raise Exception("No working Gemini model found. Please check your API key and region.")
+if not PREFORK_SERVING:
+    model_selector.start_background_revalidation()
+
+print(f"🎯 Using model: {model_selector.current}")
+
+# One shared LLM client for every call site: reused model objects, deadlines, jittered retries, optional hedging
+llm_client = LLMClient(
+    genai,
+    primary_model=lambda: model_selector.current,
+    models=GEMINI_MODELS,
+    deadline=float(os.getenv('LLM_DEADLINE_SECONDS', '20')),
+    max_retries=int(os.getenv('LLM_MAX_RETRIES', '2')),
+    hedge=os.getenv('LLM_HEDGE', '0') == '1',
+    hedge_min_samples=int(os.getenv('LLM_HEDGE_MIN_SAMPLES', '20')),
+)
 
-class ControlledMicrophoneStream:
-    """Wrapper for MicrophoneStream with start/stop control"""
-    def __init__(self, sample_rate=16000):
-        self.sample_rate = sample_rate
-        self.mic_stream = None
-        
-    def __iter__(self):
-        self.mic_stream = aai.extras.MicrophoneStream(sample_rate=self.sample_rate)
-        return self
-    
-    def __next__(self):
-        global is_streaming, last_audio_time
-        
-        # Check if we should stop
-        if stop_event.is_set():
-            if self.mic_stream:
-                try:
-                    self.mic_stream.close()
-                except:
-                    pass
-            raise StopIteration
-        
-        with stream_lock:
-            if not is_streaming:
-                if self.mic_stream:
-                    try:
-                        self.mic_stream.close()
-                    except:
-                        pass
-                raise StopIteration
-        
-        # Get next audio chunk
-        try:
-            # Update last audio time when we get audio data
-            chunk = next(self.mic_stream)
-            last_audio_time = time.time()
-            return chunk
-        except StopIteration:
-            raise
+# End-of-interview feedback runs in the background; clients poll /api/feedback/<job_id>.
+# Job records go to the session store too, so with SESSION_STORE=sqlite any worker can answer the poll.
+feedback_jobs = FeedbackJobManager(max_workers=int(os.getenv('FEEDBACK_WORKERS', '4')), store=interview_sessions)
 
-# ========== UTILITY FUNCTIONS ==========
+# ========== CONVERSATION TOKEN BUDGET ==========
+
+# Prompts stay this size however long the interview runs (estimated tokens)
+TOKEN_BUDGET_TURN = int(os.getenv('TOKEN_BUDGET_TURN', '1200'))
+TOKEN_BUDGET_FEEDBACK = int(os.getenv('TOKEN_BUDGET_FEEDBACK', '6000'))
+TOKEN_BUDGET_FEEDBACK_RECENT = int(os.getenv('TOKEN_BUDGET_FEEDBACK_RECENT', '10'))
+TOKEN_BUDGET_SUMMARY_EXCHANGE = int(os.getenv('TOKEN_BUDGET_SUMMARY_EXCHANGE', '500'))
+
+def summarize_conversation(previous_summary, exchanges, max_tokens):
+    """Fold older Q&A pairs into the running interview summary"""
+    qa_text = "\n\n".join(format_exchange(qa, TOKEN_BUDGET_SUMMARY_EXCHANGE) for qa in exchanges)
+    prompt = f"""Update the running summary of a technical interview with the new exchanges below.
+
+Current summary:
+{previous_summary or "(none yet)"}
+
+New exchanges:
+{qa_text}
+
+Write the updated summary in at most {max_tokens * 3 // 4} words. Keep the topics covered, what the candidate got right or wrong, and concrete details useful for final feedback. Plain text only."""
+    return llm_client.generate(prompt, deadline=float(os.getenv('SUMMARY_DEADLINE_SECONDS', '30')))
+
+# Last K exchanges stay verbatim; older ones are folded into a per-session summary in the background
+conversation_budget = ConversationBudget(
+    summarize_conversation,
+    keep_recent=int(os.getenv('TOKEN_BUDGET_KEEP_TURNS', '4')),
+    summary_tokens=int(os.getenv('TOKEN_BUDGET_SUMMARY', '400')),
+    fold_batch=int(os.getenv('TOKEN_BUDGET_FOLD_BATCH', '4')),
+    max_workers=int(os.getenv('SUMMARY_WORKERS', '2')),
+)
+
+# ========== ANSWER SCORING ==========
+
+# Each Q&A pair is scored in the background as soon as it is stored; final feedback synthesizes the scores.
+# That is one short LLM call per answer, in exchange for a final feedback prompt of fixed size.
+ANSWER_SCORING = os.getenv('ANSWER_SCORING', '1') == '1'
+# How long the feedback job waits for answers still being scored (usually just the last one)
+SCORING_WAIT_SECONDS = float(os.getenv('SCORING_WAIT_SECONDS', '10'))
+FEEDBACK_UNSCORED_LINES = int(os.getenv('FEEDBACK_UNSCORED_LINES', '8'))
+SCORING_WORKERS = int(os.getenv('SCORING_WORKERS', '1'))
+# A scoring call waits up to this long for in-flight interview turns to finish before it is sent
+SCORING_MAX_DEFER_SECONDS = float(os.getenv('SCORING_MAX_DEFER_SECONDS', '5'))
+
+# Scoring runs at low priority on its own client: its own small pool, latency window and counters, never
+# hedged, so it neither takes pool threads from interview turns nor skews their hedge threshold
+scoring_llm_client = LLMClient(
+    genai,
+    primary_model=lambda: model_selector.current,
+    models=GEMINI_MODELS,
+    deadline=float(os.getenv('SCORING_DEADLINE_SECONDS', '30')),
+    max_retries=int(os.getenv('LLM_MAX_RETRIES', '2')),
+    hedge=False,
+    max_workers=SCORING_WORKERS,
+)
+
+def score_answer(qa):
+    """Structured assessment of one answer: scores out of 10, topics, one strength and one improvement"""
+    prompt = f"""Score the candidate's answer to one technical interview question.
+
+{format_exchange(qa, TOKEN_BUDGET_SUMMARY_EXCHANGE)}
+
+Reply with JSON only, no prose:
+{{"technical": <0-10>, "communication": <0-10>, "topics": [<up to 3 short topic names>], "strength": "<one short sentence>", "improvement": "<one short sentence>"}}"""
+    llm_client.wait_idle(SCORING_MAX_DEFER_SECONDS)
+    return parse_assessment(scoring_llm_client.generate(prompt))
+
+answer_scorer = AnswerScorer(score_answer, max_workers=SCORING_WORKERS) if ANSWER_SCORING else None
+
+def feedback_from_digest(digest):
+    """Feedback text straight from the aggregated scores, for when the synthesis call fails"""
+    strengths = "; ".join(digest['strengths']) or "engaged with every question"
+    improvements = "; ".join(digest['improvements']) or "add more depth and concrete examples"
+    return (f"1. Technical Proficiency (Score {digest['technical']}/100)\n"
+            f"2. Communication & Soft Skills (Score {digest['communication']}/100)\n"
+            f"3. Overall Assessment: Strengths: {strengths}. Areas for improvement: {improvements}.")
+
+def generate_scored_feedback(candidate_info, qa_pairs, session_id, answer_scores):
+    """Overall feedback synthesized from per-answer scores; a fixed-size prompt however many questions were asked.
 
-def find_working_model():
-    """Find a working Gemini model from the available list"""
-    print("🔍 Searching for working model...")
+    Returns None when no answer was scored, so the caller can fall back to the conversation summary.
+    """
+    assessments = answer_scorer.collect(session_id, qa_pairs, known=answer_scores, timeout=SCORING_WAIT_SECONDS)
+    digest = aggregate(assessments)
+    if digest is None:
+        return None
     
-    for model_name in GEMINI_MODELS:
-        try:
-            model = genai.GenerativeModel(model_name)
-            # Test with a simple prompt
-            response = model.generate_content("Say 'Hello' in one word.")
-            if response.text:
-                print(f"✅ Successfully connected to model: {model_name}")
-                return model_name
-        except Exception as e:
-            print(f"❌ Model {model_name} failed: {e}")
-            continue
+    unscored = [qa for qa, assessment in zip(qa_pairs, assessments) if assessment is None]
+    unscored_text = ""
+    if unscored:
+        lines = [compact_exchange(qa) for qa in unscored[-FEEDBACK_UNSCORED_LINES:]]
+        omitted = len(unscored) - len(lines)
+        unscored_text = f"\nAnswers not scored ({len(unscored)}{f', {omitted} oldest omitted' if omitted else ''}):\n" + "\n".join(lines)
+    
+    notes = lambda items: "\n".join(f"- {item}" for item in items) or "- (none noted)"
+    prompt = f"""As an expert technical interviewer, analyze these per-answer assessments and write the final interview feedback.
+
+Candidate: {candidate_info.get('applied_role', '')}, {candidate_info.get('experience_level', '')} level
+Answers scored: {digest['answers_scored']} of {len(qa_pairs)}
+Technical score: {digest['technical']}/100
+Communication score: {digest['communication']}/100
+Topics covered: {", ".join(digest['topics']) or "(none)"}
+Strengths seen in the best answers:
+{notes(digest['strengths'])}
+Improvements noted in the weakest answers:
+{notes(digest['improvements'])}{unscored_text}
+
+Use exactly these sections and keep the scores above:
+1. Technical Proficiency (Score /100)
+2. Communication & Soft Skills (Score /100)
+3. Overall Assessment: top strengths, areas for improvement, final recommendation
+
+Be specific, balanced and professional. At most 200 words."""
     
-    # If no predefined model works, try to find any available model
     try:
-        models = genai.list_models()
-        for model in models:
-            if 'generateContent' in model.supported_generation_methods:
-                try:
-                    test_model = genai.GenerativeModel(model.name)
-                    response = test_model.generate_content("Test")
-                    if response.text:
-                        print(f"✅ Successfully connected to available model: {model.name}")
-                        return model.name
-                except:
-                    continue
+        return llm_client.generate(prompt) or feedback_from_digest(digest)
     except Exception as e:
-        print(f"Error searching for models: {e}")
-    
-    return None
-
-# Find and set the working model
-WORKING_MODEL = find_working_model()
-if not WORKING_MODEL:
-    raise Exception("No working Gemini model found. Please check your API key and region.")
+        print(f"Feedback synthesis error, using the aggregated scores: {e}")
+        return feedback_from_digest(digest)
 
-print(f"🎯 Using model: {WORKING_MODEL}")
-
-def generate_overall_feedback(conversation_history, candidate_info, qa_pairs):
+def generate_overall_feedback(candidate_info, qa_pairs, session_id=None, answer_scores=None):
     """Generate brief comprehensive feedback after interview ends"""
+    start = time.time()
     try:
-        model = genai.GenerativeModel(WORKING_MODEL)
+        if answer_scorer is not None:
+            feedback = generate_scored_feedback(candidate_info, qa_pairs, session_id, answer_scores)
+            if feedback:
+                return feedback
         
-        # Prepare conversation summary for feedback
-        qa_summary = "\n".join([f"Q: {qa['question']}\nA: {qa['answer']}\n" for qa in qa_pairs])
+        # Prepare conversation summary for feedback: rolling summary plus recent answers, under budget
+        qa_summary = conversation_budget.render(session_id, qa_pairs, TOKEN_BUDGET_FEEDBACK,
+                                                keep_recent=TOKEN_BUDGET_FEEDBACK_RECENT)
         
         feedback_prompt = f"""
 As an expert technical interviewer, analyze the following interview and provide comprehensive feedback. Be objective and balanced in your assessment.
@@ -463,89 +722,88 @@ Remember:
 Format the response as a clear, well-structured assessment that would be valuable for both the candidate and hiring team.
 """
 
-        response = model.generate_content(feedback_prompt)
-        return response.text.strip() if response.text else "Thank you for your time. We appreciate your participation in this interview."
+        feedback = llm_client.generate(feedback_prompt)
+        return feedback if feedback else "Thank you for your time. We appreciate your participation in this interview."
     
     except Exception as e:
         print(f"Feedback generation error: {e}")
+        llm_client.record_fallback(time.time() - start)
         return "Thank you for completing the interview. Your responses have been recorded and will be reviewed by our team."
 
-def generate_ai_response(conversation_history, is_final_feedback=False, interview_session=None):
-    """Generate response using Gemini API with contextual awareness"""
-    try:
-        # Create model with working model name
-        model = genai.GenerativeModel(WORKING_MODEL)
-        
-        # Extract conversation context without full repetition
-        # Get key topics mentioned but not full responses
-        topic_summary = ""
-        last_user_msg = None
-        
-        # Find last user message (candidate's response)
-        for msg in reversed(conversation_history):
-            if msg['role'] == 'user':
-                last_user_msg = msg['content']
-                break
-        
-        # Build topic summary from conversation (without full text)
-        topics_mentioned = []
-        for msg in conversation_history:
-            if msg['role'] == 'user' and msg['content']:
-                # Extract key topics/technologies mentioned (simple approach)
-                content_lower = msg['content'].lower()
-                if any(word in content_lower for word in ['react', 'node', 'python', 'javascript', 'java', 'sql', 'database']):
-                    topics_mentioned.append("technical experience")
-                if 'experience' in content_lower or 'worked' in content_lower:
-                    topics_mentioned.append("work experience")
-        
-        topic_summary = ", ".join(set(topics_mentioned[:3])) if topics_mentioned else "general background"
-        
-        if is_final_feedback:
-            # Generate farewell message when interview ends
-            prompt = "The candidate has decided to end the interview. Please provide a brief polite closing message thanking them for their time. Keep it to one sentence. Do NOT repeat any previous conversation."
-            response = model.generate_content(prompt)
-        else:
-            # Build enhanced prompt with role context and question scope
-            role_context = ""
-            question_scope = ""
-            
-            if interview_session:
-                techstack_str = ", ".join(interview_session.techstack) if isinstance(interview_session.techstack, list) else str(interview_session.techstack)
-                role_context = f"\n\nINTERVIEW CARD SCOPE (MANDATORY):\n- Role: {interview_session.role}\n- Level: {interview_session.level}\n- Technologies: {techstack_str}\n- Type: {interview_session.interview_type}"
-                
-                # Add question scope reminder
-                if interview_session.questions and len(interview_session.questions) > 0:
-                    question_scope = f"\n\nQUESTION SCOPE: You have {len(interview_session.questions)} prepared questions. Your next question MUST be:\n- From the prepared questions list, OR\n- A follow-up/clarification related to those questions, OR\n- Related to {interview_session.role} role, {interview_session.level} level, and {techstack_str} technologies\n\nDO NOT ask questions outside this scope!"
-                else:
-                    question_scope = f"\n\nQUESTION SCOPE: Your next question MUST be related to:\n- {interview_session.role} position\n- {interview_session.level} level concepts\n- {techstack_str} technologies\n- {interview_session.interview_type} interview focus\n\nDO NOT ask questions outside this scope!"
-            
-            # Build prompt that provides context but prevents repetition
-            if last_user_msg:
-                # Check if this is the first response after introduction/confirmation
-                # Count how many exchanges have happened
-                user_responses = [msg for msg in conversation_history if msg['role'] == 'user']
-                is_after_confirmation = len(user_responses) == 1
-                
-                if is_after_confirmation:
-                    # This is after introduction and confirmation - acknowledge and start technical questions
-                    prompt = f"""You are conducting a technical interview. The candidate has just introduced themselves and confirmed the interview details (role, level, tech stack, number of questions).
+# Contextual fallback responses used when the LLM call fails
+FALLBACK_RESPONSES = [
+    "Thank you for sharing that. What would you say is the most challenging aspect?",
+    "I appreciate your response. Could you elaborate briefly?",
+    "That's interesting. What factors would you consider?",
+]
+EMPTY_RESPONSE_FALLBACK = "Thank you for that response. Let me ask you another question based on what you've shared."
+
+def conversation_state(conversation_history, interview_session=None):
+    """(last user message, user turn count, topics) - kept incrementally on the session, scanned only without one"""
+    if interview_session is not None:
+        return interview_session.last_user_message, interview_session.user_turn_count, interview_session.topics_mentioned
+    
+    user_messages = [msg['content'] for msg in conversation_history if msg['role'] == 'user']
+    topics_mentioned = []
+    for content in user_messages:
+        for topic in response_matcher.match(content or '')['topics']:
+            if topic not in topics_mentioned:
+                topics_mentioned.append(topic)
+    return (user_messages[-1] if user_messages else None), len(user_messages), topics_mentioned
+
+def build_turn_delta(interview_session):
+    """The per-turn message sent after the cached card context: the budgeted conversation so far and an instruction"""
+    last_user_msg = interview_session.last_user_message
+    
+    if not last_user_msg:
+        return user_content("""The candidate has just introduced themselves. Ask your first technical question within the interview card scope. Keep it to 1-2 sentences and do NOT repeat what they said.""")
+    
+    if interview_session.user_turn_count == 1:
+        instruction = """They have introduced themselves and confirmed the interview details. Briefly acknowledge the introduction (1 sentence) and ask your FIRST technical question within the interview card scope. Maximum 2-3 sentences total."""
+    else:
+        instruction = """Acknowledge briefly (1 short sentence) without repeating or echoing their answer, then ask the NEXT new question within the interview card scope. Never repeat your previous question. Maximum 2-3 sentences total."""
+    
+    conversation = conversation_budget.render(interview_session.session_id, interview_session.all_questions_answers, TOKEN_BUDGET_TURN)
+    return user_content(f"""{conversation}
 
-{role_context}{question_scope}
+The last answer above is the candidate's reply to your last question. {instruction}""")
+
+def build_ai_prompt(conversation_history, is_final_feedback=False, interview_session=None):
+    """Build the next-turn prompt.
+    
+    With a session this is chat contents: the card's cached system prompt
+    prefix followed by a small per-turn delta. Without one it is a
+    self-contained prompt string.
+    """
+    if is_final_feedback:
+        # Generate farewell message when interview ends
+        return "The candidate has decided to end the interview. Please provide a brief polite closing message thanking them for their time. Keep it to one sentence. Do NOT repeat any previous conversation."
+    
+    if interview_session is not None:
+        return interview_session.prompt_context().contents(build_turn_delta(interview_session))
+    
+    last_user_msg, user_turn_count, _ = conversation_state(conversation_history)
+    
+    # Build prompt that provides context but prevents repetition
+    if last_user_msg:
+        # Check if this is the first response after introduction/confirmation
+        is_after_confirmation = user_turn_count == 1
+        
+        if is_after_confirmation:
+            # This is after introduction and confirmation - acknowledge and start technical questions
+            prompt = """You are conducting a technical interview. The candidate has just introduced themselves and confirmed the interview details (role, level, tech stack, number of questions).
 
-IMPORTANT: They have confirmed the interview details. Now start asking TECHNICAL questions based on the interview card scope above.
+IMPORTANT: They have confirmed the interview details. Now start asking TECHNICAL questions.
 
 Your response should:
 1. Briefly acknowledge their introduction and confirmation (1 sentence)
-2. Ask your FIRST technical question based on the interview card scope
+2. Ask your FIRST technical question
 3. Maximum 2-3 sentences total
-4. Question MUST be within the scope: {interview_session.role if interview_session else 'role'}, {interview_session.level if interview_session else 'level'}, and technologies listed above
 
 Start with your first technical question now:"""
-                else:
-                    # Regular follow-up question
-                    prompt = f"""You are conducting a technical interview. The candidate just responded to your question.
-
-{role_context}{question_scope}
+        else:
+            # Regular follow-up question
+            prompt = """You are conducting a technical interview. The candidate just responded to your question.
 
 CRITICAL ANTI-REPETITION RULES:
 1. NEVER repeat what the candidate just said - assume you already know their answer
@@ -554,245 +812,373 @@ CRITICAL ANTI-REPETITION RULES:
 4. Simply acknowledge briefly (1 short sentence) and ask the NEXT new question
 5. Maximum 2-3 sentences total: brief acknowledgment + new question
 6. Keep it natural and forward-moving
-7. REMEMBER: Next question MUST be within the interview card scope above
 
 GOOD example: "Good point. What's your approach to testing this?"
 BAD example: "Based on your answer about React hooks, you mentioned useState. Tell me about React hooks..." (DON'T DO THIS)
 
-Now respond with brief acknowledgment and next question (must be within scope):"""
-            else:
-                # This shouldn't happen, but fallback
-                prompt = f"""You are conducting a technical interview. The candidate has just introduced themselves.
-
-{role_context}{question_scope}
+Now respond with brief acknowledgment and next question:"""
+    else:
+        # This shouldn't happen, but fallback
+        prompt = """You are conducting a technical interview. The candidate has just introduced themselves.
 
-Ask your first technical question. The question MUST be:
-- Within the interview card scope listed above
-- Related to {interview_session.role if interview_session else 'the position'} role
-- Appropriate for {interview_session.level if interview_session else 'the'} level
+Ask your first technical question.
 - Keep it to 1-2 sentences
-- Do NOT repeat what they said in their introduction
-- Do NOT ask questions outside the scope"""
+- Do NOT repeat what they said in their introduction"""
+
+    return prompt
+
+def reserve_feedback_job(interview_session):
+    """Mark the interview completed and pick its feedback job id; save the session before start_feedback_job()"""
+    interview_session.is_completed = True
+    interview_session.feedback_job_id = str(uuid.uuid4())
+
+def start_feedback_job(interview_session):
+    """Queue overall feedback generation under the reserved id, once the completed session is saved"""
+    # Submitted only after the save, so a save conflict (and the client's retry) cannot leave a duplicate job
+    return feedback_jobs.submit(
+        interview_session.session_id,
+        generate_overall_feedback,
+        dict(interview_session.candidate_info),
+        list(interview_session.all_questions_answers),
+        interview_session.session_id,
+        list(answer_scorer.sync(interview_session)) if answer_scorer is not None else None,
+        job_id=interview_session.feedback_job_id,
+    )
 
-            response = model.generate_content(prompt)
-        
-        if response and response.text:
-            return response.text.strip()
+def feedback_job_fields(job):
+    """Response fields that point the client at a pending feedback job"""
+    return {
+        'feedback_job_id': job.job_id,
+        'feedback_status': job.status,
+        'feedback_url': f'/api/feedback/{job.job_id}',
+    }
+
+def generate_ai_response(conversation_history, is_final_feedback=False, interview_session=None):
+    """Generate response using Gemini API with contextual awareness"""
+    start = time.time()
+    try:
+        prompt = build_ai_prompt(conversation_history, is_final_feedback, interview_session)
+        response_text = llm_client.generate(prompt)
+        if response_text:
+            return response_text
         else:
-            return "Thank you for that response. Let me ask you another question based on what you've shared."
+            return EMPTY_RESPONSE_FALLBACK
     
     except Exception as e:
         print(f"Gemini API Error: {str(e)}")
-        # Contextual fallback responses
-        fallback_responses = [
-            "Thank you for sharing that. What would you say is the most challenging aspect?",
-            "I appreciate your response. Could you elaborate briefly?",
-            "That's interesting. What factors would you consider?",
-        ]
-        import random
-        return random.choice(fallback_responses)
-
-def should_end_interview(user_input):
-    """Check if user wants to end the interview"""
-    end_phrases = [
-        "end interview",
-        "stop interview",
-        "finish interview",
-        "conclude interview",
-        "that's all",
-        "i'm done",
-        "let's end",
-        "let's stop",
-        "can we stop",
-        "can we end",
-        "wrap up",
-        "finish up",
-        "no more",
-        "thank you that's it",
-        "we can stop here",
-        "end the session"
-    ]
-    user_input_lower = user_input.lower()
-    return any(phrase in user_input_lower for phrase in end_phrases)
-
-# ========== ASSEMBLYAI SPEECH FUNCTIONS ==========
-
-def monitor_silence_timeout(timeout_seconds=5):
-    """Monitor for silence timeout and stop STT if no audio detected"""
-    global is_streaming, last_audio_time
-    
-    start_time = time.time()
-    last_audio_time = start_time
-    
-    while is_streaming and not stop_event.is_set():
-        current_time = time.time()
-        silence_duration = current_time - last_audio_time
-        
-        # Check if we've exceeded the silence timeout
-        if silence_duration >= timeout_seconds:
-            print(f"🕒 No speech detected for {timeout_seconds} seconds. Auto-stopping STT.")
-            stop_speech_recognition_internal()
-            break
-        
-        # Check if total session time exceeds a reasonable limit (30 seconds)
-        total_duration = current_time - start_time
-        if total_duration >= 30:  # Maximum 30 seconds per STT session
-            print("🕒 Maximum STT session time reached (30 seconds). Auto-stopping.")
-            stop_speech_recognition_internal()
-            break
-        
-        time.sleep(0.1)  # Check every 100ms
-
-def stop_speech_recognition_internal():
-    """Internal function to stop speech recognition"""
-    global is_streaming, stop_event, client_instance
-    
-    print("🛑 Auto-stopping speech recognition...")
-    
-    with stream_lock:
-        is_streaming = False
-    
-    stop_event.set()
-    
-    # Force disconnect immediately
-    if client_instance:
-        try:
-            client_instance.disconnect(terminate=True)
-        except:
-            pass
+        llm_client.record_fallback(time.time() - start)
+        return random.choice(FALLBACK_RESPONSES)
 
-def start_speech_recognition():
-    """Start AssemblyAI speech recognition and return transcribed text"""
-    global is_streaming, stop_event, client_instance, transcribed_text, transcription_complete, last_audio_time
-    
-    # Reset variables
-    transcribed_text = ""
-    transcription_complete = False
-    stop_event.clear()
-    last_audio_time = time.time()
-    
-    with stream_lock:
-        is_streaming = True
-    
-    print("\n[Starting AssemblyAI speech recognition...]")
-    print("⏰ STT will auto-stop after 5 seconds of silence")
-    
-    # Start silence monitoring in a separate thread
-    timeout_monitor_thread = threading.Thread(target=monitor_silence_timeout, args=(5,), daemon=True)
-    timeout_monitor_thread.start()
-    
-    client = StreamingClient(
-        StreamingClientOptions(
-            api_key=ASSEMBLYAI_API_KEY,
-            api_host="streaming.assemblyai.com",
+def should_end_interview(user_input, analysis=None):
+    """Check if user wants to end the interview"""
+    analysis = analysis or response_matcher.match(user_input)
+    return bool(analysis['end_phrases'])
+
+# ========== TTS FUNCTIONS ==========
+
+def synthesize_audio(text, speaker, sample_rate, put_accent=True, put_yo=True):
+    """Run Silero on whichever inference path is configured: replicas, the batch worker or this thread"""
+    if tts_executor is not None:
+        return tts_executor.submit(text, speaker, sample_rate, put_accent, put_yo)
+    if tts_batch_worker is not None:
+        return tts_batch_worker.submit(text, speaker, sample_rate, put_accent, put_yo)
+    with inference_mode():
+        return model.apply_tts(
+            text=text,
+            speaker=speaker,
+            sample_rate=sample_rate,
+            put_accent=put_accent,
+            put_yo=put_yo,
         )
-    )
-    
-    client_instance = client
 
-    client.on(StreamingEvents.Begin, on_begin)
-    client.on(StreamingEvents.Turn, on_turn)
-    client.on(StreamingEvents.Termination, on_terminated)
-    client.on(StreamingEvents.Error, on_error)
-
-    client.connect(
-        StreamingParameters(
-            sample_rate=16000,
-            format_turns=True
-        )
+def synthesize_pcm(text, speaker, sample_rate, put_accent=True, put_yo=True):
+    """Return PCM16 audio for text, using the TTS cache before running Silero"""
+    cache_key = make_cache_key(text, speaker, sample_rate, put_accent, put_yo, tts_cache_model_id)
+    pcm = tts_cache.get(cache_key)
+    if pcm is not None:
+        return pcm
+
+    start = time.time()
+    pcm = audio_to_pcm16(synthesize_audio(text, speaker, sample_rate, put_accent, put_yo))
+    record_tts_synthesis(time.time() - start, len(pcm) / 2 / sample_rate)
+    tts_cache.put(cache_key, pcm)
+    return pcm
+
+# Greeting and prepared questions are synthesized in the background when a session starts, while /tts is idle.
+# Opt-in: the audio is only reused by /tts requests that send the session_id (test_client.py does).
+TTS_PREFETCH = os.getenv('TTS_PREFETCH', '0') == '1'
+TTS_PREFETCH_SPEAKER = os.getenv('TTS_PREFETCH_SPEAKER', 'en_10')
+TTS_SAMPLE_RATE = 24000
+tts_prefetcher = None
+if TTS_PREFETCH:
+    tts_prefetcher = SessionAudioPrefetcher(
+        synthesize_pcm,
+        max_bytes=int(float(os.getenv('TTS_PREFETCH_MEMORY_MB', '64')) * 1024 * 1024),
+        max_texts=int(os.getenv('TTS_PREFETCH_MAX_TEXTS', '20')),
     )
-
-    try:
-        # Use the controlled microphone stream
-        controlled_stream = ControlledMicrophoneStream(sample_rate=16000)
-        client.stream(controlled_stream)
-            
-    except Exception as e:
-        if not stop_event.is_set():  # Only print error if not intentionally stopped
-            print(f"\n[Error during streaming: {e}]")
-    finally:
-        # Small delay to ensure everything is processed
-        time.sleep(0.1)
-        
+    if not PREFORK_SERVING:
+        tts_prefetcher.start()
+
+def prefetch_session_audio(session, greeting):
+    if tts_prefetcher is not None:
+        texts = [greeting] + [q for q in session.questions if isinstance(q, str)]
+        tts_prefetcher.schedule(session.session_id, texts, TTS_PREFETCH_SPEAKER, TTS_SAMPLE_RATE)
+
+def synthesize_session_pcm(session_id, text, speaker, sample_rate):
+    """synthesize_pcm, reusing the session's pre-synthesized greeting or question when text is or contains one"""
+    if tts_prefetcher is None:
+        return synthesize_pcm(text, speaker, sample_rate)
+    with tts_prefetcher.foreground():
+        segments = tts_prefetcher.lookup(session_id, text, speaker, sample_rate) if session_id else None
+        if segments is None:
+            return synthesize_pcm(text, speaker, sample_rate)
+        parts = []
+        for segment, entry in segments:
+            if entry is not None:
+                try:
+                    parts.append(tts_prefetcher.audio(entry, speaker, sample_rate))
+                    continue
+                except Exception as e:
+                    print(f"⚠️ Prefetched audio unavailable for session {session_id}, synthesizing: {e}")
+            parts.append(synthesize_pcm(segment, speaker, sample_rate))
+        return b''.join(parts)
+
+# ========== PRE-FORK SERVING ==========
+
+# Per-process readiness, reported by /api/health (see gunicorn.conf.py)
+serving_state = {'pid': os.getpid(), 'warmed_up': False, 'warmup_seconds': None, 'warmup_speakers': None,
+                 'torch_threads': torch.get_num_threads() if torch is not None else None, 'tts_optimizations': tts_optimizations}
+
+def after_fork(torch_threads=None):
+    """Re-create per-process state in a worker forked from a master that preloaded this module"""
+    serving_state['pid'] = os.getpid()
+    if torch_threads and torch is not None:
+        # Each worker gets its share of the cores instead of every worker sizing its pool to all of them
+        torch.set_num_threads(torch_threads)
         try:
-            if not stop_event.is_set():
-                client.disconnect(terminate=True)
-        except:
-            pass
-        
-        print("\n[Speech recognition session ended]")
+            torch.set_num_interop_threads(max(1, min(torch_threads, 2)))
+        except RuntimeError:
+            pass  # only settable before the first inter-op parallel work
+    serving_state['torch_threads'] = torch.get_num_threads() if torch is not None else None
     
-    # Reset flags
-    with stream_lock:
-        is_streaming = False
-    stop_event.clear()
-    client_instance = None
+    # Threads do not survive fork: start this worker's own batch worker, revalidation and sweeper.
+    # Replicas fork first, while this worker still runs a single thread.
+    if tts_executor is not None:
+        tts_executor.after_fork()
+        tts_executor.start()
+    if tts_batch_worker is not None:
+        tts_batch_worker.after_fork()
+    if tts_prefetcher is not None:
+        tts_prefetcher.after_fork()
+    model_selector.start_background_revalidation()
+    start_sweeper(interview_sessions)
     
-    return transcribed_text
+    # gRPC channels must not be shared across fork; configure() drops the SDK's clients and the
+    # cached model objects are rebuilt with fresh ones on first use
+    if LLM_BACKEND != 'fake':
+        genai.configure(api_key=GEMINI_API_KEY)
+    llm_client.reset_models()
+    scoring_llm_client.reset_models()
+
+def warm_up(text="Hello! Welcome to your interview.", speakers=None, sample_rate=24000):
+    """Pay the per-process lazy initialization (first Silero inference per speaker) before the worker takes traffic"""
+    start = time.time()
+    serving_state['warmup_speakers'] = warm_up_speakers(synthesize_audio, speakers or TTS_WARMUP_SPEAKERS, text, sample_rate)
+    response_matcher.match(text)
+    serving_state['warmup_seconds'] = round(time.time() - start, 3)
+    serving_state['warmed_up'] = True
+    return serving_state['warmup_seconds']
 
 # ========== FLASK ROUTES ==========
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.time()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_LATENCY.observe(time.time() - started, method=request.method, route=route, status=response.status_code)
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Prometheus text exposition of latency histograms, counters and gauges"""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route("/tts", methods=["POST"])
 def tts():
     data = request.get_json()
     text = data.get("text", "Hello from Silero TTS")
     speaker = data.get("speaker", "en_10")
-    sample_rate = 24000
-
-    # Generate audio
-    audio = model.apply_tts(
-        text=text,
-        speaker=speaker,
-        sample_rate=sample_rate,
-        put_accent=True,
-        put_yo=True,
-    )
+    mode = data.get("mode", TTS_MODE)
+    # With the interview's session_id, its pre-synthesized greeting and questions are served without waiting
+    session_id = data.get("session_id")
+    sample_rate = TTS_SAMPLE_RATE
+
+    if mode not in TTS_MODES:
+        return jsonify({"status": "error", "message": f"Unknown TTS mode '{mode}', expected one of {list(TTS_MODES)}"}), 400
+
+    if mode == "pipeline":
+        # Start sending sentence 1 while the following sentences are still being synthesized
+        sentences = split_sentences(text)
+        return Response(
+            stream_with_context(iter_pipelined_wav(
+                sentences,
+                lambda sentence: synthesize_session_pcm(session_id, sentence, speaker, sample_rate),
+                sample_rate,
+                stats=tts_pipeline_stats,
+                prefetch=TTS_PIPELINE_PREFETCH,
+            )),
+            mimetype="audio/wav",
+            headers={
+                "X-TTS-Speaker": speaker,
+                "X-TTS-Sample-Rate": str(sample_rate),
+                "X-TTS-Sentences": str(len(sentences)),
+            },
+        )
+
+    # Generate audio (served from cache when this exact phrase was synthesized before)
+    synthesis_start = time.time()
+    pcm = synthesize_session_pcm(session_id, text, speaker, sample_rate)
+    synthesis_ms = round((time.time() - synthesis_start) * 1000, 1)
+
+    if mode == "stream":
+        # Send the waveform back as soon as synthesis is done; the request ends when the bytes are sent
+        return Response(
+            stream_with_context(iter_wav_chunks(pcm, sample_rate)),
+            mimetype="audio/wav",
+            headers={
+                "X-TTS-Speaker": speaker,
+                "X-TTS-Sample-Rate": str(sample_rate),
+                "X-TTS-Synthesis-Ms": str(synthesis_ms),
+            },
+        )
 
     # Play audio automatically
-    sd.play(audio, sample_rate)
+    import sounddevice as sd
+    sd.play(pcm16_to_array(pcm), sample_rate)
     sd.wait()
 
     return jsonify({"status": "ok", "text": text, "speaker": speaker})
 
+@app.route("/tts/stats", methods=["GET"])
+def tts_stats():
+    """TTS audio cache counters, pipelined time-to-first-audio figures, batching, replica and prefetch stats"""
+    return jsonify({
+        'cache': tts_cache.stats(),
+        'pipeline': tts_pipeline_stats.snapshot(),
+        'batching': tts_batch_worker.stats() if tts_batch_worker else None,
+        'replicas': tts_executor.stats() if tts_executor else None,
+        'prefetch': tts_prefetcher.stats() if tts_prefetcher else None,
+    })
+
 @app.route("/stt", methods=["GET"])
 def stt():
     """Speech-to-text using AssemblyAI streaming with auto-stop on silence"""
+    session_id = request.args.get("session_id")
     try:
-        print("🎤 Starting speech recognition... (Speak now)")
-        print("⏰ Will auto-stop after 5 seconds of silence")
+        print(f"🎤 Starting speech recognition for {session_id or 'new session'}... (Speak now)")
+        print("⏰ Will auto-stop when you finish speaking (5 seconds if nothing is said)")
         
-        transcribed_text = start_speech_recognition()
+        session_id, transcribed_text = stt_manager.recognize(session_id)
         
         if transcribed_text:
             print(f"✅ Transcribed: {transcribed_text}")
-            return jsonify({"status": "ok", "transcription": transcribed_text})
+            return jsonify({"status": "ok", "transcription": transcribed_text, "session_id": session_id})
         else:
-            return jsonify({"status": "error", "message": "No speech detected"})
-            
+            return jsonify({"status": "error", "message": "No speech detected", "session_id": session_id})
+    
+    except STTSessionBusy as e:
+        return jsonify({"status": "error", "message": str(e), "session_id": session_id}), 409
     except Exception as e:
         print(f"STT Error: {str(e)}")
         return jsonify({"status": "error", "message": f"Speech recognition error: {str(e)}"})
 
 @app.route("/stt/stop", methods=["POST"])
 def stop_stt():
-    """Stop ongoing speech recognition"""
-    global is_streaming, stop_event, client_instance
+    """Stop ongoing speech recognition for one session"""
+    data = request.get_json(silent=True) or {}
+    session_id = data.get("session_id") or request.args.get("session_id")
     
-    print("🛑 Stopping speech recognition...")
+    if not session_id:
+        # Without an id, only stop when it is unambiguous which recognition is meant
+        active = stt_manager.active_keys()
+        if len(active) != 1:
+            return jsonify({"status": "error", "message": f"session_id is required ({len(active)} recognitions active)"}), 400
+        session_id = active[0]
+    
+    if not stt_manager.stop(session_id):
+        return jsonify({"status": "error", "message": f"No speech recognition running for session {session_id}"}), 404
+    
+    return jsonify({"status": "ok", "message": "Speech recognition stopped", "session_id": session_id})
+
+@app.route("/stt/stream/<session_id>", methods=["POST"])
+def stt_stream(session_id):
+    """Speech-to-text on audio uploaded by the client as a chunked request body"""
+    audio_format = request.args.get("format", "pcm16")
+    try:
+        sample_rate, decoder = stt_stream_decoder(audio_format, request.args.get("sample_rate"))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e), "session_id": session_id}), 400
     
-    with stream_lock:
-        is_streaming = False
+    try:
+        stt_session = stt_manager.start(session_id)
+    except STTSessionBusy as e:
+        return jsonify({"status": "error", "message": str(e), "session_id": session_id}), 409
     
-    stop_event.set()
+    ring_buffer = AudioRingBuffer(sample_rate * 2 * STT_INGEST_BUFFER_MS // 1000)
+    result = {}
     
-    # Force disconnect immediately
-    if client_instance:
+    def recognize():
         try:
-            client_instance.disconnect(terminate=True)
-        except:
-            pass
+            result['text'] = stt_session.run(BufferedAudioStream(stt_session, ring_buffer, sample_rate), sample_rate)
+        except Exception as e:
+            result['error'] = e
+        finally:
+            # Unblocks the upload loop if recognition ends first (end of speech, max duration, /stt/stop)
+            ring_buffer.close()
+    
+    print(f"🎤 Receiving {audio_format} audio at {sample_rate} Hz for {session_id}...")
+    worker = threading.Thread(target=recognize, name=f"stt-{session_id}", daemon=True)
+    worker.start()
+    try:
+        while True:
+            chunk = request.stream.read(STT_INGEST_READ_BYTES)
+            if not chunk:
+                break
+            pcm = decoder.decode(chunk)
+            # Blocks while the buffer is full, so a slow recognizer throttles the upload
+            if pcm and not ring_buffer.put(pcm):
+                break
+    except Exception as e:
+        print(f"⚠️ [{session_id}] Audio upload interrupted: {e}")
+    finally:
+        ring_buffer.close()
+        worker.join()
+        stt_manager.finish(stt_session)
     
-    return jsonify({"status": "ok", "message": "Speech recognition stopped"})
+    return jsonify(stt_stream_payload(session_id, result, ring_buffer.stats()))
+
+def stt_stream_decoder(audio_format, sample_rate):
+    """Validate /stt/stream query arguments; returns (sample_rate, decoder) or raises ValueError"""
+    sample_rate = int(sample_rate or STT_SAMPLE_RATE)
+    if not 8000 <= sample_rate <= 48000:
+        raise ValueError(f"sample_rate must be between 8000 and 48000, got {sample_rate}")
+    return sample_rate, make_decoder(audio_format, sample_rate)
+
+def stt_stream_payload(session_id, result, ingest_stats):
+    """Response body for a finished /stt/stream recognition"""
+    if 'error' in result:
+        print(f"STT Error: {result['error']}")
+        return {"status": "error", "message": f"Speech recognition error: {result['error']}", "session_id": session_id, "ingest": ingest_stats}
+    transcribed_text = result.get('text')
+    if transcribed_text:
+        print(f"✅ Transcribed: {transcribed_text}")
+        return {"status": "ok", "transcription": transcribed_text, "session_id": session_id, "ingest": ingest_stats}
+    return {"status": "error", "message": "No speech detected", "session_id": session_id, "ingest": ingest_stats}
 
 @app.route('/api/start-interview', methods=['POST'])
 def start_interview():
@@ -814,12 +1200,13 @@ def start_interview():
         
         session_id = str(uuid.uuid4())
         interview_session = InterviewSession(session_id, interview_data)
-        interview_sessions[session_id] = interview_session
         
         # Generate initial greeting asking for introduction
         initial_response = generate_initial_greeting(interview_session)
         interview_session.add_message("assistant", initial_response)
         interview_session.question_count += 1
+        interview_sessions.save(interview_session)
+        prefetch_session_audio(interview_session, initial_response)
         
         print(f"✅ Interview session started: {session_id}")
         print(f"📝 First question: {initial_response}")
@@ -866,116 +1253,207 @@ Please share your introduction and confirm these details."""
 
 Please share your introduction and confirm these details."""
 
+def session_conflict_response(error):
+    """409 for a save that lost a race with another request on the same session; the client can retry"""
+    print(f"⚠️ {error}")
+    return jsonify({'error': str(error), 'retry': True}), 409
+
+def load_respond_request(data):
+    """Validate a respond request body; returns (interview_session, candidate_response, error_response)"""
+    session_id = data.get('session_id')
+    candidate_response = data.get('response', '').strip()
+    
+    print(f"📨 Received response for session {session_id}: {candidate_response[:50]}...")
+    
+    interview_session = interview_sessions.get(session_id) if session_id else None
+    if not interview_session:
+        return None, None, (jsonify({'error': 'Invalid session ID'}), 400)
+    
+    if not candidate_response:
+        return None, None, (jsonify({'error': 'Response is required'}), 400)
+    
+    # Check if interview is completed
+    if interview_session.is_completed:
+        return None, None, (jsonify({'error': 'Interview already completed'}), 400)
+    
+    return interview_session, candidate_response, None
+
+def close_interview(interview_session, candidate_response):
+    """Keep the last answer on a stop phrase and mark the interview completed"""
+    print(f"🏁 Ending interview session: {interview_session.session_id}")
+    
+    # Store the last question-answer pair if available
+    if interview_session.conversation_history and len(interview_session.conversation_history) >= 2:
+        last_question = interview_session.conversation_history[-2]['content'] if interview_session.conversation_history[-2]['role'] == 'assistant' else "Introduction question"
+        interview_session.add_qa_pair(last_question, candidate_response)
+    
+    # No more questions will be spoken
+    if tts_prefetcher is not None:
+        tts_prefetcher.forget(interview_session.session_id)
+    
+    reserve_feedback_job(interview_session)
+
+def completed_payload(interview_session, farewell_message):
+    """Store the farewell, save the completed session, then queue the feedback job and build the payload"""
+    interview_session.add_message("assistant", farewell_message)
+    interview_sessions.save(interview_session)
+    
+    # Generate overall feedback in the background
+    job = start_feedback_job(interview_session)
+    payload = {
+        'session_id': interview_session.session_id,
+        'message': farewell_message,
+        **feedback_job_fields(job),
+        'question_number': interview_session.question_count,
+        'total_questions_asked': interview_session.question_count,
+        'status': 'completed',
+        'is_final_message': True,
+        'candidate_info': interview_session.candidate_info,
+        'duration_minutes': round((datetime.now() - interview_session.start_time).total_seconds() / 60, 2)
+    }
+    return payload
+
+def finish_interview(interview_session, candidate_response):
+    """Close the interview on a stop phrase and build the completed payload"""
+    close_interview(interview_session, candidate_response)
+    farewell_message = generate_ai_response(interview_session.conversation_history, is_final_feedback=True, interview_session=interview_session)
+    return completed_payload(interview_session, farewell_message)
+
+def record_candidate_turn(interview_session, candidate_response, analysis=None):
+    """Store the candidate's answer before the next question is generated"""
+    # Extract candidate information from response
+    interview_session.extract_candidate_info(candidate_response, analysis)
+    
+    # Store the previous question and current answer for feedback
+    if interview_session.conversation_history and interview_session.conversation_history[-1]['role'] == 'assistant':
+        last_question = interview_session.conversation_history[-1]['content']
+        interview_session.add_qa_pair(last_question, candidate_response)
+    
+    # Add candidate's response to history
+    interview_session.add_message("user", candidate_response, analysis)
+
+def record_next_question(interview_session, ai_response):
+    """Store the interviewer's next question and build the in-progress payload"""
+    interview_session.add_message("assistant", ai_response)
+    interview_session.question_count += 1
+    
+    print(f"🤖 Next question: {ai_response}")
+    interview_sessions.save(interview_session)
+    
+    return {
+        'session_id': interview_session.session_id,
+        'message': ai_response,
+        'question_number': interview_session.question_count,
+        'status': 'in_progress',
+        'candidate_info': interview_session.candidate_info,
+        'has_question_limit': False
+    }
+
+def sse_event(event, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @app.route('/api/respond', methods=['POST'])
 def respond_to_question():
     """Process candidate's response and get next question or end interview"""
     try:
-        data = request.json
-        session_id = data.get('session_id')
-        candidate_response = data.get('response', '').strip()
-        
-        print(f"📨 Received response for session {session_id}: {candidate_response[:50]}...")
-        
-        if not session_id or session_id not in interview_sessions:
-            return jsonify({'error': 'Invalid session ID'}), 400
+        interview_session, candidate_response, error = load_respond_request(request.json)
+        if error:
+            return error
         
-        if not candidate_response:
-            return jsonify({'error': 'Response is required'}), 400
-        
-        interview_session = interview_sessions[session_id]
-        
-        # Check if interview is completed
-        if interview_session.is_completed:
-            return jsonify({'error': 'Interview already completed'}), 400
+        # One pass over the answer finds end intent, skills and experience level together
+        analysis = response_matcher.match(candidate_response)
         
         # Check if user wants to end the interview
-        if should_end_interview(candidate_response):
-            print(f"🏁 Ending interview session: {session_id}")
-            interview_session.is_completed = True
-            
-            # Store the last question-answer pair if available
-            if interview_session.conversation_history and len(interview_session.conversation_history) >= 2:
-                last_question = interview_session.conversation_history[-2]['content'] if interview_session.conversation_history[-2]['role'] == 'assistant' else "Introduction question"
-                interview_session.add_qa_pair(last_question, candidate_response)
-            
-            # Generate overall feedback
-            feedback = generate_overall_feedback(
-                interview_session.conversation_history,
-                interview_session.candidate_info,
-                interview_session.all_questions_answers
-            )
-            
-            # Add final message
-            farewell_message = generate_ai_response(interview_session.conversation_history, is_final_feedback=True, interview_session=interview_session)
-            interview_session.add_message("assistant", farewell_message)
-            
-            return jsonify({
-                'session_id': session_id,
-                'message': farewell_message,
-                'feedback': feedback,
-                'question_number': interview_session.question_count,
-                'total_questions_asked': interview_session.question_count,
-                'status': 'completed',
-                'is_final_message': True,
-                'candidate_info': interview_session.candidate_info,
-                'duration_minutes': round((datetime.now() - interview_session.start_time).total_seconds() / 60, 2)
-            })
-        
-        # Extract candidate information from response
-        interview_session.extract_candidate_info(candidate_response)
+        if should_end_interview(candidate_response, analysis):
+            return jsonify(finish_interview(interview_session, candidate_response))
         
-        # Store the previous question and current answer for feedback
-        if interview_session.conversation_history and interview_session.conversation_history[-1]['role'] == 'assistant':
-            last_question = interview_session.conversation_history[-1]['content']
-            interview_session.add_qa_pair(last_question, candidate_response)
-        
-        # Add candidate's response to history
-        interview_session.add_message("user", candidate_response)
+        record_candidate_turn(interview_session, candidate_response, analysis)
         
         # Generate next question with contextual awareness
         ai_response = generate_ai_response(interview_session.conversation_history, interview_session=interview_session)
-        interview_session.add_message("assistant", ai_response)
-        interview_session.question_count += 1
+        return jsonify(record_next_question(interview_session, ai_response))
+    
+    except SessionConflict as e:
+        return session_conflict_response(e)
+    except Exception as e:
+        print(f"❌ Error processing response: {str(e)}")
+        return jsonify({'error': f'Failed to process response: {str(e)}'}), 500
+
+@app.route('/api/respond/stream', methods=['POST'])
+def respond_to_question_stream():
+    """Same as /api/respond, but streams the next question as Server-Sent Events.
+
+    Emits `token` events ({"text": ...}) as the LLM produces them, then one
+    `done` event carrying the same fields /api/respond returns.
+    """
+    try:
+        interview_session, candidate_response, error = load_respond_request(request.json)
+        if error:
+            return error
         
-        print(f"🤖 Next question: {ai_response}")
+        sse_headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
         
-        return jsonify({
-            'session_id': session_id,
-            'message': ai_response,
-            'question_number': interview_session.question_count,
-            'status': 'in_progress',
-            'candidate_info': interview_session.candidate_info,
-            'has_question_limit': False
-        })
+        analysis = response_matcher.match(candidate_response)
+        if should_end_interview(candidate_response, analysis):
+            payload = finish_interview(interview_session, candidate_response)
+            return Response(sse_event('done', payload), mimetype='text/event-stream', headers=sse_headers)
+        
+        record_candidate_turn(interview_session, candidate_response, analysis)
+        prompt = build_ai_prompt(interview_session.conversation_history, interview_session=interview_session)
     
+    except SessionConflict as e:
+        return session_conflict_response(e)
     except Exception as e:
         print(f"❌ Error processing response: {str(e)}")
         return jsonify({'error': f'Failed to process response: {str(e)}'}), 500
+    
+    def events():
+        parts = []
+        start = time.time()
+        try:
+            for text in llm_client.stream(prompt):
+                parts.append(text)
+                yield sse_event('token', {'text': text})
+            ai_response = "".join(parts).strip() or EMPTY_RESPONSE_FALLBACK
+        except Exception as e:
+            print(f"Gemini API Error: {str(e)}")
+            if not parts:
+                llm_client.record_fallback(time.time() - start)
+            ai_response = "".join(parts).strip() or random.choice(FALLBACK_RESPONSES)
+        
+        if not parts:
+            yield sse_event('token', {'text': ai_response})
+        try:
+            yield sse_event('done', record_next_question(interview_session, ai_response))
+        except SessionConflict as e:
+            yield sse_event('error', {'error': str(e), 'status': 409})
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers=sse_headers)
 
 @app.route('/api/end-interview/<session_id>', methods=['POST'])
 def end_interview(session_id):
     """End an interview session manually"""
-    if session_id not in interview_sessions:
+    interview_session = interview_sessions.get(session_id)
+    if not interview_session:
         return jsonify({'error': 'Session not found'}), 404
     
-    interview_session = interview_sessions[session_id]
-    
     if not interview_session.is_completed:
-        interview_session.is_completed = True
+        reserve_feedback_job(interview_session)
+        try:
+            interview_sessions.save(interview_session)
+        except SessionConflict as e:
+            return session_conflict_response(e)
         
-        # Generate overall feedback
-        feedback = generate_overall_feedback(
-            interview_session.conversation_history,
-            interview_session.candidate_info,
-            interview_session.all_questions_answers
-        )
+        # Generate overall feedback in the background
+        job = start_feedback_job(interview_session)
         
         # Generate farewell message
         farewell_message = "Thank you for your participation in this interview. The session has been concluded."
         
         return jsonify({
             'message': farewell_message,
-            'feedback': feedback,
+            **feedback_job_fields(job),
             'session_id': session_id,
             'status': 'ended',
             'total_questions_asked': interview_session.question_count,
@@ -988,11 +1466,10 @@ def end_interview(session_id):
 @app.route('/api/interview-status/<session_id>', methods=['GET'])
 def get_interview_status(session_id):
     """Get current status of an interview session"""
-    if session_id not in interview_sessions:
+    interview_session = interview_sessions.get(session_id)
+    if not interview_session:
         return jsonify({'error': 'Session not found'}), 404
     
-    interview_session = interview_sessions[session_id]
-    
     return jsonify({
         'session_id': session_id,
         'question_number': interview_session.question_count,
@@ -1000,16 +1477,39 @@ def get_interview_status(session_id):
         'start_time': interview_session.start_time.isoformat(),
         'duration_minutes': round((datetime.now() - interview_session.start_time).total_seconds() / 60, 2),
         'candidate_info': interview_session.candidate_info,
+        'feedback_job_id': interview_session.feedback_job_id,
+        'answer_scores': answer_scorer.sync(interview_session) if answer_scorer is not None else None,
         'has_question_limit': False
     })
 
+@app.route('/api/sessions/stats', methods=['GET'])
+def get_session_stats():
+    """Session store size and eviction metrics"""
+    return jsonify(interview_sessions.stats())
+
+@app.route('/api/feedback/<job_id>', methods=['GET'])
+def get_feedback(job_id):
+    """Get status and result of a background feedback job"""
+    job = feedback_jobs.lookup(job_id)
+    if not job:
+        return jsonify({'error': 'Feedback job not found'}), 404
+    
+    return jsonify(job)
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy', 
         'service': 'Interview API',
-        'model': WORKING_MODEL
+        'model': model_selector.current,
+        'model_selection': model_selector.health(),
+        'llm': llm_client.stats(),
+        'prompt_context': prompt_contexts.stats(),
+        'conversation_budget': conversation_budget.stats(),
+        'answer_scoring': answer_scorer.stats() if answer_scorer is not None else None,
+        'scoring_llm': scoring_llm_client.stats() if answer_scorer is not None else None,
+        'worker': serving_state
     })
 
 @app.route('/api/models', methods=['GET'])
@@ -1021,7 +1521,7 @@ def get_models():
         for model in models:
             if 'generateContent' in model.supported_generation_methods:
                 available_models.append(model.name)
-        return jsonify({'available_models': available_models, 'current_model': WORKING_MODEL})
+        return jsonify({'available_models': available_models, 'current_model': model_selector.current})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1032,13 +1532,19 @@ def home():
     return jsonify({
         "message": "Speech and Interview Server is running!",
         "routes": {
-            "POST /tts": "Convert text to speech",
-            "GET /stt": "Convert microphone speech to text",
-            "POST /stt/stop": "Stop ongoing speech recognition",
+            "POST /tts": "Convert text to speech (mode: play on server, stream WAV back, or pipeline sentence by sentence; pass session_id to reuse its pre-synthesized greeting and questions)",
+            "GET /tts/stats": "TTS cache, pipeline, batching, replica and prefetch statistics",
+            "GET /stt": "Convert microphone speech to text (?session_id=<interview session>)",
+            "POST /stt/stream/<session_id>": "Convert client-uploaded audio to text (chunked body; ?format=pcm16|opus&sample_rate=16000)",
+            "POST /stt/stop": "Stop ongoing speech recognition for a session",
             "POST /api/start-interview": "Start a new interview session",
             "POST /api/respond": "Respond to interview question",
+            "POST /api/respond/stream": "Respond to interview question, streaming the reply as Server-Sent Events",
             "GET /api/interview-status/<session_id>": "Get interview status",
             "POST /api/end-interview/<session_id>": "End interview session",
+            "GET /api/feedback/<job_id>": "Get end-of-interview feedback (poll until completed)",
+            "GET /api/sessions/stats": "Session store size and eviction metrics",
+            "GET /metrics": "Prometheus metrics: per-route, LLM, TTS and STT latency histograms, session counts",
             "GET /api/health": "Health check",
             "GET /api/models": "Get available models"
         }
@@ -1049,26 +1555,40 @@ def home():
 if __name__ == "__main__":
     port = 5000
     print(f"🚀 Combined Speech and Interview Server running at http://127.0.0.1:{port}")
-    print(f"🎯 Using Gemini model: ")
+    print(f"🎯 Using Gemini model: {model_selector.current}")
     print(f"🎤 Using AssemblyAI for speech recognition")
-    print("⏰ STT Auto-stop: 5 seconds of silence")
+    print("⏰ STT Auto-stop: end-of-speech detection, adapted to each candidate's pauses")
     print("📝 Available endpoints:")
     print("   GET  /")
     print("   POST /tts")
+    print("   GET  /tts/stats")
     print("   GET  /stt")
+    print("   POST /stt/stream/<session_id>")
     print("   POST /stt/stop")
     print("   POST /api/start-interview")
     print("   POST /api/respond")
+    print("   POST /api/respond/stream")
     print("   GET  /api/interview-status/<session_id>")
     print("   POST /api/end-interview/<session_id>")
+    print("   GET  /api/feedback/<job_id>")
+    print("   GET  /api/sessions/stats")
+    print("   GET  /metrics")
     print("   GET  /api/health")
     print("   GET  /api/models")
     print("\n✨ Features:")
     print("   - Text-to-Speech (TTS) with Silero")
-    print("   - Speech-to-Text (STT) with AssemblyAI Streaming")
-    print("   - Auto-stop after 5 seconds of silence")
+    print(f"   - TTS mode: {TTS_MODE} (send 'mode': 'stream' or 'pipeline' to get WAV audio back)")
+    if tts_executor is not None:
+        print(f"   - TTS replicas: {len(tts_executor.stats()['replicas'])} x {tts_executor.threads_per_replica} torch threads, pinned to their own cores")
+    print(f"   - Speech-to-Text (STT) with {'AssemblyAI Streaming' if STT_BACKEND == 'assemblyai' else f'{STT_BACKEND} stand-in recognizer'}")
+    print("   - Client audio upload for STT (PCM16 or Opus) with backpressure")
+    print("   - Auto-stop when the candidate finishes speaking (voice activity endpointing)")
     print("   - AI-powered interview sessions with Gemini")
     print("   - No question limit - interview continues until you stop")
-    print("   - Automatic brief feedback at the end")
+    print("   - Automatic brief feedback at the end (generated in the background)")
+    print("   - Async serving mode for many concurrent interviews: uvicorn asgi:app")
+    print("   - Production: gunicorn -c gunicorn.conf.py (model loaded once, shared by forked workers)")
     
+    if TTS_OPTIMIZE != '0':
+        print(f"🔥 TTS warm-up for {', '.join(TTS_WARMUP_SPEAKERS)}: {warm_up()}s")
     app.run(host="0.0.0.0", port=port, debug=True)
\ No newline at end of file
@@ -0,0 +1,503 @@
+"""ASGI serving mode for the interview API.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000     (any ASGI server works)
+
+Under app.run() or a WSGI server every request holds a thread for its whole
+lifetime: /api/respond for the full Gemini call, /stt/stream for the whole
+recognition. Here the routes that spend their time waiting are coroutines:
+
+- /api/respond and /api/respond/stream await Gemini on the SDK's async
+  transport (LLMClient.generate_async / stream_async).
+- /stt/stream reads the upload with ASGI receive() and backs off with
+  asyncio.sleep while the audio ring buffer is full. Recognition itself
+  still runs on its STT thread (VAD + recognizer websocket), as before.
+
+Every other route listed in home() is served by the same Flask app through a
+WSGI bridge on bounded executors. /tts (Silero synthesis, CPU bound) gets its
+own TTS_ASYNC_WORKERS executor and /stt (server microphone) its own small
+one, so neither can take more threads than configured. Sessions, stores,
+metrics and background jobs are the ones app.py creates, so responses are
+identical in both modes.
+"""
+import asyncio
+import concurrent.futures
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import app as interview
+from audio_ingest import AudioRingBuffer, BufferedAudioStream
+from session_store import SessionConflict
+from stt_manager import STTSessionBusy
+
+flask_app = interview.app
+
+# Bridged Flask routes: blocking work runs on these, never on the event loop
+wsgi_executor = ThreadPoolExecutor(max_workers=int(os.getenv('ASYNC_WSGI_WORKERS', '8')), thread_name_prefix='wsgi')
+tts_executor = ThreadPoolExecutor(max_workers=int(os.getenv('TTS_ASYNC_WORKERS', '2')), thread_name_prefix='tts')
+stt_executor = ThreadPoolExecutor(max_workers=int(os.getenv('STT_ASYNC_MIC_WORKERS', '1')), thread_name_prefix='stt-mic')
+# Session store reads and writes from native routes (SQLite I/O with SESSION_STORE=sqlite)
+session_executor = ThreadPoolExecutor(max_workers=int(os.getenv('ASYNC_SESSION_WORKERS', '4')), thread_name_prefix='session')
+
+# How often an upload blocked on a full audio buffer checks for space again
+INGEST_POLL_SECONDS = float(os.getenv('STT_INGEST_POLL_MS', '10')) / 1000
+# Chunks a bridged streaming response may run ahead of the client
+WSGI_STREAM_QUEUE = 8
+# How long a bridged thread waits for queue space before re-checking whether the client is still there
+WSGI_PUT_TIMEOUT_SECONDS = 1.0
+
+SSE_HEADERS = [(b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no')]
+
+
+class Request:
+    def __init__(self, scope, receive):
+        self.scope = scope
+        self.receive = receive
+        self.method = scope['method']
+        self.path = scope['path']
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        self.args = {name: values[-1] for name, values in query.items()}
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope.get('headers', ())}
+
+    async def chunks(self):
+        """Request body chunks as they arrive"""
+        while True:
+            message = await self.receive()
+            if message['type'] == 'http.disconnect':
+                raise ConnectionError("Client disconnected")
+            body = message.get('body', b'')
+            if body:
+                yield body
+            if not message.get('more_body'):
+                return
+
+    async def body(self):
+        return b''.join([chunk async for chunk in self.chunks()])
+
+    async def json(self):
+        body = await self.body()
+        return json.loads(body) if body else None
+
+
+# ========== RESPONSES ==========
+
+def cors_headers(request):
+    """What flask_cors adds with supports_credentials=True"""
+    origin = request.headers.get('origin')
+    if not origin:
+        return []
+    return [(b'access-control-allow-origin', origin.encode('latin-1')),
+            (b'access-control-allow-credentials', b'true'),
+            (b'vary', b'Origin')]
+
+
+async def send_body(send, request, status, body, content_type, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type), (b'content-length', str(len(body)).encode())]
+                   + list(headers) + cors_headers(request),
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_flask_response(send, request, result):
+    """Send a Response or (Response, status) pair as returned by one of app.py's helpers"""
+    response, status = result if isinstance(result, tuple) else (result, None)
+    await send_body(send, request, status or response.status_code, response.get_data(),
+                    response.content_type.encode('latin-1'))
+
+
+async def send_json(send, request, payload, status=200):
+    """Same body and headers as flask.jsonify"""
+    with flask_app.app_context():
+        response = flask_app.json.response(payload)
+    await send_flask_response(send, request, (response, status))
+
+
+async def send_stream(send, request, content_type, chunks, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', content_type)] + list(headers) + cors_headers(request),
+    })
+    async for chunk in chunks:
+        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def in_thread(executor, fn, *args):
+    """Run a blocking call (session store, locks) off the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+def load_respond_request(data):
+    with flask_app.app_context():
+        return interview.load_respond_request(data)
+
+
+# ========== LLM ==========
+
+async def generate_ai_response_async(conversation_history, is_final_feedback=False, interview_session=None):
+    """generate_ai_response() that awaits Gemini instead of blocking a thread"""
+    start = time.time()
+    try:
+        prompt = interview.build_ai_prompt(conversation_history, is_final_feedback, interview_session)
+        response_text = await interview.llm_client.generate_async(prompt)
+        return response_text or interview.EMPTY_RESPONSE_FALLBACK
+
+    except Exception as e:
+        print(f"Gemini API Error: {str(e)}")
+        interview.llm_client.record_fallback(time.time() - start)
+        return random.choice(interview.FALLBACK_RESPONSES)
+
+
+async def finish_interview_async(interview_session, candidate_response):
+    await in_thread(session_executor, interview.close_interview, interview_session, candidate_response)
+    farewell_message = await generate_ai_response_async(interview_session.conversation_history, is_final_feedback=True,
+                                                        interview_session=interview_session)
+    return await in_thread(session_executor, interview.completed_payload, interview_session, farewell_message)
+
+
+# ========== NATIVE ROUTES ==========
+
+async def respond_to_question(request, send):
+    """Async /api/respond"""
+    try:
+        data = await request.json()
+        interview_session, candidate_response, error = await in_thread(session_executor, load_respond_request, data)
+        if error:
+            return await send_flask_response(send, request, error)
+
+        analysis = interview.response_matcher.match(candidate_response)
+        if interview.should_end_interview(candidate_response, analysis):
+            return await send_json(send, request, await finish_interview_async(interview_session, candidate_response))
+
+        interview.record_candidate_turn(interview_session, candidate_response, analysis)
+        ai_response = await generate_ai_response_async(interview_session.conversation_history, interview_session=interview_session)
+        payload = await in_thread(session_executor, interview.record_next_question, interview_session, ai_response)
+        await send_json(send, request, payload)
+
+    except SessionConflict as e:
+        await send_json(send, request, {'error': str(e), 'retry': True}, 409)
+    except Exception as e:
+        print(f"❌ Error processing response: {str(e)}")
+        await send_json(send, request, {'error': f'Failed to process response: {str(e)}'}, 500)
+
+
+async def respond_to_question_stream(request, send):
+    """Async /api/respond/stream: `token` events as Gemini produces them, then `done`"""
+    try:
+        data = await request.json()
+        interview_session, candidate_response, error = await in_thread(session_executor, load_respond_request, data)
+        if error:
+            return await send_flask_response(send, request, error)
+
+        analysis = interview.response_matcher.match(candidate_response)
+        if interview.should_end_interview(candidate_response, analysis):
+            payload = await finish_interview_async(interview_session, candidate_response)
+            body = interview.sse_event('done', payload).encode('utf-8')
+            return await send_body(send, request, 200, body, b'text/event-stream; charset=utf-8', SSE_HEADERS)
+
+        interview.record_candidate_turn(interview_session, candidate_response, analysis)
+        prompt = interview.build_ai_prompt(interview_session.conversation_history, interview_session=interview_session)
+
+    except SessionConflict as e:
+        return await send_json(send, request, {'error': str(e), 'retry': True}, 409)
+    except Exception as e:
+        print(f"❌ Error processing response: {str(e)}")
+        return await send_json(send, request, {'error': f'Failed to process response: {str(e)}'}, 500)
+
+    async def events():
+        parts = []
+        start = time.time()
+        try:
+            async for text in interview.llm_client.stream_async(prompt):
+                parts.append(text)
+                yield interview.sse_event('token', {'text': text}).encode('utf-8')
+            ai_response = "".join(parts).strip() or interview.EMPTY_RESPONSE_FALLBACK
+        except Exception as e:
+            print(f"Gemini API Error: {str(e)}")
+            if not parts:
+                interview.llm_client.record_fallback(time.time() - start)
+            ai_response = "".join(parts).strip() or random.choice(interview.FALLBACK_RESPONSES)
+
+        if not parts:
+            yield interview.sse_event('token', {'text': ai_response}).encode('utf-8')
+        try:
+            payload = await in_thread(session_executor, interview.record_next_question, interview_session, ai_response)
+        except SessionConflict as e:
+            yield interview.sse_event('error', {'error': str(e), 'status': 409}).encode('utf-8')
+            return
+        yield interview.sse_event('done', payload).encode('utf-8')
+
+    await send_stream(send, request, b'text/event-stream; charset=utf-8', events(), SSE_HEADERS)
+
+
+async def put_audio(ring_buffer, data):
+    """ring_buffer.put() without blocking the event loop; False once the recognition has ended"""
+    view = memoryview(data)
+    while view:
+        written = ring_buffer.write_some(view)
+        if written is None:
+            return False
+        view = view[written:]
+        if view:
+            # Buffer full: stop reading the body so flow control pushes back on the client
+            blocked_at = time.time()
+            await asyncio.sleep(INGEST_POLL_SECONDS)
+            ring_buffer.add_blocked_time(time.time() - blocked_at)
+    return True
+
+
+async def stt_stream(request, send, session_id):
+    """Async /stt/stream/<session_id>"""
+    audio_format = request.args.get("format", "pcm16")
+    try:
+        sample_rate, decoder = interview.stt_stream_decoder(audio_format, request.args.get("sample_rate"))
+    except ValueError as e:
+        return await send_json(send, request, {"status": "error", "message": str(e), "session_id": session_id}, 400)
+
+    try:
+        stt_session = await in_thread(session_executor, interview.stt_manager.start, session_id)
+    except STTSessionBusy as e:
+        return await send_json(send, request, {"status": "error", "message": str(e), "session_id": session_id}, 409)
+
+    ring_buffer = AudioRingBuffer(sample_rate * 2 * interview.STT_INGEST_BUFFER_MS // 1000)
+    result = {}
+    loop = asyncio.get_running_loop()
+    finished = asyncio.Event()
+
+    def recognize():
+        try:
+            result['text'] = stt_session.run(BufferedAudioStream(stt_session, ring_buffer, sample_rate), sample_rate)
+        except Exception as e:
+            result['error'] = e
+        finally:
+            ring_buffer.close()
+            loop.call_soon_threadsafe(finished.set)
+
+    print(f"🎤 Receiving {audio_format} audio at {sample_rate} Hz for {session_id}...")
+    threading.Thread(target=recognize, name=f"stt-{session_id}", daemon=True).start()
+    try:
+        async for chunk in request.chunks():
+            pcm = decoder.decode(chunk)
+            if pcm and not await put_audio(ring_buffer, pcm):
+                break
+    except Exception as e:
+        print(f"⚠️ [{session_id}] Audio upload interrupted: {e}")
+    finally:
+        ring_buffer.close()
+        await finished.wait()
+        await in_thread(session_executor, interview.stt_manager.finish, stt_session)
+
+    await send_json(send, request, interview.stt_stream_payload(session_id, result, ring_buffer.stats()))
+
+
+# ========== WSGI BRIDGE ==========
+
+def wsgi_environ(request, body):
+    scope = request.scope
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': request.method,
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': request.path,
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': _BytesInput(body),
+        'wsgi.errors': _Errors(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class _BytesInput:
+    def __init__(self, data):
+        self._data = memoryview(data)
+        self._pos = 0
+
+    def read(self, size=-1):
+        end = len(self._data) if size is None or size < 0 else min(len(self._data), self._pos + size)
+        chunk = bytes(self._data[self._pos:end])
+        self._pos = end
+        return chunk
+
+    def readline(self, size=-1):
+        rest = bytes(self._data[self._pos:])
+        newline = rest.find(b'\n')
+        end = len(rest) if newline < 0 else newline + 1
+        if size is not None and size >= 0:
+            end = min(end, size)
+        return self.read(end)
+
+    def __iter__(self):
+        return iter(self.readline, b'')
+
+
+class _Errors:
+    def write(self, message):
+        print(message, end='')
+
+    def flush(self):
+        pass
+
+
+async def call_flask(request, send, executor):
+    """Run the Flask app for this request on executor and relay its (possibly streamed) response.
+
+    The whole WSGI call, including iterating a streamed body, stays on one
+    executor thread so Flask's request context is pushed and popped there.
+    """
+    environ = wsgi_environ(request, await request.body())
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(WSGI_STREAM_QUEUE)
+    # Set once the relay below stops reading (finished, client gone, task cancelled)
+    abandoned = threading.Event()
+
+    def put(item):
+        while not abandoned.is_set():
+            pending = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            try:
+                return pending.result(WSGI_PUT_TIMEOUT_SECONDS)
+            except concurrent.futures.TimeoutError:
+                pending.cancel()
+        raise _RelayAbandoned()
+
+    def run():
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+        try:
+            iterable = flask_app(environ, start_response)
+            try:
+                put(('start', started))
+                for chunk in iterable:
+                    if chunk:
+                        put(('body', chunk))
+            finally:
+                # Also on abandonment, so streamed generators (TTS pipeline) stop synthesizing
+                if hasattr(iterable, 'close'):
+                    iterable.close()
+            put(('end', None))
+        except _RelayAbandoned:
+            pass
+        except Exception as e:
+            try:
+                put(('error', e))
+            except _RelayAbandoned:
+                pass
+
+    future = loop.run_in_executor(executor, run)
+    started = False
+    try:
+        while True:
+            kind, value = await queue.get()
+            if kind == 'start':
+                await send({'type': 'http.response.start', 'status': value['status'], 'headers': value['headers']})
+                started = True
+            elif kind == 'body':
+                await send({'type': 'http.response.body', 'body': value, 'more_body': True})
+            elif kind == 'error':
+                print(f"❌ Error serving {request.method} {request.path}: {value}")
+                if started:
+                    # Headers already said 200: abort the connection rather than end a truncated body cleanly
+                    raise value
+                await send_json(send, request, {'error': str(value)}, 500)
+                break
+            else:
+                await send({'type': 'http.response.body', 'body': b''})
+                break
+    finally:
+        abandoned.set()
+        # Free a put() that is waiting for space so the bridged thread notices and closes its iterable
+        while not queue.empty():
+            queue.get_nowait()
+    await future
+
+
+class _RelayAbandoned(Exception):
+    """Raised in a bridged thread once nothing reads its response anymore"""
+
+
+# ========== ROUTING ==========
+
+def _compile(rule):
+    return re.compile('^' + re.sub(r'<(\w+)>', r'(?P<\1>[^/]+)', rule) + '$')
+
+
+# (method, Flask-style rule, handler); the rule doubles as the HTTP metrics label
+NATIVE_ROUTES = [
+    ('POST', '/api/respond', respond_to_question),
+    ('POST', '/api/respond/stream', respond_to_question_stream),
+    ('POST', '/stt/stream/<session_id>', stt_stream),
+]
+_NATIVE = [(method, rule, _compile(rule), handler) for method, rule, handler in NATIVE_ROUTES]
+
+# Bridged routes with their own executor; everything else uses wsgi_executor
+BRIDGE_EXECUTORS = {
+    ('POST', '/tts'): tts_executor,
+    ('GET', '/stt'): stt_executor,
+}
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if interview.TTS_OPTIMIZE != '0' and not interview.serving_state['warmed_up']:
+                    await asyncio.get_running_loop().run_in_executor(tts_executor, interview.warm_up)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+
+    request = Request(scope, receive)
+    for method, rule, pattern, handler in _NATIVE:
+        match = pattern.match(request.path)
+        if match and request.method == method:
+            status = {}
+
+            async def send_and_record(message):
+                if message['type'] == 'http.response.start':
+                    status['code'] = message['status']
+                await send(message)
+
+            started = time.time()
+            try:
+                await handler(request, send_and_record, **match.groupdict())
+            finally:
+                interview.HTTP_LATENCY.observe(time.time() - started, method=method, route=rule,
+                                               status=status.get('code', 500))
+            return
+
+    # Flask handles everything else, including CORS preflight and 404/405
+    executor = BRIDGE_EXECUTORS.get((request.method, request.path), wsgi_executor)
+    await call_flask(request, send, executor)
@@ -0,0 +1,205 @@
+"""Client-audio ingestion for streaming STT.
+
+Instead of recording from the server's own microphone, clients upload audio
+(PCM16 or length-prefixed Opus packets) in a chunked POST body. Decoded PCM
+goes through a bounded ring buffer into the recognizer: when the upstream
+recognizer is slower than the upload, put() blocks, the request handler stops
+reading the body and TCP flow control pushes back on the client instead of
+audio piling up in memory.
+"""
+import struct
+import threading
+import time
+
+try:
+    import opuslib
+except ImportError:  # Opus uploads are optional
+    opuslib = None
+
+SAMPLE_WIDTH = 2
+
+
+class AudioRingBuffer:
+    """Fixed-capacity byte ring buffer with blocking put/get"""
+
+    def __init__(self, capacity_bytes):
+        self.capacity = capacity_bytes
+        self._buffer = bytearray(capacity_bytes)
+        self._start = 0
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.blocked_seconds = 0.0
+        self.high_water = 0
+
+    def put(self, data, timeout=None):
+        """Write all of data, blocking while the buffer is full; returns False if closed or timed out"""
+        view = memoryview(data)
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while view:
+                if self._closed:
+                    return False
+                free = self.capacity - self._size
+                if not free:
+                    blocked_at = time.time()
+                    remaining = None if deadline is None else deadline - blocked_at
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                    self.blocked_seconds += time.time() - blocked_at
+                    continue
+                n = min(free, len(view))
+                end = (self._start + self._size) % self.capacity
+                first = min(n, self.capacity - end)
+                self._buffer[end:end + first] = view[:first]
+                self._buffer[:n - first] = view[first:n]
+                self._size += n
+                self.bytes_in += n
+                self.high_water = max(self.high_water, self._size)
+                view = view[n:]
+                self._cond.notify_all()
+        return True
+
+    def write_some(self, data):
+        """Write as much of data as fits without blocking; returns the byte count, or None once closed"""
+        with self._cond:
+            if self._closed:
+                return None
+            n = min(self.capacity - self._size, len(data))
+            if n:
+                view = memoryview(data)[:n]
+                end = (self._start + self._size) % self.capacity
+                first = min(n, self.capacity - end)
+                self._buffer[end:end + first] = view[:first]
+                self._buffer[:n - first] = view[first:n]
+                self._size += n
+                self.bytes_in += n
+                self.high_water = max(self.high_water, self._size)
+                self._cond.notify_all()
+            return n
+
+    def add_blocked_time(self, seconds):
+        """Account time a non-blocking writer spent waiting for space"""
+        with self._cond:
+            self.blocked_seconds += seconds
+
+    def get(self, max_bytes, min_bytes=1, timeout=None):
+        """Read between min_bytes and max_bytes; returns fewer only once closed, b'' at end of stream, None on timeout"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._size >= min_bytes or self._closed, timeout):
+                return None
+            n = min(max_bytes, self._size)
+            first = min(n, self.capacity - self._start)
+            data = bytes(self._buffer[self._start:self._start + first]) + bytes(self._buffer[:n - first])
+            self._start = (self._start + n) % self.capacity
+            self._size -= n
+            self.bytes_out += n
+            self._cond.notify_all()
+            return data
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def stats(self):
+        with self._cond:
+            return {
+                'capacity_bytes': self.capacity,
+                'buffered_bytes': self._size,
+                'high_water_bytes': self.high_water,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'blocked_seconds': round(self.blocked_seconds, 3),
+            }
+
+
+class PCM16Decoder:
+    """Pass-through for raw little-endian PCM16 mono; keeps sample alignment across chunks"""
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self._pending = b""
+
+    def decode(self, chunk):
+        data = self._pending + chunk
+        aligned = len(data) - len(data) % SAMPLE_WIDTH
+        self._pending = data[aligned:]
+        return data[:aligned]
+
+
+class OpusDecoder:
+    """Decodes Opus packets, each prefixed with a 2-byte big-endian length, into PCM16 mono"""
+
+    # Largest Opus frame is 120 ms
+    MAX_FRAME_MS = 120
+
+    def __init__(self, sample_rate):
+        if opuslib is None:
+            raise ValueError("Opus audio requires the 'opuslib' package; send format=pcm16 instead")
+        self.sample_rate = sample_rate
+        self._decoder = opuslib.Decoder(sample_rate, 1)
+        self._max_frame = sample_rate * self.MAX_FRAME_MS // 1000
+        self._pending = b""
+
+    def decode(self, chunk):
+        data = self._pending + chunk
+        pcm = []
+        offset = 0
+        while len(data) - offset >= 2:
+            (length,) = struct.unpack_from(">H", data, offset)
+            if len(data) - offset - 2 < length:
+                break
+            packet = data[offset + 2:offset + 2 + length]
+            pcm.append(self._decoder.decode(packet, self._max_frame))
+            offset += 2 + length
+        self._pending = data[offset:]
+        return b"".join(pcm)
+
+
+DECODERS = {
+    'pcm16': PCM16Decoder,
+    'opus': OpusDecoder,
+}
+
+
+def make_decoder(audio_format, sample_rate):
+    decoder_class = DECODERS.get(audio_format)
+    if decoder_class is None:
+        raise ValueError(f"Unsupported audio format '{audio_format}', expected one of {list(DECODERS)}")
+    return decoder_class(sample_rate)
+
+
+class BufferedAudioStream:
+    """Iterator handing ring-buffer audio to the recognizer in fixed-duration frames"""
+
+    def __init__(self, stt_session, ring_buffer, sample_rate, frame_ms=50):
+        self.stt_session = stt_session
+        self.ring_buffer = ring_buffer
+        self.frame_bytes = sample_rate * SAMPLE_WIDTH * frame_ms // 1000
+        # Stopping the recognition closes the buffer, waking a blocked get() and the uploader's put()
+        stt_session.add_stop_callback(ring_buffer.close)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.stt_session.is_streaming:
+            raise StopIteration
+        chunk = self.ring_buffer.get(self.frame_bytes, min_bytes=self.frame_bytes,
+                                     timeout=self.stt_session.idle_timeout())
+        if chunk is None:
+            print(f"🕒 [{self.stt_session.key}] Client stopped sending audio. Auto-stopping STT.")
+            self.stt_session.stop('no_audio')
+            raise StopIteration
+        if not chunk or not self.stt_session.process_audio(chunk):
+            raise StopIteration
+        return chunk
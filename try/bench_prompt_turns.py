@@ -0,0 +1,83 @@
+"""Benchmark: per-turn prompt-building cost over long interviews.
+
+Plays a synthetic interview of --turns answers and times build_ai_prompt()
+each turn, once reading the incrementally maintained session state and once
+rescanning the whole conversation history (the behaviour without a session).
+The incremental column should stay flat as the interview grows.
+
+It also reports prompt tokens per turn as the fake Gemini client counts
+them. sent is everything the request carries, which is what each turn costs
+when no prefix caching applies (the SDK pinned here cannot request it). cached
+is the card-context prefix that repeats across turns (and across sessions on
+the same card), fresh is the per-turn delta. With the conversation token
+budget the fresh part stops growing once older answers are folded into the
+rolling summary.
+
+Usage:
+    python bench_prompt_turns.py [--turns 200] [--repeat 20]
+"""
+import argparse
+import time
+
+from fakes import PromptStats, import_app_with_fakes
+
+ANSWERS = [
+    "I have worked with Python and PostgreSQL for four years, mostly building REST APIs.",
+    "I would put a Redis cache in front of the database and invalidate it on writes.",
+    "Threads share memory, so I protect shared state with locks or avoid sharing it entirely.",
+    "In my experience the hardest part of microservices is observability across service boundaries.",
+]
+
+
+def time_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20, help="timed repetitions per turn")
+    args = parser.parse_args()
+
+    app = import_app_with_fakes(FAKE_LLM_LATENCY='fixed:0')
+    session = app.InterviewSession("bench", {'role': 'Backend Engineer', 'techstack': ['Python', 'SQL']})
+    question = "Please introduce yourself."
+    session.add_message("assistant", question)
+
+    stats = PromptStats()
+    incremental, rescan, tokens = [], [], []
+    for turn in range(args.turns):
+        answer = ANSWERS[turn % len(ANSWERS)]
+        session.add_qa_pair(question, answer)
+        session.add_message("user", answer)
+        history = session.conversation_history
+        incremental.append(time_call(lambda: app.build_ai_prompt(history, interview_session=session), args.repeat))
+        rescan.append(time_call(lambda: app.build_ai_prompt(history), args.repeat))
+        before = stats.snapshot()
+        stats.record('bench', app.build_ai_prompt(history, interview_session=session))
+        after = stats.snapshot()
+        tokens.append((after['prompt_tokens']['bench'] - before['prompt_tokens'].get('bench', 0),
+                       after['cached_tokens']['bench'] - before['cached_tokens'].get('bench', 0)))
+        question = f"Thanks. What would you do differently next time? ({turn + 1})"
+        session.add_message("assistant", question)
+
+    window = max(1, min(10, args.turns // 4))
+    print(f"\n{'turns':>11} {'incremental µs':>16} {'rescan µs':>11} {'sent tok':>9} {'fresh tok':>10} {'cached tok':>11}")
+    for start in sorted({0, args.turns // 2 - window // 2, args.turns - window}):
+        end = start + window
+        inc = sum(incremental[start:end]) / window * 1e6
+        full = sum(rescan[start:end]) / window * 1e6
+        sent = sum(total for total, _ in tokens[start:end]) / window
+        cached = sum(hit for _, hit in tokens[start:end]) / window
+        print(f"{start + 1:>5}-{end:<5} {inc:>16.1f} {full:>11.1f} {sent:>9.0f} {sent - cached:>10.0f} {cached:>11.0f}")
+
+    growth = (sum(incremental[-window:]) / sum(incremental[:window]))
+    rescan_growth = (sum(rescan[-window:]) / sum(rescan[:window]))
+    print(f"\nLast/first window cost: incremental x{growth:.2f}, rescan x{rescan_growth:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark: per-request Silero calls vs. the micro-batching TTS worker.
+
+Usage:
+    python bench_tts_batch.py [--requests 32] [--concurrency 1 4 16] [--max-batch-size 8] [--max-wait-ms 10]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from model_store import load_tts_model
+from tts_batcher import TTSBatchWorker, silero_batch_apply
+
+SAMPLE_TEXTS = [
+    "Thank you for sharing that. What would you say is the most challenging aspect?",
+    "I appreciate your response. Could you elaborate briefly?",
+    "That's interesting. What factors would you consider?",
+    "Good point. What's your approach to testing this?",
+    "How would you design a rate limiter for a public API?",
+    "Can you explain the difference between a process and a thread?",
+]
+
+
+def run(call, concurrency, total_requests):
+    """Fire total_requests calls with `concurrency` threads and return requests/sec"""
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] + f" ({i})" for i in range(total_requests)]
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, texts))
+    elapsed = time.time() - start
+    return total_requests / elapsed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    parser.add_argument("--speaker", default="en_10")
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    args = parser.parse_args()
+
+    print("🔄 Loading Silero model...")
+    model = load_tts_model("v3_en")
+
+    def direct(text):
+        return model.apply_tts(text=text, speaker=args.speaker, sample_rate=args.sample_rate, put_accent=True, put_yo=True)
+
+    worker = TTSBatchWorker(silero_batch_apply(model), args.max_batch_size, args.max_wait_ms).start()
+
+    def batched(text):
+        return worker.submit(text, args.speaker, args.sample_rate)
+
+    # Warm up both paths so the first measured call does not pay lazy initialization
+    direct(SAMPLE_TEXTS[0])
+    batched(SAMPLE_TEXTS[0])
+
+    print(f"\n{'concurrency':>12} {'direct req/s':>14} {'batched req/s':>15} {'speedup':>9}")
+    for concurrency in args.concurrency:
+        direct_rps, _ = run(direct, concurrency, args.requests)
+        batched_rps, _ = run(batched, concurrency, args.requests)
+        print(f"{concurrency:>12} {direct_rps:>14.2f} {batched_rps:>15.2f} {batched_rps / direct_rps:>8.2f}x")
+
+    print(f"\n📊 Worker stats: {worker.stats()}")
+    worker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: TTS throughput across replica counts and torch threads per replica.
+
+Loads Silero once, then for every REPLICASxTHREADS configuration starts a
+TTSExecutor and drives it at the given concurrency. The table shows where
+throughput stops improving (the knee) on this machine. Use that point to
+set TTS_REPLICAS and TTS_REPLICA_THREADS.
+
+Usage:
+    python bench_tts_replicas.py [--configs 1x4 2x2 4x1] [--requests 32] [--concurrency 8]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from model_store import load_tts_model
+from tts_executor import TTSExecutor, available_cores
+
+SAMPLE_TEXTS = [
+    "Thank you for sharing that. What would you say is the most challenging aspect?",
+    "I appreciate your response. Could you elaborate briefly?",
+    "That's interesting. What factors would you consider?",
+    "Good point. What's your approach to testing this?",
+    "How would you design a rate limiter for a public API?",
+    "Can you explain the difference between a process and a thread?",
+]
+
+
+def default_configs():
+    """Replicas x threads splits that use every core: 1xN, 2x(N/2), ... Nx1"""
+    cores = len(available_cores())
+    return [f"{replicas}x{cores // replicas}" for replicas in range(1, cores + 1) if cores % replicas == 0]
+
+
+def run(executor, concurrency, total_requests, speaker, sample_rate):
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] + f" ({i})" for i in range(total_requests)]
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda text: executor.submit(text, speaker, sample_rate), texts))
+    return total_requests / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", nargs="+", default=None, help="REPLICASxTHREADS, e.g. 2x2 (default: every split of the cores)")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--speaker", default="en_10")
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    args = parser.parse_args()
+
+    print("🔄 Loading Silero model...")
+    model = load_tts_model("v3_en")
+
+    rows = []
+    for config in args.configs or default_configs():
+        replicas, threads = (int(part) for part in config.lower().split("x"))
+        executor = TTSExecutor(model, replicas=replicas, threads_per_replica=threads).start()
+        try:
+            # Warm-up: one concurrent request per replica pays each one's first-call cost
+            run(executor, replicas, replicas, args.speaker, args.sample_rate)
+            throughput = run(executor, args.concurrency, args.requests, args.speaker, args.sample_rate)
+            utilization = [replica['utilization'] for replica in executor.stats()['replicas']]
+        finally:
+            executor.stop()
+        rows.append((config, throughput, sum(utilization) / len(utilization)))
+
+    print(f"\n{args.requests} requests at concurrency {args.concurrency}, {len(available_cores())} cores")
+    print(f"{'replicas x threads':<20} {'req/s':>8} {'avg utilization':>16}")
+    for config, throughput, utilization in rows:
+        print(f"{config:<20} {throughput:>8.2f} {utilization:>16.0%}")
+    best = max(rows, key=lambda row: row[1])
+    print(f"\n📊 Best throughput: {best[0]} at {best[1]:.2f} req/s")
+
+
+if __name__ == "__main__":
+    main()
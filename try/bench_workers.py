@@ -0,0 +1,134 @@
+"""Benchmark: preloaded, forked TTS workers vs. independently loaded processes.
+
+Starts N worker processes in one of two ways. "shared" forks a parent that
+already loaded the Silero model, which is what gunicorn.conf.py does.
+"independent" starts N fresh processes that each load their own copy. Every
+worker caps its torch threads, warms up, then synthesizes --requests
+sentences. The benchmark reports RSS and PSS per worker, plus aggregate
+throughput. PSS divides shared pages between the processes sharing them, so
+the PSS total is the real memory cost.
+
+Usage:
+    python bench_workers.py [--workers 4] [--requests 20] [--torch-threads 1] [--mode shared independent]
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import time
+
+from model_store import load_tts_model
+
+MODEL_ID = "v3_en"
+SAMPLE_TEXTS = [
+    "Thank you for sharing that. What would you say is the most challenging aspect?",
+    "I appreciate your response. Could you elaborate briefly?",
+    "Good point. What's your approach to testing this?",
+    "Can you explain the difference between a process and a thread?",
+]
+
+# Loaded in the parent before forking in "shared" mode
+shared_model = None
+
+
+def memory_mb(pid="self"):
+    """(RSS, PSS) in MB from /proc/<pid>/smaps_rollup (Linux)"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in ("Rss", "Pss"):
+                values[name] = int(rest.split()[0]) / 1024
+    return values.get("Rss", 0.0), values.get("Pss", 0.0)
+
+
+def synthesize(model, text, speaker="en_10", sample_rate=24000):
+    return model.apply_tts(text=text, speaker=speaker, sample_rate=sample_rate, put_accent=True, put_yo=True)
+
+
+def worker(torch_threads, requests, start_event, release_event, results):
+    import torch
+
+    torch.set_num_threads(torch_threads)
+    model = shared_model if shared_model is not None else load_tts_model(MODEL_ID)
+    with torch.inference_mode():
+        synthesize(model, SAMPLE_TEXTS[0])
+        results.put(("ready", os.getpid()))
+        start_event.wait()
+
+        start = time.time()
+        for i in range(requests):
+            synthesize(model, f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} ({i})")
+        elapsed = time.time() - start
+
+    rss, pss = memory_mb()
+    results.put(("done", {'pid': os.getpid(), 'seconds': elapsed, 'rss_mb': rss, 'pss_mb': pss}))
+    # Stay alive until the parent has sampled everyone, so shared pages are still split N ways
+    release_event.wait()
+
+
+def run(mode, args):
+    global shared_model
+    if mode == "shared":
+        print("🔄 Loading Silero model once in the parent...")
+        shared_model = load_tts_model(MODEL_ID)
+        gc.freeze()
+        context = multiprocessing.get_context("fork")
+    else:
+        shared_model = None
+        context = multiprocessing.get_context("spawn")
+
+    start_event, release_event = context.Event(), context.Event()
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(args.torch_threads, args.requests, start_event, release_event, results))
+                 for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        results.get()  # ready: model loaded and warmed up
+
+    start = time.time()
+    start_event.set()
+    reports = [results.get()[1] for _ in processes]
+    wall = time.time() - start
+    _, parent_pss = memory_mb()
+    release_event.set()
+    for process in processes:
+        process.join()
+
+    shared_model = None
+    gc.unfreeze()
+    total_pss = sum(report['pss_mb'] for report in reports) + (parent_pss if mode == "shared" else 0)
+    return {
+        'mode': mode,
+        'rss_mb': sum(report['rss_mb'] for report in reports) / len(reports),
+        'pss_mb': sum(report['pss_mb'] for report in reports) / len(reports),
+        'total_pss_mb': total_pss,
+        'requests_per_second': args.workers * args.requests / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=20, help="syntheses per worker")
+    parser.add_argument("--torch-threads", type=int, default=max(1, multiprocessing.cpu_count() // 4))
+    parser.add_argument("--mode", nargs="+", choices=["shared", "independent"], default=["shared", "independent"])
+    args = parser.parse_args()
+
+    rows = [run(mode, args) for mode in args.mode]
+
+    print(f"\n{args.workers} workers x {args.torch_threads} torch threads, {args.requests} syntheses each")
+    print(f"{'mode':<12} {'RSS/worker MB':>14} {'PSS/worker MB':>14} {'total PSS MB':>13} {'req/s':>8}")
+    for row in rows:
+        print(f"{row['mode']:<12} {row['rss_mb']:>14.1f} {row['pss_mb']:>14.1f} {row['total_pss_mb']:>13.1f} "
+              f"{row['requests_per_second']:>8.2f}")
+    by_mode = {row['mode']: row for row in rows}
+    if len(by_mode) == 2:
+        shared, independent = by_mode['shared'], by_mode['independent']
+        print(f"\n📊 Shared workers use {shared['total_pss_mb'] / independent['total_pss_mb']:.0%} of the memory "
+              f"of independent ones at {shared['requests_per_second'] / independent['requests_per_second']:.2f}x the throughput")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""Deterministic local stand-ins for Gemini, AssemblyAI and Silero.
+
+Used by load_test.py (and selectable in app.py with LLM_BACKEND=fake,
+STT_BACKEND=fake, TTS_BACKEND=fake) so the server can be exercised and
+benchmarked offline. Latencies come from configurable distributions, written
+as specs such as "fixed:200", "uniform:100,400" or "lognormal:300,0.5"
+(median ms, sigma). Everything is driven by a seeded RNG, so a run with the
+same seed and arrival pattern produces the same responses and latencies.
+"""
+import asyncio
+import hashlib
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from stt_local import LocalStreamingClient, placeholder_transcript
+
+
+class LatencyDistribution:
+    def __init__(self, spec="fixed:0", seed=0):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution '{spec}' (use fixed:ms, uniform:lo,hi or lognormal:median,sigma)")
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """One latency in seconds"""
+        with self._lock:
+            if self.kind == "fixed":
+                ms = self.params[0] if self.params else 0.0
+            elif self.kind == "uniform":
+                ms = self._random.uniform(self.params[0], self.params[1])
+            else:
+                median, sigma = self.params[0], (self.params[1] if len(self.params) > 1 else 0.5)
+                ms = self._random.lognormvariate(math.log(median), sigma)
+        return ms / 1000.0
+
+
+def count_tokens(text):
+    """Offline token estimate (~4 characters per token, like Gemini's tokenizer on English text)"""
+    return max(1, len(re.findall(r"\w+|[^\w\s]", text)) * 4 // 3) if text else 0
+
+
+def contents_text(contents):
+    """Flatten generate_content contents (str, list of str, or chat-style dicts) to text"""
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, dict):
+        return "\n".join(contents_text(part) for part in contents.get("parts", ()))
+    return "\n".join(contents_text(item) for item in contents)
+
+
+FAKE_QUESTIONS = [
+    "Thanks for that. Can you explain the difference between a process and a thread?",
+    "Good answer. How would you design a rate limiter for a public API?",
+    "Interesting. What data structure would you use to implement an LRU cache, and why?",
+    "Nice. How do you approach testing code that depends on external services?",
+    "Great. Walk me through how you would debug a memory leak in production.",
+    "Thanks. What trade-offs would you consider when choosing between SQL and NoSQL storage?",
+]
+
+FAKE_FEEDBACK = (
+    "1. Technical Proficiency (Score 72/100): solid fundamentals, some gaps in system design.\n"
+    "2. Communication & Soft Skills (Score 80/100): clear and structured answers.\n"
+    "3. Overall Assessment: strong problem solving and communication; practise scalability and testing. "
+    "Recommendation: proceed to the next round."
+)
+
+FAKE_SCORES = [
+    '{"technical": 8, "communication": 7, "topics": ["concurrency"], "strength": "Clear grasp of threads vs processes", "improvement": "Mention the GIL"}',
+    '{"technical": 6, "communication": 8, "topics": ["system design", "apis"], "strength": "Structured answer", "improvement": "Discuss distributed rate limits"}',
+    '{"technical": 7, "communication": 6, "topics": ["caching"], "strength": "Picked the right data structure", "improvement": "Explain eviction complexity"}',
+]
+
+FAKE_SUMMARY = (
+    "The candidate introduced themselves as a backend engineer and covered concurrency, API rate limiting "
+    "and caching. Answers were accurate and concise; design trade-offs were discussed only briefly."
+)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeCountTokensResponse:
+    def __init__(self, total_tokens):
+        self.total_tokens = total_tokens
+
+
+class FakeStreamedResponse:
+    """Iterable of response chunks, paced like a streamed generation"""
+
+    def __init__(self, text, chunk_delay):
+        self.text = text
+        self._chunk_delay = chunk_delay
+
+    def __iter__(self):
+        words = self.text.split(" ")
+        for i in range(0, len(words), 4):
+            time.sleep(self._chunk_delay)
+            yield FakeResponse(" ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else ""))
+
+
+class FakeAsyncStreamedResponse:
+    """Async iterable of response chunks, paced like a streamed generation"""
+
+    def __init__(self, text, chunk_delay):
+        self.text = text
+        self._chunk_delay = chunk_delay
+
+    async def __aiter__(self):
+        words = self.text.split(" ")
+        for i in range(0, len(words), 4):
+            await asyncio.sleep(self._chunk_delay)
+            yield FakeResponse(" ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else ""))
+
+
+class FakeGenerativeModel:
+    """Stands in for genai.GenerativeModel: sleeps for a sampled latency, then answers deterministically"""
+
+    def __init__(self, model_name, latency=None, failure_rate=0.0, seed=0, stats=None):
+        self.model_name = model_name
+        self.latency = latency or LatencyDistribution()
+        self.failure_rate = failure_rate
+        self.stats = stats
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _reply(self, prompt):
+        if "feedback" in prompt.lower() and "analyze" in prompt.lower():
+            return FAKE_FEEDBACK
+        if prompt.startswith("Update the running summary"):
+            return FAKE_SUMMARY
+        if prompt.startswith("Score the candidate's answer"):
+            digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+            return FAKE_SCORES[digest % len(FAKE_SCORES)]
+        digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+        return FAKE_QUESTIONS[digest % len(FAKE_QUESTIONS)]
+
+    def _should_fail(self):
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+    @staticmethod
+    def _timeout(request_options):
+        """Request timeout in seconds, or None; the real transport raises DeadlineExceeded past it"""
+        return (request_options or {}).get('timeout')
+
+    def generate_content(self, contents, generation_config=None, stream=False, request_options=None, **kwargs):
+        prompt = contents_text(contents)
+        delay = self.latency.sample()
+        timeout = self._timeout(request_options)
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Fake {self.model_name} request exceeded its {timeout:.2f}s timeout")
+        if self.stats is not None:
+            self.stats.record(self.model_name, contents)
+        if self._should_fail():
+            time.sleep(delay)
+            raise RuntimeError(f"Fake {self.model_name} failure")
+        text = self._reply(prompt)
+        if stream:
+            # Spend roughly a third of the latency before the first chunk, the rest spread over the chunks
+            chunks = max(1, math.ceil(len(text.split(" ")) / 4))
+            time.sleep(delay / 3)
+            return FakeStreamedResponse(text, (delay * 2 / 3) / chunks)
+        time.sleep(delay)
+        return FakeResponse(text)
+
+    async def generate_content_async(self, contents, generation_config=None, stream=False, request_options=None, **kwargs):
+        prompt = contents_text(contents)
+        delay = self.latency.sample()
+        timeout = self._timeout(request_options)
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError(f"Fake {self.model_name} request exceeded its {timeout:.2f}s timeout")
+        if self.stats is not None:
+            self.stats.record(self.model_name, contents)
+        if self._should_fail():
+            await asyncio.sleep(delay)
+            raise RuntimeError(f"Fake {self.model_name} failure")
+        text = self._reply(prompt)
+        if stream:
+            chunks = max(1, math.ceil(len(text.split(" ")) / 4))
+            await asyncio.sleep(delay / 3)
+            return FakeAsyncStreamedResponse(text, (delay * 2 / 3) / chunks)
+        await asyncio.sleep(delay)
+        return FakeResponse(text)
+
+    def count_tokens(self, contents):
+        return FakeCountTokensResponse(count_tokens(contents_text(contents)))
+
+
+class FakeModelInfo:
+    def __init__(self, name):
+        self.name = name
+        self.supported_generation_methods = ["generateContent", "countTokens"]
+
+
+class PromptStats:
+    """Prompt tokens sent per model, so benchmarks can compare prompt sizes.
+
+    Chat-style contents also get implicit prefix caching simulated the way
+    Gemini does it: leading messages identical to an earlier request to the
+    same model count as cached_tokens, the rest as fresh prompt tokens.
+    """
+
+    def __init__(self, max_prefixes=10000):
+        self.calls = {}
+        self.prompt_tokens = {}
+        self.cached_tokens = {}
+        self.max_prefixes = max_prefixes
+        self._prefixes = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, model_name, contents):
+        """Tokens in the longest leading run of messages already seen by this model"""
+        if isinstance(contents, (str, dict)):
+            return 0
+        seen = self._prefixes.setdefault(model_name, set())
+        if len(seen) > self.max_prefixes:
+            seen.clear()
+        digest = hashlib.sha256()
+        cached, tokens, still_cached = 0, 0, True
+        for item in list(contents)[:-1]:
+            digest.update(contents_text(item).encode("utf-8") + b"\0")
+            tokens += count_tokens(contents_text(item))
+            key = digest.hexdigest()
+            if still_cached and key in seen:
+                cached = tokens
+            else:
+                still_cached = False
+                seen.add(key)
+        return cached
+
+    def record(self, model_name, contents):
+        tokens = count_tokens(contents_text(contents))
+        with self._lock:
+            cached = self._cached(model_name, contents)
+            self.calls[model_name] = self.calls.get(model_name, 0) + 1
+            self.prompt_tokens[model_name] = self.prompt_tokens.get(model_name, 0) + tokens
+            self.cached_tokens[model_name] = self.cached_tokens.get(model_name, 0) + cached
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'calls': dict(self.calls),
+                'prompt_tokens': dict(self.prompt_tokens),
+                'cached_tokens': dict(self.cached_tokens),
+            }
+
+
+class FakeGenAI:
+    """Drop-in for the google.generativeai module surface the server uses"""
+
+    def __init__(self, model_names, latency="lognormal:400,0.4", failure_rate=0.0, seed=0):
+        self.model_names = list(model_names)
+        self.latency_spec = latency
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.prompt_stats = PromptStats()
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    def configure(self, **kwargs):
+        pass
+
+    def list_models(self):
+        return [FakeModelInfo(name) for name in self.model_names]
+
+    def GenerativeModel(self, model_name, **kwargs):
+        with self._lock:
+            # One latency stream per model name, seeded so runs are reproducible
+            latency = self._latencies.get(model_name)
+            if latency is None:
+                seed = self.seed + int(hashlib.sha256(model_name.encode('utf-8')).hexdigest()[:8], 16)
+                latency = LatencyDistribution(self.latency_spec, seed=seed)
+                self._latencies[model_name] = latency
+        return FakeGenerativeModel(model_name, latency, self.failure_rate, self.seed, self.prompt_stats)
+
+
+class FakeStreamingClient(LocalStreamingClient):
+    """LocalStreamingClient with recognizer-like latency on connect and on every finished turn"""
+
+    def __init__(self, connect_latency, turn_latency, transcript_fn=placeholder_transcript):
+        super().__init__(transcript_fn=transcript_fn)
+        self.connect_latency = connect_latency
+        self.turn_latency = turn_latency
+
+    def connect(self, params):
+        time.sleep(self.connect_latency.sample())
+        super().connect(params)
+
+    def _turn(self, turn_order, seconds):
+        time.sleep(self.turn_latency.sample())
+        return super()._turn(turn_order, seconds)
+
+
+def fake_stt_client_factory(connect_latency="fixed:50", turn_latency="lognormal:150,0.3", seed=0,
+                            transcript_fn=placeholder_transcript):
+    """Factory creating one FakeStreamingClient per recognition"""
+    connect = LatencyDistribution(connect_latency, seed)
+    turn = LatencyDistribution(turn_latency, seed + 1)
+
+    def create():
+        return FakeStreamingClient(connect, turn, transcript_fn=transcript_fn)
+    return create
+
+
+class FakeTTSModel:
+    """Stands in for the Silero model: a short tone per character after a sampled latency"""
+
+    def __init__(self, latency="fixed:0", seconds_per_char=0.05, seed=0):
+        self.latency = LatencyDistribution(latency, seed)
+        self.seconds_per_char = seconds_per_char
+
+    def apply_tts(self, text, speaker="en_0", sample_rate=24000, put_accent=True, put_yo=True, **kwargs):
+        time.sleep(self.latency.sample())
+        samples = max(1, int(len(text) * self.seconds_per_char * sample_rate))
+        t = np.arange(samples, dtype=np.float32) / sample_rate
+        return (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def import_app_with_fakes(**environ):
+    """Import app.py with Gemini, AssemblyAI and Silero replaced by the fakes above.
+
+    Keyword arguments are extra environment settings (e.g. FAKE_LLM_LATENCY).
+    Must run before anything else imports app.
+    """
+    temp_dir = tempfile.mkdtemp(prefix='hireready_fakes_')
+    os.environ.update({
+        'LLM_BACKEND': 'fake',
+        'STT_BACKEND': 'fake',
+        'TTS_BACKEND': 'fake',
+        'GEMINI_API_KEY': os.environ.get('GEMINI_API_KEY', 'fake'),
+        'GEMINI_MODEL_CACHE': os.path.join(temp_dir, 'gemini_model.json'),
+        'TTS_CACHE_DIR': '',
+        **environ,
+    })
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app
+    return app
@@ -0,0 +1,120 @@
+"""Background jobs for end-of-interview feedback.
+
+Closing an interview used to generate the overall feedback synchronously,
+holding the request thread for a full LLM generation. Jobs run on a small
+worker pool instead; the client gets a job id back and polls for the result.
+
+The job runs in the worker that accepted it, but its record is written to the
+session store on every status change. lookup() falls back to that record, so
+a poll that lands on another worker (with SESSION_STORE=sqlite) still finds
+the job instead of a 404.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+PENDING = 'pending'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+class FeedbackJob:
+    def __init__(self, job_id, session_id):
+        self.job_id = job_id
+        self.session_id = session_id
+        self.status = PENDING
+        self.feedback = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'session_id': self.session_id,
+            'status': self.status,
+            'feedback': self.feedback,
+            'error': self.error,
+            'queued_seconds': round((self.started_at or time.time()) - self.created_at, 3),
+            'run_seconds': round(self.finished_at - self.started_at, 3) if self.finished_at and self.started_at else None,
+        }
+
+
+class FeedbackJobManager:
+    def __init__(self, max_workers=4, result_ttl_seconds=3600, store=None):
+        """store: anything with save_job(record)/get_job(job_id), e.g. the session store"""
+        self.result_ttl_seconds = result_ttl_seconds
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='feedback')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, fn, *args, job_id=None, **kwargs):
+        """Queue fn(*args, **kwargs) -> feedback text and return the new job (job_id: one reserved earlier)"""
+        self._prune()
+        job = FeedbackJob(job_id or str(uuid.uuid4()), session_id)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._persist(job)
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        """Job object for a job started in this process"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def lookup(self, job_id):
+        """Job record (to_dict()) from this process, else from the store; None if unknown"""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.store is None:
+            return None
+        try:
+            return self.store.get_job(job_id)
+        except Exception as e:
+            print(f"⚠️ Could not read feedback job {job_id} from the store: {e}")
+            return None
+
+    def _persist(self, job):
+        if self.store is None:
+            return
+        try:
+            self.store.save_job(job.to_dict())
+        except Exception as e:
+            print(f"⚠️ Could not store feedback job {job.job_id}: {e}")
+
+    def stats(self):
+        with self._lock:
+            counts = {PENDING: 0, RUNNING: 0, COMPLETED: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._persist(job)
+        try:
+            job.feedback = fn(*args, **kwargs)
+            job.status = COMPLETED
+        except Exception as e:
+            print(f"❌ Feedback job {job.job_id} failed: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            self._persist(job)
+            print(f"📊 Feedback job {job.job_id} {job.status} in {job.finished_at - job.started_at:.2f}s")
+
+    def _prune(self):
+        """Drop finished jobs whose results are older than the TTL"""
+        cutoff = time.time() - self.result_ttl_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
@@ -0,0 +1,87 @@
+"""Production launcher: the model is loaded once and shared by forked workers.
+
+    pip install gunicorn             # plus uvicorn for SERVE_MODE=asgi
+    gunicorn -c gunicorn.conf.py
+
+The master imports app.py once (preload_app), so the Silero weights, the
+phrase-matcher automaton and the other import-time state exist a single time.
+It then forks WEB_WORKERS workers that share those pages copy-on-write
+instead of each loading its own copy. gc.freeze() in the master keeps the
+workers' garbage collections from touching (and so copying) the shared
+objects.
+
+Each worker caps torch at TORCH_THREADS so N workers do not oversubscribe
+the cores. Before a worker accepts its first request it restarts its
+background threads, which do not survive fork (app.after_fork), and runs one
+warm-up synthesis (app.warm_up). Gunicorn does not route traffic to a worker
+until that hook returns, so readiness is gated per worker.
+
+SERVE_MODE=asgi serves asgi:app on uvicorn workers instead of app:app on
+threaded sync workers.
+
+Requests are not routed to a fixed worker, so with more than one worker set
+SESSION_STORE=sqlite. Sessions and feedback job records then live in the
+shared SQLite file, and any worker can serve a session's next turn or an
+/api/feedback poll. Two caches stay per worker. The first is the rolling
+conversation summaries (token_budget); a worker without one sends compact
+one-line exchanges instead. The second is in-flight answer scores
+(answer_scoring); finished scores are copied onto the session, and pairs
+still unscored on another worker go into the feedback prompt compactly.
+Both degrade gracefully, and sticky routing by session id at the load
+balancer keeps them effective.
+
+Benchmark against independently loaded processes with bench_workers.py.
+"""
+import gc
+import multiprocessing
+import os
+
+SERVE_MODE = os.getenv('SERVE_MODE', 'wsgi')
+
+cpu_count = multiprocessing.cpu_count()
+workers = int(os.getenv('WEB_WORKERS', str(max(1, min(4, cpu_count // 2)))))
+TORCH_THREADS = int(os.getenv('TORCH_THREADS', str(max(1, cpu_count // workers))))
+
+# Set before the preloaded app imports torch, so OpenMP/MKL size their pools for one worker's share
+os.environ.setdefault('OMP_NUM_THREADS', str(TORCH_THREADS))
+os.environ.setdefault('MKL_NUM_THREADS', str(TORCH_THREADS))
+# The preloaded app starts no threads or TTS replicas in the master; each worker starts its own in post_fork
+os.environ['PREFORK_SERVING'] = '1'
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+preload_app = True
+
+if SERVE_MODE == 'asgi':
+    wsgi_app = 'asgi:app'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'app:app'
+    worker_class = 'gthread'
+    threads = int(os.getenv('WEB_THREADS', '16'))
+
+# Longer than the LLM deadline and the STT maximum duration, plus warm-up
+timeout = int(os.getenv('WEB_TIMEOUT', '120'))
+graceful_timeout = 30
+accesslog = os.getenv('ACCESS_LOG', '-')
+
+
+def when_ready(server):
+    # Runs in the master after the preload and before the first fork
+    if workers > 1 and os.getenv('SESSION_STORE', 'memory') != 'sqlite':
+        server.log.warning(f"⚠️ {workers} workers with SESSION_STORE=memory: each worker only sees its own "
+                           f"sessions and feedback jobs. Set SESSION_STORE=sqlite or WEB_WORKERS=1.")
+    gc.freeze()
+    server.log.info(f"🧊 Preloaded app frozen: {gc.get_freeze_count()} objects shared copy-on-write "
+                    f"by {workers} workers, {TORCH_THREADS} torch threads each")
+
+
+def post_fork(server, worker):
+    import app
+    app.after_fork(torch_threads=TORCH_THREADS)
+
+
+def post_worker_init(worker):
+    # The worker starts accepting connections only after this returns
+    import app
+    seconds = app.warm_up()
+    worker.log.info(f"🔥 Worker {worker.pid} warmed up in {seconds:.2f}s")
@@ -0,0 +1,553 @@
+"""Shared Gemini client used by every LLM call site.
+
+- GenerativeModel objects are created once per model name and reused (they
+  share the SDK's default gRPC client, so the transport is reused too).
+- Every call has a deadline; retries use full-jitter exponential backoff.
+  The time left is also the SDK request timeout, so a call the caller gave
+  up on is cut off by the transport instead of holding a pool thread.
+- Optionally, when the primary call runs past its recent p95 latency, a hedged
+  duplicate is sent to a second model and whichever answers first wins.
+  Hedging is skipped while every pool thread is busy, since the duplicate
+  would only queue behind the calls it is meant to overtake.
+- generate_async()/stream_async() do the same on the SDK's async transport,
+  for the ASGI server, so waiting on Gemini does not hold a thread.
+
+Streams feed the hedge statistics only their time to the first chunk. The
+full stream duration includes however long the consumer takes to read it.
+
+google-generativeai 0.3.0 (the pinned release) takes no request_options, so
+the timeout is passed to its gapic client through private SDK internals.
+That fallback only runs on that exact release; any other release without
+request_options fails at LLMClient construction instead.
+"""
+import asyncio
+import inspect
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import metrics
+
+LLM_LATENCY = metrics.histogram(
+    'llm_request_duration_seconds',
+    'Gemini call latency by model and outcome (success, exception, or fallback when the caller gave up)',
+    ['model', 'outcome'],
+)
+
+
+class LLMError(Exception):
+    """Raised when no attempt produced a response"""
+
+
+class LLMTimeout(LLMError):
+    """Raised when the call deadline passed before any response arrived"""
+
+
+# The one SDK release without request_options whose private internals the timeout fallback is written against
+LEGACY_SDK_VERSION = '0.3.0'
+
+
+def _accepts_request_options(method):
+    try:
+        return 'request_options' in inspect.signature(method).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _require_legacy_sdk():
+    """Raise unless the installed SDK is the release the private-internals fallback was written for"""
+    import google.generativeai
+
+    version = getattr(google.generativeai, '__version__', None)
+    if version != LEGACY_SDK_VERSION:
+        raise RuntimeError(f"google-generativeai {version} takes no request_options, and the request timeout fallback "
+                           f"only supports {LEGACY_SDK_VERSION}; install that release or one with request_options")
+
+
+def check_sdk(genai):
+    """Fail at startup if calls on this SDK could not be given a transport timeout"""
+    model_class = genai.GenerativeModel
+    if inspect.isclass(model_class) and not _accepts_request_options(model_class.generate_content):
+        _require_legacy_sdk()
+
+
+def generate_content(model, contents, generation_config, timeout, stream=False):
+    """model.generate_content with `timeout` seconds as the per-request transport timeout"""
+    if _accepts_request_options(model.generate_content):
+        return model.generate_content(contents, generation_config=generation_config, stream=stream,
+                                      request_options={'timeout': timeout})
+
+    # google-generativeai 0.3.0 has no request_options; give its gapic client the timeout directly
+    _require_legacy_sdk()
+    from google.generativeai import client
+    from google.generativeai.types import generation_types
+
+    request = model._prepare_request(contents=contents, generation_config=generation_config)
+    if model._client is None:
+        model._client = client.get_default_generative_client()
+    if stream:
+        with generation_types.rewrite_stream_error():
+            iterator = model._client.stream_generate_content(request, timeout=timeout)
+        return generation_types.GenerateContentResponse.from_iterator(iterator)
+    return generation_types.GenerateContentResponse.from_response(model._client.generate_content(request, timeout=timeout))
+
+
+async def generate_content_async(model, contents, generation_config, timeout, stream=False):
+    """Coroutine version of generate_content()"""
+    if _accepts_request_options(model.generate_content_async):
+        return await model.generate_content_async(contents, generation_config=generation_config, stream=stream,
+                                                  request_options={'timeout': timeout})
+
+    _require_legacy_sdk()
+    from google.generativeai import client
+    from google.generativeai.types import generation_types
+
+    request = model._prepare_request(contents=contents, generation_config=generation_config)
+    if model._async_client is None:
+        model._async_client = client.get_default_generative_async_client()
+    if stream:
+        with generation_types.rewrite_stream_error():
+            iterator = await model._async_client.stream_generate_content(request, timeout=timeout)
+        return await generation_types.AsyncGenerateContentResponse.from_aiterator(iterator)
+    response = await model._async_client.generate_content(request, timeout=timeout)
+    return generation_types.AsyncGenerateContentResponse.from_response(response)
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per model"""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_name, seconds):
+        with self._lock:
+            self._samples.setdefault(model_name, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model_name, pct, min_samples=1):
+        with self._lock:
+            samples = sorted(self._samples.get(model_name, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self):
+        with self._lock:
+            names = list(self._samples)
+        return {
+            name: {
+                'samples': len(self._samples[name]),
+                'p50_ms': round(self.percentile(name, 50) * 1000, 1),
+                'p95_ms': round(self.percentile(name, 95) * 1000, 1),
+            }
+            for name in names
+        }
+
+
+class LLMClient:
+    def __init__(self, genai, primary_model, models=(), deadline=20.0, max_retries=2,
+                 backoff_base=0.25, backoff_max=2.0, hedge=False, hedge_min_samples=20, max_workers=16):
+        """`primary_model` is a callable returning the current model name (it can change at runtime)"""
+        check_sdk(genai)
+        self.genai = genai
+        self.primary_model = primary_model
+        self.models = list(models)
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+
+        self.latency = LatencyTracker()
+        # Time to the first streamed chunk; kept apart from `latency`, which decides when generate() hedges
+        self.stream_latency = LatencyTracker()
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm')
+        self._models = {}
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'successes': 0, 'failures': 0, 'timeouts': 0, 'retries': 0, 'hedges': 0,
+                          'hedge_wins': 0, 'hedges_skipped': 0, 'fallbacks': 0, 'abandoned': 0}
+        self._in_flight = 0           # pool tasks queued or running
+        self._abandoned_running = 0   # of those, ones whose caller already gave up
+        self._async_in_flight = 0     # generate_async() calls running on the event loop
+        self._idle = threading.Condition(self._lock)
+
+    # ---------- model objects ----------
+
+    def model(self, model_name):
+        """Reusable GenerativeModel for model_name"""
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                model = self.genai.GenerativeModel(model_name)
+                self._models[model_name] = model
+            return model
+
+    def reset_models(self):
+        """Drop cached model objects and their transports (in a forked worker)"""
+        with self._lock:
+            self._models = {}
+
+    def secondary_model(self, primary):
+        for name in self.models:
+            if name != primary:
+                return name
+        return None
+
+    # ---------- calls ----------
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._counters[key] += amount
+
+    def _submit(self, fn, *args):
+        """Run fn on the shared pool, counting it as in flight until it finishes"""
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        with self._lock:
+            self._in_flight -= 1
+            if getattr(future, 'abandoned', False):
+                self._abandoned_running -= 1
+            self._idle.notify_all()
+
+    def _abandon(self, futures):
+        """The caller stopped waiting on these; they still hold pool threads until the transport times them out"""
+        for future in futures:
+            with self._lock:
+                if future.done():
+                    continue
+                future.abandoned = True
+                self._abandoned_running += 1
+                self._counters['abandoned'] += 1
+                self._idle.notify_all()
+
+    def wait_idle(self, timeout):
+        """Block until no call a caller still waits on is in flight, or timeout; True when idle"""
+        with self._idle:
+            return self._idle.wait_for(
+                lambda: self._in_flight - self._abandoned_running + self._async_in_flight <= 0, timeout)
+
+    def _pool_saturated(self):
+        with self._lock:
+            return self._in_flight >= self.max_workers
+
+    def _call(self, model_name, contents, generation_config, deadline_at):
+        start = time.time()
+        try:
+            response = generate_content(self.model(model_name), contents, generation_config, max(0.1, deadline_at - start))
+            text = response.text.strip() if response.text else ''
+        except Exception:
+            LLM_LATENCY.observe(time.time() - start, model=model_name, outcome='exception')
+            raise
+        elapsed = time.time() - start
+        self.latency.record(model_name, elapsed)
+        LLM_LATENCY.observe(elapsed, model=model_name, outcome='success')
+        return model_name, text
+
+    async def _call_async(self, model_name, contents, generation_config, deadline_at):
+        start = time.time()
+        with self._lock:
+            self._async_in_flight += 1
+        try:
+            response = await generate_content_async(self.model(model_name), contents, generation_config,
+                                                    max(0.1, deadline_at - start))
+            text = response.text.strip() if response.text else ''
+        except Exception:
+            LLM_LATENCY.observe(time.time() - start, model=model_name, outcome='exception')
+            raise
+        finally:
+            with self._lock:
+                self._async_in_flight -= 1
+                self._idle.notify_all()
+        elapsed = time.time() - start
+        self.latency.record(model_name, elapsed)
+        LLM_LATENCY.observe(elapsed, model=model_name, outcome='success')
+        return model_name, text
+
+    def record_fallback(self, seconds):
+        """Record that a caller answered with canned text after `seconds` because the LLM failed"""
+        self._count('fallbacks')
+        LLM_LATENCY.observe(seconds, model=self.primary_model(), outcome='fallback')
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def generate(self, contents, deadline=None, hedge=None, generation_config=None):
+        """Return the response text for `contents`, raising LLMTimeout/LLMError on failure"""
+        deadline_at = time.time() + (deadline if deadline is not None else self.deadline)
+        hedge = self.hedge if hedge is None else hedge
+        primary = self.primary_model()
+        last_error = None
+        self._count('calls')
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count('retries')
+                pause = self._backoff(attempt)
+                if time.time() + pause >= deadline_at:
+                    break
+                time.sleep(pause)
+
+            futures = {self._submit(self._call, primary, contents, generation_config, deadline_at)}
+            hedge_after = self.latency.percentile(primary, 95, self.hedge_min_samples) if hedge else None
+            secondary = self.secondary_model(primary) if hedge_after is not None else None
+
+            try:
+                if secondary:
+                    done, _ = wait(futures, timeout=max(0.0, min(hedge_after, deadline_at - time.time())))
+                    if not done and time.time() < deadline_at:
+                        if self._pool_saturated():
+                            self._count('hedges_skipped')
+                        else:
+                            self._count('hedges')
+                            futures.add(self._submit(self._call, secondary, contents, generation_config, deadline_at))
+
+                while futures:
+                    remaining = deadline_at - time.time()
+                    if remaining <= 0:
+                        break
+                    done, futures = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        try:
+                            model_name, text = future.result()
+                        except Exception as e:
+                            last_error = e
+                            print(f"⚠️ LLM call failed (attempt {attempt + 1}): {e}")
+                            continue
+                        if model_name != primary:
+                            self._count('hedge_wins')
+                        self._count('successes')
+                        return text
+            finally:
+                # The losing hedge or a call past the deadline keeps running until its request timeout
+                self._abandon(futures)
+
+            if time.time() >= deadline_at:
+                break
+
+        if time.time() >= deadline_at:
+            self._count('timeouts')
+            raise LLMTimeout(f"LLM call exceeded its deadline (last error: {last_error})")
+        self._count('failures')
+        raise LLMError(f"LLM call failed after {self.max_retries + 1} attempts: {last_error}")
+
+    async def generate_async(self, contents, deadline=None, hedge=None, generation_config=None):
+        """Coroutine version of generate() with the same deadline, retry and hedging behaviour"""
+        deadline_at = time.time() + (deadline if deadline is not None else self.deadline)
+        hedge = self.hedge if hedge is None else hedge
+        primary = self.primary_model()
+        last_error = None
+        self._count('calls')
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count('retries')
+                pause = self._backoff(attempt)
+                if time.time() + pause >= deadline_at:
+                    break
+                await asyncio.sleep(pause)
+
+            tasks = {asyncio.ensure_future(self._call_async(primary, contents, generation_config, deadline_at))}
+            hedge_after = self.latency.percentile(primary, 95, self.hedge_min_samples) if hedge else None
+            secondary = self.secondary_model(primary) if hedge_after is not None else None
+
+            try:
+                if secondary:
+                    done, _ = await asyncio.wait(tasks, timeout=max(0.0, min(hedge_after, deadline_at - time.time())))
+                    if not done and time.time() < deadline_at:
+                        self._count('hedges')
+                        tasks.add(asyncio.ensure_future(self._call_async(secondary, contents, generation_config, deadline_at)))
+
+                while tasks:
+                    remaining = deadline_at - time.time()
+                    if remaining <= 0:
+                        break
+                    done, tasks = await asyncio.wait(tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        try:
+                            model_name, text = task.result()
+                        except Exception as e:
+                            last_error = e
+                            print(f"⚠️ LLM call failed (attempt {attempt + 1}): {e}")
+                            continue
+                        if model_name != primary:
+                            self._count('hedge_wins')
+                        self._count('successes')
+                        return text
+            finally:
+                # The losing hedge or a call past the deadline is cancelled instead of left running
+                for task in tasks:
+                    task.cancel()
+
+            if time.time() >= deadline_at:
+                break
+
+        if time.time() >= deadline_at:
+            self._count('timeouts')
+            raise LLMTimeout(f"LLM call exceeded its deadline (last error: {last_error})")
+        self._count('failures')
+        raise LLMError(f"LLM call failed after {self.max_retries + 1} attempts: {last_error}")
+
+    async def stream_async(self, contents, deadline=None, generation_config=None):
+        """Async generator version of stream(): retries only until the first chunk arrives"""
+        deadline_at = time.time() + (deadline if deadline is not None else self.deadline)
+        primary = self.primary_model()
+        last_error = None
+        self._count('calls')
+
+        async def wait_for(awaitable):
+            remaining = deadline_at - time.time()
+            if remaining <= 0:
+                raise LLMTimeout("LLM stream exceeded its deadline")
+            try:
+                return await asyncio.wait_for(awaitable, remaining)
+            except asyncio.TimeoutError:
+                raise LLMTimeout("LLM stream exceeded its deadline") from None
+
+        async def next_chunk(iterator):
+            try:
+                chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                return None
+            return chunk.text or ''
+
+        async def open_stream():
+            response = await generate_content_async(self.model(primary), contents, generation_config,
+                                                    max(0.1, deadline_at - time.time()), stream=True)
+            iterator = response.__aiter__()
+            return iterator, await next_chunk(iterator)
+
+        start = time.time()
+        iterator = first = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count('retries')
+                pause = self._backoff(attempt)
+                if time.time() + pause >= deadline_at:
+                    break
+                await asyncio.sleep(pause)
+            attempt_start = time.time()
+            try:
+                iterator, first = await wait_for(open_stream())
+                self.stream_latency.record(primary, time.time() - attempt_start)
+                break
+            except LLMTimeout:
+                self._count('timeouts')
+                LLM_LATENCY.observe(time.time() - attempt_start, model=primary, outcome='exception')
+                raise
+            except Exception as e:
+                last_error = e
+                LLM_LATENCY.observe(time.time() - attempt_start, model=primary, outcome='exception')
+                print(f"⚠️ LLM stream failed to start (attempt {attempt + 1}): {e}")
+
+        if iterator is None:
+            self._count('failures')
+            raise LLMError(f"LLM stream failed to start: {last_error}")
+
+        chunk = first
+        try:
+            while chunk is not None:
+                if chunk:
+                    yield chunk
+                chunk = await wait_for(next_chunk(iterator))
+        except Exception as e:
+            if isinstance(e, LLMTimeout):
+                self._count('timeouts')
+            LLM_LATENCY.observe(time.time() - start, model=primary, outcome='exception')
+            raise
+        LLM_LATENCY.observe(time.time() - start, model=primary, outcome='success')
+        self._count('successes')
+
+    def stream(self, contents, deadline=None, generation_config=None):
+        """Yield response text chunks as the model produces them.
+
+        Retries (with backoff) happen only until the first chunk arrives; after
+        that an error is raised to the caller, who already holds partial text.
+        """
+        deadline_at = time.time() + (deadline if deadline is not None else self.deadline)
+        primary = self.primary_model()
+        last_error = None
+        self._count('calls')
+
+        def next_chunk(iterator):
+            chunk = next(iterator, None)
+            return None if chunk is None else (chunk.text or '')
+
+        def wait_for(fn, *args):
+            remaining = deadline_at - time.time()
+            if remaining <= 0:
+                raise LLMTimeout("LLM stream exceeded its deadline")
+            future = self._submit(fn, *args)
+            done, _ = wait({future}, timeout=remaining)
+            if not done:
+                self._abandon([future])
+                raise LLMTimeout("LLM stream exceeded its deadline")
+            return done.pop().result()
+
+        def open_stream():
+            response = generate_content(self.model(primary), contents, generation_config,
+                                        max(0.1, deadline_at - time.time()), stream=True)
+            iterator = iter(response)
+            return iterator, next_chunk(iterator)
+
+        start = time.time()
+        iterator = first = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count('retries')
+                pause = self._backoff(attempt)
+                if time.time() + pause >= deadline_at:
+                    break
+                time.sleep(pause)
+            attempt_start = time.time()
+            try:
+                iterator, first = wait_for(open_stream)
+                self.stream_latency.record(primary, time.time() - attempt_start)
+                break
+            except LLMTimeout:
+                self._count('timeouts')
+                LLM_LATENCY.observe(time.time() - attempt_start, model=primary, outcome='exception')
+                raise
+            except Exception as e:
+                last_error = e
+                LLM_LATENCY.observe(time.time() - attempt_start, model=primary, outcome='exception')
+                print(f"⚠️ LLM stream failed to start (attempt {attempt + 1}): {e}")
+
+        if iterator is None:
+            self._count('failures')
+            raise LLMError(f"LLM stream failed to start: {last_error}")
+
+        chunk = first
+        try:
+            while chunk is not None:
+                if chunk:
+                    yield chunk
+                chunk = wait_for(next_chunk, iterator)
+        except Exception as e:
+            if isinstance(e, LLMTimeout):
+                self._count('timeouts')
+            LLM_LATENCY.observe(time.time() - start, model=primary, outcome='exception')
+            raise
+        LLM_LATENCY.observe(time.time() - start, model=primary, outcome='success')
+        self._count('successes')
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters['in_flight'] = self._in_flight
+            counters['abandoned_running'] = self._abandoned_running
+        counters['max_workers'] = self.max_workers
+        counters['latency'] = self.latency.snapshot()
+        counters['stream_first_chunk_latency'] = self.stream_latency.snapshot()
+        counters['hedging'] = self.hedge
+        return counters
@@ -0,0 +1,247 @@
+"""Load test: simulated candidates running whole interviews against the server.
+
+Each candidate arrives on a Poisson schedule, starts an interview, answers a
+number of questions (optionally uploading synthetic audio to the STT endpoint
+first), ends the interview and polls until the feedback is ready. Latency
+percentiles are reported per endpoint.
+
+By default the server runs in-process against the offline fakes in fakes.py
+(no API keys, network or models needed), so it can run in CI; --base-url
+drives an already running server instead.
+
+Usage:
+    python load_test.py [--candidates 20] [--arrival-rate 2] [--turns 4] [--audio]
+                        [--llm-latency lognormal:400,0.4] [--stt-latency lognormal:150,0.3]
+                        [--base-url http://localhost:5000] [--json results.json]
+                        [--max-p95 respond=1500 ...]
+"""
+import argparse
+import json
+import logging
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+import requests
+
+from fakes import import_app_with_fakes
+
+CANDIDATE_ANSWERS = [
+    "Hi, I'm {name}. I applied for the Backend Engineer role and I mostly work with Python, Flask and PostgreSQL.",
+    "A process has its own memory space while threads share the memory of their process, so threads are cheaper but need synchronization.",
+    "I would use a token bucket per API key stored in Redis, refilled at a fixed rate, and reject requests when the bucket is empty.",
+    "A hash map pointing into a doubly linked list gives O(1) lookups and O(1) moves to the front on access.",
+    "I mock the external service at the client boundary in unit tests and run contract tests against a sandbox in CI.",
+    "I would take heap snapshots over time, compare which object types keep growing and trace them back to their allocation sites.",
+]
+NAMES = ["Alex", "Priya", "Sam", "Jordan", "Mei", "Omar", "Lena", "Diego"]
+
+ENDPOINTS = ["start-interview", "stt-stream", "respond", "end-interview", "feedback-ready"]
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Results:
+    def __init__(self):
+        self.latencies = {endpoint: [] for endpoint in ENDPOINTS}
+        self.errors = {endpoint: 0 for endpoint in ENDPOINTS}
+        self.completed_interviews = 0
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, ok=True):
+        with self._lock:
+            if ok:
+                self.latencies[endpoint].append(seconds)
+            else:
+                self.errors[endpoint] += 1
+
+    def interview_done(self):
+        with self._lock:
+            self.completed_interviews += 1
+
+    def summary(self, elapsed):
+        rows = {}
+        total_requests = 0
+        for endpoint in ENDPOINTS:
+            samples = self.latencies[endpoint]
+            if not samples and not self.errors[endpoint]:
+                continue
+            if endpoint != "feedback-ready":
+                total_requests += len(samples) + self.errors[endpoint]
+            rows[endpoint] = {
+                'count': len(samples),
+                'errors': self.errors[endpoint],
+                'p50_ms': round(percentile(samples, 50) * 1000, 1) if samples else None,
+                'p95_ms': round(percentile(samples, 95) * 1000, 1) if samples else None,
+                'p99_ms': round(percentile(samples, 99) * 1000, 1) if samples else None,
+            }
+        return {
+            'elapsed_seconds': round(elapsed, 2),
+            'requests': total_requests,
+            'requests_per_second': round(total_requests / elapsed, 2) if elapsed else None,
+            'interviews_completed': self.completed_interviews,
+            'interviews_per_minute': round(self.completed_interviews * 60 / elapsed, 2) if elapsed else None,
+            'endpoints': rows,
+        }
+
+
+def synthetic_answer_audio(seconds, sample_rate=16000, seed=0):
+    """PCM16 'speech': a tone with short pauses, followed by trailing silence so endpointing can end the turn"""
+    rng = np.random.default_rng(seed)
+    parts = []
+    for _ in range(max(1, int(seconds / 1.2))):
+        t = np.arange(int(0.9 * sample_rate)) / sample_rate
+        parts.append(3000 * np.sin(2 * np.pi * 180 * t))
+        parts.append(rng.normal(0, 40, int(0.3 * sample_rate)))
+    parts.append(rng.normal(0, 40, int(3.0 * sample_rate)))
+    return np.concatenate(parts).astype(np.int16).tobytes()
+
+
+def run_candidate(index, base_url, args, results):
+    name = NAMES[index % len(NAMES)]
+    http = requests.Session()
+
+    def call(endpoint, method, path, **kwargs):
+        start = time.time()
+        try:
+            response = http.request(method, base_url + path, timeout=args.timeout, **kwargs)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            response, ok = None, False
+        results.record(endpoint, time.time() - start, ok)
+        return response.json() if ok else None
+
+    started = call("start-interview", "POST", "/api/start-interview", json={'role': 'Backend Engineer', 'techstack': ['Python']})
+    if not started:
+        return
+    session_id = started['session_id']
+
+    for turn in range(args.turns):
+        time.sleep(args.think_time)
+        answer = CANDIDATE_ANSWERS[turn % len(CANDIDATE_ANSWERS)].format(name=name)
+        if args.audio:
+            call("stt-stream", "POST", f"/stt/stream/{session_id}",
+                 data=synthetic_answer_audio(args.audio_seconds, seed=index * 1000 + turn),
+                 headers={'Content-Type': 'application/octet-stream'})
+        if not call("respond", "POST", "/api/respond", json={'session_id': session_id, 'response': answer}):
+            return
+
+    ended_at = time.time()
+    ended = call("end-interview", "POST", f"/api/end-interview/{session_id}")
+    if not ended:
+        return
+
+    # Time until the background feedback is available, measured from the end request
+    feedback_url = ended.get('feedback_url')
+    while feedback_url and time.time() - ended_at < args.timeout:
+        response = http.get(base_url + feedback_url, timeout=args.timeout)
+        status = response.json().get('status') if response.status_code == 200 else 'failed'
+        if status in ('completed', 'failed'):
+            results.record("feedback-ready", time.time() - ended_at, status == 'completed')
+            break
+        time.sleep(0.05)
+    results.interview_done()
+
+
+def start_in_process_server(args):
+    """Import the app with every external dependency replaced by fakes and serve it on a free port"""
+    server_app = import_app_with_fakes(
+        FAKE_LLM_LATENCY=args.llm_latency,
+        FAKE_STT_TURN_LATENCY=args.stt_latency,
+    )
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, server_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def print_report(summary):
+    print(f"\n{'endpoint':<16} {'count':>6} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint, row in summary['endpoints'].items():
+        cells = [f"{row[key]:>9.1f}" if row[key] is not None else f"{'-':>9}" for key in ('p50_ms', 'p95_ms', 'p99_ms')]
+        print(f"{endpoint:<16} {row['count']:>6} {row['errors']:>7} {' '.join(cells)}")
+    print(f"\n📊 {summary['requests']} requests in {summary['elapsed_seconds']}s "
+          f"({summary['requests_per_second']} req/s), "
+          f"{summary['interviews_completed']} interviews completed ({summary['interviews_per_minute']}/min)")
+
+
+def check_thresholds(summary, thresholds):
+    """Return a list of endpoint p95 thresholds that were exceeded (endpoint=ms)"""
+    failures = []
+    for threshold in thresholds:
+        endpoint, _, limit = threshold.partition('=')
+        row = summary['endpoints'].get(endpoint)
+        if row is None or row['p95_ms'] is None:
+            failures.append(f"{endpoint}: no successful samples")
+        elif row['p95_ms'] > float(limit):
+            failures.append(f"{endpoint}: p95 {row['p95_ms']}ms > {limit}ms")
+        elif row['errors']:
+            failures.append(f"{endpoint}: {row['errors']} errors")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--arrival-rate", type=float, default=2.0, help="candidates arriving per second (Poisson)")
+    parser.add_argument("--turns", type=int, default=4, help="answers per interview")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds between receiving a question and answering")
+    parser.add_argument("--audio", action="store_true", help="upload synthetic answer audio to /stt/stream before each answer")
+    parser.add_argument("--audio-seconds", type=float, default=2.4)
+    parser.add_argument("--llm-latency", default="lognormal:400,0.4", help="fake Gemini latency (in-process only)")
+    parser.add_argument("--stt-latency", default="lognormal:150,0.3", help="fake AssemblyAI per-turn latency (in-process only)")
+    parser.add_argument("--base-url", help="drive a running server instead of an in-process one with fakes")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="also write the summary to this file")
+    parser.add_argument("--max-p95", nargs="*", default=[], metavar="ENDPOINT=MS",
+                        help="exit non-zero when an endpoint's p95 exceeds the limit (for CI)")
+    args = parser.parse_args()
+
+    if args.base_url:
+        base_url, server = args.base_url.rstrip('/'), None
+    else:
+        base_url, server = start_in_process_server(args)
+    print(f"🚀 {args.candidates} candidates at {args.arrival_rate}/s against {base_url}"
+          f"{'' if args.base_url else ' (in-process, fake backends)'}")
+
+    rng = random.Random(args.seed)
+    results = Results()
+    threads = []
+    start = time.time()
+    for index in range(args.candidates):
+        thread = threading.Thread(target=run_candidate, args=(index, base_url, args, results), daemon=True)
+        thread.start()
+        threads.append(thread)
+        time.sleep(rng.expovariate(args.arrival_rate))
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+
+    if server:
+        server.shutdown()
+
+    summary = results.summary(elapsed)
+    print_report(summary)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+    failures = check_thresholds(summary, args.max_p95)
+    for failure in failures:
+        print(f"❌ {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
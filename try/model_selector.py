@@ -0,0 +1,229 @@
+"""Gemini model selection with concurrent probes, a persisted choice and background re-validation.
+
+Startup used to probe every candidate one after another (and then every model
+from genai.list_models()) before the server could bind its port. Now:
+
+- a persisted choice younger than the TTL is used immediately, no probes;
+- a stale persisted choice is still used immediately and re-validated in the background
+  (or, with select(revalidate_stale=False), as soon as start_background_revalidation() runs);
+- with nothing persisted, candidates are probed concurrently with a per-probe timeout.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+from llm_client import generate_content
+
+PROBE_PROMPT = "Say 'Hello' in one word."
+
+
+def gemini_probe(genai, prompt=PROBE_PROMPT, timeout=8.0):
+    """Probe function that asks `model_name` for a one-word reply, giving up at the transport after timeout"""
+    def probe(model_name):
+        response = generate_content(genai.GenerativeModel(model_name), prompt, None, timeout)
+        return bool(response.text)
+    return probe
+
+
+class ModelSelector:
+    def __init__(self, candidates, probe, list_candidates=None, cache_path=None,
+                 ttl_seconds=6 * 3600, probe_timeout=8.0, revalidate_interval=None):
+        self.candidates = list(candidates)
+        self.probe = probe
+        self.list_candidates = list_candidates
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.probe_timeout = probe_timeout
+        self.revalidate_interval = revalidate_interval or ttl_seconds
+
+        self.current = None
+        self.selected_at = None
+        self.source = None
+        self.last_probe = {}
+        self.last_probe_at = None
+
+        self._lock = threading.Lock()
+        self._revalidator = None
+        self._stop = threading.Event()
+        self._stale = False
+
+    # ---------- probing ----------
+
+    def probe_all(self, names):
+        """Probe `names` concurrently; return {name: {'ok', 'latency_ms', 'error'}} within probe_timeout"""
+        results = queue.Queue()
+
+        def run(name):
+            start = time.time()
+            try:
+                ok = self.probe(name)
+                results.put((name, ok, time.time() - start, None))
+            except Exception as e:
+                results.put((name, False, time.time() - start, str(e)))
+
+        # Daemon threads so a hung probe never blocks selection or shutdown
+        for name in names:
+            threading.Thread(target=run, args=(name,), daemon=True).start()
+
+        outcome = {name: {'ok': False, 'latency_ms': None, 'error': 'not awaited'} for name in names}
+        deadline = time.time() + self.probe_timeout
+        pending = set(names)
+        while pending:
+            remaining = deadline - time.time()
+            try:
+                name, ok, elapsed, error = results.get(timeout=remaining) if remaining > 0 else results.get_nowait()
+            except queue.Empty:
+                for name in pending:
+                    outcome[name]['error'] = f'timeout after {self.probe_timeout}s'
+                break
+            pending.discard(name)
+            outcome[name] = {'ok': bool(ok), 'latency_ms': round(elapsed * 1000, 1), 'error': error}
+            # Candidates are in preference order; stop once a working one has no pending predecessor
+            if self._settled(outcome, names, pending):
+                break
+
+        with self._lock:
+            self.last_probe = outcome
+            self.last_probe_at = time.time()
+        return outcome
+
+    @staticmethod
+    def _settled(outcome, names, pending):
+        for name in names:
+            if name in pending:
+                return False
+            if outcome[name]['ok']:
+                return True
+        return False
+
+    def _pick(self, outcome, names):
+        for name in names:
+            if outcome.get(name, {}).get('ok'):
+                return name
+        return None
+
+    def _probe_and_pick(self):
+        print(f"🔍 Probing {len(self.candidates)} Gemini models concurrently...")
+        outcome = self.probe_all(self.candidates)
+        return self._pick(outcome, self.candidates) or self._probe_listed()
+
+    def _probe_listed(self):
+        """None of the preferred models answered - fall back to whatever the API lists"""
+        if not self.list_candidates:
+            return None
+        try:
+            extra = [name for name in self.list_candidates() if name not in self.candidates]
+        except Exception as e:
+            print(f"Error searching for models: {e}")
+            return None
+        if not extra:
+            return None
+        outcome = self.probe_all(extra)
+        return self._pick(outcome, extra)
+
+    # ---------- persistence ----------
+
+    def _load_persisted(self):
+        if not self.cache_path:
+            return None
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _persist(self):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'model': self.current, 'selected_at': self.selected_at}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠️ Could not persist selected model: {e}")
+
+    def _set_current(self, name, source):
+        with self._lock:
+            self.current = name
+            self.selected_at = time.time()
+            self.source = source
+        self._persist()
+
+    # ---------- public API ----------
+
+    def select(self, revalidate_stale=True):
+        """Return a working model name, probing only when nothing usable is persisted"""
+        persisted = self._load_persisted()
+        if persisted and persisted.get('model'):
+            with self._lock:
+                self.current = persisted['model']
+                self.selected_at = persisted.get('selected_at') or 0
+                self.source = 'cache'
+            age = time.time() - self.selected_at
+            if age < self.ttl_seconds:
+                print(f"✅ Using cached model {self.current} (selected {int(age)}s ago)")
+            else:
+                print(f"♻️ Using last known-good model {self.current}; re-validating in background")
+                if revalidate_stale:
+                    threading.Thread(target=self.revalidate, daemon=True).start()
+                else:
+                    self._stale = True  # the first background re-validation runs right away
+            return self.current
+
+        chosen = self._probe_and_pick()
+        if chosen:
+            print(f"✅ Successfully connected to model: {chosen}")
+            self._set_current(chosen, 'probe')
+        return chosen
+
+    def revalidate(self):
+        """Re-probe candidates; keep the current model if it still answers, otherwise switch"""
+        names = list(dict.fromkeys(([self.current] if self.current else []) + self.candidates))
+        outcome = self.probe_all(names)
+        if self.current and outcome.get(self.current, {}).get('ok'):
+            self._set_current(self.current, 'revalidated')
+            return self.current
+
+        chosen = self._pick(outcome, self.candidates) or self._probe_listed()
+        if chosen:
+            print(f"🔁 Switching Gemini model {self.current} -> {chosen}")
+            self._set_current(chosen, 'revalidated')
+        else:
+            print(f"⚠️ Re-validation found no working model; keeping {self.current}")
+        return self.current
+
+    def start_background_revalidation(self):
+        """Re-validate every revalidate_interval seconds while the server keeps serving"""
+        if self._revalidator and self._revalidator.is_alive():
+            return
+
+        def loop():
+            wait = 0 if self._stale else self.revalidate_interval
+            while not self._stop.wait(wait):
+                wait = self.revalidate_interval
+                try:
+                    self.revalidate()
+                except Exception as e:
+                    print(f"⚠️ Model re-validation failed: {e}")
+                self._stale = False
+
+        self._revalidator = threading.Thread(target=loop, name='model-revalidator', daemon=True)
+        self._revalidator.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def health(self):
+        with self._lock:
+            return {
+                'current': self.current,
+                'source': self.source,
+                'selected_at': self.selected_at,
+                'last_probe_at': self.last_probe_at,
+                'probe_latencies_ms': {name: r['latency_ms'] for name, r in self.last_probe.items()},
+                'probe_results': dict(self.last_probe),
+            }
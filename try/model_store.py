@@ -0,0 +1,207 @@
+"""Pinned, offline-capable artifact cache for the Silero TTS model.
+
+Startup used to fetch the upstream models.yml and resolve the model through
+torch.hub on every import, which costs network round-trips and fails outright
+without network. This module loads both artifacts straight from a local cache
+directory and verifies them against pinned SHA-256 hashes.
+
+    python model_store.py prefetch   # fill the cache (needs network once)
+    python model_store.py verify     # check cached artifacts against their pins
+
+`prefetch --force` re-downloads and still enforces the pinned hash, or the
+hash recorded in the manifest when there is no pin. A deliberate upstream
+change is taken only with `prefetch --force --accept-new-hash`.
+
+Set TTS_OFFLINE=1 to forbid any download at runtime.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.getenv('SILERO_CACHE_DIR', os.path.join(BASE_DIR, 'model_cache'))
+TTS_OFFLINE = os.getenv('TTS_OFFLINE', '0') == '1'
+
+MANIFEST_NAME = 'manifest.json'
+
+# Pinned artifacts. models.yml is pinned to the copy committed next to this file;
+# a checkpoint without a pinned hash is trusted on first download and the hash
+# recorded in the cache manifest is enforced from then on.
+MODEL_PINS = {
+    'models_yml': {
+        'version': 'silero-models@3e0ef16d',
+        'url': 'https://raw.githubusercontent.com/snakers4/silero-models/master/models.yml',
+        'bundled': os.path.join(BASE_DIR, 'latest_silero_models.yml'),
+        'filename': 'models.yml',
+        'sha256': '3e0ef16d0a0620f42045b76dc6e3a8fabaabf3c832e6101e68fb5a5b6aeecaeb',
+    },
+    'v3_en': {
+        'version': 'v3_en',
+        'url': 'https://models.silero.ai/models/tts/en/v3_en.pt',
+        'filename': 'v3_en.pt',
+        'sha256': os.getenv('SILERO_V3_EN_SHA256') or None,
+    },
+}
+
+
+class ModelStoreError(Exception):
+    """Raised when a pinned artifact is missing or does not match its hash"""
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _manifest_path():
+    return os.path.join(CACHE_DIR, MANIFEST_NAME)
+
+
+def _load_manifest():
+    try:
+        with open(_manifest_path()) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(manifest):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = _manifest_path() + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, _manifest_path())
+
+
+def _expected_hash(name, manifest):
+    return MODEL_PINS[name]['sha256'] or manifest.get(name, {}).get('sha256')
+
+
+def artifact_path(name):
+    return os.path.join(CACHE_DIR, MODEL_PINS[name]['filename'])
+
+
+def _fetch(name, force=False, accept_new_hash=False):
+    """Put artifact `name` into the cache (bundled copy or download) and verify it.
+
+    accept_new_hash lets an artifact without a pinned hash replace the one recorded in the manifest.
+    """
+    pin = MODEL_PINS[name]
+    path = artifact_path(name)
+    manifest = _load_manifest()
+
+    if os.path.exists(path) and not force:
+        return _verify(name, manifest)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.part')
+    os.close(fd)
+    try:
+        bundled = pin.get('bundled')
+        if bundled and os.path.exists(bundled) and _sha256(bundled) == pin['sha256']:
+            shutil.copyfile(bundled, tmp_path)
+        else:
+            if TTS_OFFLINE:
+                raise ModelStoreError(f"{name} is not cached in {CACHE_DIR} and TTS_OFFLINE=1. Run `python model_store.py prefetch` first.")
+            print(f"⬇️ Downloading {name} from {pin['url']}...")
+            urllib.request.urlretrieve(pin['url'], tmp_path)
+
+        actual = _sha256(tmp_path)
+        expected = pin['sha256'] if accept_new_hash else _expected_hash(name, manifest)
+        if expected and actual != expected:
+            hint = '' if pin['sha256'] else " If upstream changed on purpose, re-run with `prefetch --force --accept-new-hash`."
+            raise ModelStoreError(f"{name} hash mismatch: expected {expected}, got {actual}.{hint}")
+        if accept_new_hash and manifest.get(name, {}).get('sha256') not in (None, actual):
+            print(f"⚠️ Accepting new hash for {name}: {manifest[name]['sha256'][:16]}... -> {actual[:16]}...")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    manifest[name] = {'version': pin['version'], 'url': pin['url'], 'sha256': actual}
+    _save_manifest(manifest)
+    print(f"✅ Cached {name} ({pin['version']}) sha256={actual[:16]}...")
+    return path
+
+
+def _verify(name, manifest=None):
+    """Return the cached path for `name` after checking it against its pin"""
+    manifest = manifest if manifest is not None else _load_manifest()
+    path = artifact_path(name)
+    if not os.path.exists(path):
+        raise ModelStoreError(f"{name} is not cached at {path}")
+
+    expected = _expected_hash(name, manifest)
+    actual = _sha256(path)
+    if expected and actual != expected:
+        raise ModelStoreError(f"{name} hash mismatch: expected {expected}, got {actual}. Re-run `python model_store.py prefetch --force`.")
+    if not expected:
+        manifest[name] = {'version': MODEL_PINS[name]['version'], 'url': MODEL_PINS[name]['url'], 'sha256': actual}
+        _save_manifest(manifest)
+    return path
+
+
+def ensure_artifact(name):
+    """Path to a verified local copy of `name`, downloading only if allowed and needed"""
+    return _fetch(name)
+
+
+def load_models_yml():
+    """The pinned Silero models.yml as an OmegaConf object"""
+    from omegaconf import OmegaConf
+
+    return OmegaConf.load(ensure_artifact('models_yml'))
+
+
+def load_tts_model(model_id='v3_en', device=None):
+    """Load a Silero TTS package from the local cache without going through torch.hub"""
+    import torch
+    from torch.package import PackageImporter
+
+    path = ensure_artifact(model_id)
+    importer = PackageImporter(path)
+    model = importer.load_pickle('tts_models', 'model')
+    model.to(device or torch.device('cpu'))
+    return model
+
+
+def prefetch(force=False, accept_new_hash=False):
+    for name in MODEL_PINS:
+        _fetch(name, force=force, accept_new_hash=accept_new_hash)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the local Silero model artifact cache')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    prefetch_parser = subparsers.add_parser('prefetch', help='Download and pin all artifacts')
+    prefetch_parser.add_argument('--force', action='store_true', help='Re-download even if already cached')
+    prefetch_parser.add_argument('--accept-new-hash', action='store_true',
+                                 help='With --force, record a changed hash for artifacts that have no pinned hash')
+    subparsers.add_parser('verify', help='Verify cached artifacts against their pinned hashes')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'prefetch':
+            if args.accept_new_hash and not args.force:
+                parser.error('--accept-new-hash requires --force')
+            prefetch(force=args.force, accept_new_hash=args.accept_new_hash)
+        else:
+            manifest = _load_manifest()
+            for name in MODEL_PINS:
+                _verify(name, manifest)
+                print(f"✅ {name}: {manifest.get(name, {}).get('sha256', '')[:16]}... OK")
+    except ModelStoreError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
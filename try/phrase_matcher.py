@@ -0,0 +1,129 @@
+"""Single-pass multi-phrase matching over candidate answers.
+
+Every vocabulary the server scans answers for (skills, experience levels,
+stop phrases, topics, ...) is compiled into one Aho-Corasick automaton, so a
+response is read once no matter how many phrases there are. Matches respect
+word boundaries ("java" does not fire inside "javascript", "lead" not inside
+"leadership") and every surface form maps to a canonical name, which gives a
+synonym/alias table for free ("k8s" -> "kubernetes").
+
+Vocabularies are JSON files in vocab/, one per category:
+    {"<canonical>": ["<surface form>", "<alias>", ...], ...}
+"""
+import json
+import os
+from collections import deque
+
+VOCAB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vocab')
+
+# Typographic quotes from speech-to-text or mobile keyboards ("that’s all")
+_NORMALIZE = str.maketrans({'’': "'", '‘': "'", '“': '"', '”': '"'})
+
+
+def normalize(text):
+    """Lowercase and fold typographic quotes"""
+    return text.lower().translate(_NORMALIZE)
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+class PhraseMatcher:
+    def __init__(self, vocabulary):
+        """vocabulary: {category: {canonical: [surface forms]}}"""
+        self.vocabulary = vocabulary
+        # (category, canonical, surface) per pattern id
+        self._patterns = []
+        # Trie as parallel lists: outgoing edges, failure link, pattern ids ending here
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for category, entries in vocabulary.items():
+            for canonical, surfaces in entries.items():
+                for surface in surfaces:
+                    surface = normalize(surface.strip())
+                    if surface:
+                        self._add(surface, (category, canonical, surface))
+        self._build_failure_links()
+
+    def _add(self, surface, pattern):
+        node = 0
+        for ch in surface:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(len(self._patterns))
+        self._patterns.append(pattern)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                # Inherit the matches of the longest proper suffix
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text):
+        """All whole-word matches in text as (category, canonical, surface, start, end), in text order"""
+        text = normalize(text)
+        matches = []
+        node = 0
+        for index, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for pattern_id in self._output[node]:
+                category, canonical, surface = self._patterns[pattern_id]
+                start, end = index - len(surface) + 1, index + 1
+                if _is_word_char(surface[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(surface[-1]) and end < len(text) and _is_word_char(text[end]):
+                    continue
+                matches.append((category, canonical, surface, start, end))
+        matches.sort(key=lambda match: (match[3], -match[4]))
+        return matches
+
+    def match(self, text):
+        """Canonical names found in text per category, each listed once in order of first appearance.
+
+        Within a category overlapping matches resolve leftmost-longest, so
+        "node.js" counts as node and not also as "js".
+        """
+        found = {category: [] for category in self.vocabulary}
+        covered = {}
+        for category, canonical, _, start, end in self.find(text):
+            if start < covered.get(category, 0):
+                continue
+            covered[category] = end
+            if canonical not in found[category]:
+                found[category].append(canonical)
+        return found
+
+    def first_in_vocabulary_order(self, category, canonicals):
+        """The match that comes first in the vocabulary file (for ranked categories like experience levels)"""
+        for canonical in self.vocabulary.get(category, ()):
+            if canonical in canonicals:
+                return canonical
+        return None
+
+
+def load_vocabulary(directory=VOCAB_DIR):
+    """Read every <category>.json in directory"""
+    vocabulary = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                vocabulary[name[:-len('.json')]] = json.load(f)
+    return vocabulary
@@ -0,0 +1,98 @@
+"""Per-card prompt context, built once and reused as a stable prompt prefix.
+
+The interview card (role, level, tech stack, type, prepared questions) fully
+determines the interviewer's prompts, and many sessions share a card. The
+context is built once per unique card: the full system prompt (kept in the
+session history) and a compact scope text used as a fixed chat prefix:
+
+    [user: <card scope>, model: <acknowledgement>, ...per-turn delta...]
+
+Each turn then appends only what changed (the conversation under its token
+budget and the instruction) instead of rebuilding scope text from scratch.
+
+google-generativeai 0.3.0 has neither system_instruction nor the
+cached-content API, so the prefix is sent, and billed, with every request.
+Implicit prefix caching is not something to count on, so the prefix is kept
+as short as the card scope text the per-turn prompt always carried, not the
+full system prompt. It is byte-identical across turns and sessions, so any
+prefix caching that does apply still hits, and an explicit cache can take
+over the full system prompt here once the SDK is upgraded.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+ACKNOWLEDGEMENT = "Understood. I will conduct this interview strictly within the card scope and follow these rules."
+
+
+def card_key(role, level, techstack, interview_type, questions):
+    """Stable identity of an interview card"""
+    card = {
+        'role': role,
+        'level': level,
+        'techstack': list(techstack) if isinstance(techstack, (list, tuple)) else techstack,
+        'type': interview_type,
+        'questions': list(questions or []),
+    }
+    return hashlib.sha256(json.dumps(card, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def user_content(text):
+    return {'role': 'user', 'parts': [text]}
+
+
+def model_content(text):
+    return {'role': 'model', 'parts': [text]}
+
+
+class CardContext:
+    def __init__(self, key, system_prompt, scope_prompt):
+        self.key = key
+        self.system_prompt = system_prompt
+        self.scope_prompt = scope_prompt
+        self.prefix = (user_content(scope_prompt), model_content(ACKNOWLEDGEMENT))
+
+    def contents(self, *turns):
+        """Full request contents: the shared prefix followed by this turn's messages"""
+        return list(self.prefix) + list(turns)
+
+
+class PromptContextCache:
+    """LRU of CardContext objects keyed by card"""
+
+    def __init__(self, max_cards=256):
+        self.max_cards = max_cards
+        self._contexts = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build_system_prompt, build_scope_prompt):
+        """Context for key, calling the builders only the first time a card is seen"""
+        with self._lock:
+            context = self._contexts.get(key)
+            if context is not None:
+                self._contexts.move_to_end(key)
+                self.hits += 1
+                return context
+            self.misses += 1
+
+        context = CardContext(key, build_system_prompt(), build_scope_prompt())
+        with self._lock:
+            context = self._contexts.setdefault(key, context)
+            self._contexts.move_to_end(key)
+            while len(self._contexts) > self.max_cards:
+                self._contexts.popitem(last=False)
+        return context
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'cards': len(self._contexts),
+                'max_cards': self.max_cards,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            }
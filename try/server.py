@@ -1,42 +1,46 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
+import os
+import time
 import torch
-from omegaconf import OmegaConf
-import urllib.request
 import sounddevice as sd
 import speech_recognition as sr
 import pyttsx3
 
-app = Flask(__name__)
+from model_store import load_models_yml, load_tts_model
+from tts_audio import audio_to_pcm16, iter_wav_chunks
 
-url = "https://raw.githubusercontent.com/snakers4/silero-models/master/models.yml"
-urllib.request.urlretrieve(url, "latest_silero_models.yml")
+app = Flask(__name__)
 
-models = OmegaConf.load("latest_silero_models.yml")
+# Load pinned artifacts from the local cache (see model_store.py; run `python model_store.py prefetch` once)
+models = load_models_yml()
 
 language = "en"
 model_id = "v3_en"
 device = torch.device("cpu")
 
-model, _ = torch.hub.load(
-    repo_or_dir="snakers4/silero-models",
-    model="silero_tts",
-    language=language,
-    speaker=model_id,
-)
-model.to(device)
+model = load_tts_model(model_id, device)
 
 recognizer = sr.Recognizer()
 engine = pyttsx3.init()
 
+# TTS output mode: "play" speaks on the server's speakers, "stream" returns WAV audio to the caller
+TTS_MODE = os.getenv("TTS_MODE", "play")
+TTS_MODES = ("play", "stream")
+
 
 @app.route("/tts", methods=["POST"])
 def tts():
     data = request.get_json()
     text = data.get("text", "Hello from Silero TTS")
     speaker = data.get("speaker", "en_10")
+    mode = data.get("mode", TTS_MODE)
     sample_rate = 24000
 
+    if mode not in TTS_MODES:
+        return jsonify({"status": "error", "message": f"Unknown TTS mode '{mode}', expected one of {list(TTS_MODES)}"}), 400
+
     # Generate audio
+    synthesis_start = time.time()
     audio = model.apply_tts(
         text=text,
         speaker=speaker,
@@ -44,6 +48,20 @@ def tts():
         put_accent=True,
         put_yo=True,
     )
+    synthesis_ms = round((time.time() - synthesis_start) * 1000, 1)
+
+    if mode == "stream":
+        # Send the waveform back as soon as synthesis is done; the request ends when the bytes are sent
+        pcm = audio_to_pcm16(audio)
+        return Response(
+            stream_with_context(iter_wav_chunks(pcm, sample_rate)),
+            mimetype="audio/wav",
+            headers={
+                "X-TTS-Speaker": speaker,
+                "X-TTS-Sample-Rate": str(sample_rate),
+                "X-TTS-Synthesis-Ms": str(synthesis_ms),
+            },
+        )
 
     # Play audio automatically
     sd.play(audio, sample_rate)
@@ -74,7 +92,7 @@ def home():
     return jsonify({
         "message": "Speech Server is running!",
         "routes": {
-            "POST /tts": "Convert text to speech",
+            "POST /tts": "Convert text to speech (mode: play on server or stream WAV back)",
             "GET /stt": "Convert microphone speech to text"
         }
     })
@@ -0,0 +1,385 @@
+"""Pluggable storage for InterviewSession objects.
+
+interview_sessions used to be a plain dict that only ever grew. Both backends
+here expose the same small dict-like interface (`in`, `[]`, `get`, `save`,
+`delete`) plus eviction/size metrics:
+
+- MemorySessionStore: in-process, with idle and completed TTLs, a maximum
+  session count and a memory budget enforced by LRU eviction. Feedback job
+  records have their own TTL and count limit, oldest update evicted first.
+- SQLiteSessionStore: pickled sessions in a SQLite file, so sessions survive
+  restarts and can be shared by several workers on one host. Objects returned
+  by get() are copies; call save() after mutating them. Each row carries a
+  version, and save() is a compare-and-swap against the version get() read:
+  when another request saved the session in between, save() raises
+  SessionConflict instead of silently overwriting that request's turn.
+
+Both also keep feedback job records (save_job/get_job), so a job's status
+and result can be polled from whichever worker the request lands on.
+"""
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+def estimate_session_bytes(session):
+    """Rough memory footprint of a session, dominated by its stored text"""
+    size = 1024
+    for message in getattr(session, 'conversation_history', ()):
+        size += len(message.get('content') or '') + 128
+    for qa in getattr(session, 'all_questions_answers', ()):
+        size += len(qa.get('question') or '') + len(qa.get('answer') or '') + 128
+    return size
+
+
+class SessionConflict(Exception):
+    """Raised by save() when the session was saved by another request since it was read"""
+
+
+class SessionStore(ABC):
+    """Interface shared by the session backends"""
+
+    @abstractmethod
+    def get(self, session_id):
+        """The session, or None when unknown or expired"""
+
+    @abstractmethod
+    def save(self, session):
+        """Store the session; raises SessionConflict when a concurrent save got there first"""
+
+    @abstractmethod
+    def delete(self, session_id):
+        """Remove the session if present"""
+
+    @abstractmethod
+    def stats(self):
+        """Size and eviction metrics"""
+
+    @abstractmethod
+    def save_job(self, record):
+        """Store a feedback job record (FeedbackJob.to_dict()), replacing any earlier one for its job_id"""
+
+    @abstractmethod
+    def get_job(self, job_id):
+        """The last stored record for job_id, or None"""
+
+    def sweep(self):
+        """Drop expired sessions; returns how many were removed"""
+        return 0
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+    def __getitem__(self, session_id):
+        session = self.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def __setitem__(self, session_id, session):
+        self.save(session)
+
+
+class MemorySessionStore(SessionStore):
+    def __init__(self, idle_ttl_seconds=3600, completed_ttl_seconds=900, max_sessions=1000,
+                 max_memory_bytes=256 * 1024 * 1024, job_ttl_seconds=3600, max_jobs=1000):
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.completed_ttl_seconds = completed_ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_memory_bytes = max_memory_bytes
+        self.job_ttl_seconds = job_ttl_seconds
+        self.max_jobs = max_jobs
+
+        # session_id -> [session, last_access, size_bytes], least recently used first
+        self._entries = OrderedDict()
+        # job_id -> (record, updated_at), oldest update first
+        self._jobs = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+        self.evictions = {'idle_ttl': 0, 'completed_ttl': 0, 'max_sessions': 0, 'memory': 0}
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if self._expired_reason(entry[0], entry[1], time.time()):
+                self.sweep()
+                return None
+            entry[1] = time.time()
+            self._entries.move_to_end(session_id)
+            return entry[0]
+
+    def save(self, session):
+        size = estimate_session_bytes(session)
+        with self._lock:
+            old = self._entries.pop(session.session_id, None)
+            if old is not None:
+                self._memory_bytes -= old[2]
+            self._entries[session.session_id] = [session, time.time(), size]
+            self._memory_bytes += size
+            self._enforce_limits()
+
+    def delete(self, session_id):
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self._memory_bytes -= entry[2]
+
+    def save_job(self, record):
+        with self._lock:
+            self._jobs.pop(record['job_id'], None)
+            self._jobs[record['job_id']] = (dict(record), time.time())
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+
+    def get_job(self, job_id):
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            return dict(entry[0]) if entry else None
+
+    def _expired_reason(self, session, last_access, now):
+        idle = now - last_access
+        if getattr(session, 'is_completed', False) and idle >= self.completed_ttl_seconds:
+            return 'completed_ttl'
+        if idle >= self.idle_ttl_seconds:
+            return 'idle_ttl'
+        return None
+
+    def _evict(self, session_id, reason):
+        entry = self._entries.pop(session_id)
+        self._memory_bytes -= entry[2]
+        self.evictions[reason] += 1
+
+    def _enforce_limits(self):
+        """Evict least recently used sessions until under count and memory limits (lock held)"""
+        while len(self._entries) > self.max_sessions:
+            self._evict(next(iter(self._entries)), 'max_sessions')
+        while self._memory_bytes > self.max_memory_bytes and len(self._entries) > 1:
+            self._evict(next(iter(self._entries)), 'memory')
+
+    def sweep(self):
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for session_id, (session, last_access, _) in list(self._entries.items()):
+                reason = self._expired_reason(session, last_access, now)
+                if reason:
+                    self._evict(session_id, reason)
+                    removed += 1
+            while self._jobs and next(iter(self._jobs.values()))[1] <= now - self.job_ttl_seconds:
+                self._jobs.popitem(last=False)
+        return removed
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            completed = sum(1 for session, _, _ in self._entries.values() if getattr(session, 'is_completed', False))
+            return {
+                'backend': 'memory',
+                'sessions': len(self._entries),
+                'active': len(self._entries) - completed,
+                'completed': completed,
+                'memory_bytes': self._memory_bytes,
+                'max_memory_bytes': self.max_memory_bytes,
+                'max_sessions': self.max_sessions,
+                'feedback_jobs': len(self._jobs),
+                'max_feedback_jobs': self.max_jobs,
+                'evictions': dict(self.evictions),
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path, idle_ttl_seconds=3600, completed_ttl_seconds=900, max_sessions=10000,
+                 job_ttl_seconds=3600):
+        self.path = path
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.completed_ttl_seconds = completed_ttl_seconds
+        self.max_sessions = max_sessions
+        self.job_ttl_seconds = job_ttl_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.evictions = {'idle_ttl': 0, 'completed_ttl': 0, 'max_sessions': 0}
+        self.conflicts = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    is_completed INTEGER NOT NULL DEFAULT 0,
+                    last_access REAL NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    version INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # Databases created before versioned saves
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]
+            if 'version' not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_access ON sessions (last_access)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS feedback_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    session_id TEXT,
+                    status TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_feedback_jobs_updated_at ON feedback_jobs (updated_at)")
+
+    def _connect(self):
+        """One connection per thread; WAL lets several worker processes read while one writes"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, session_id):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT data, is_completed, last_access, version FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        data, is_completed, last_access, version = row
+        idle = time.time() - last_access
+        if idle >= self.idle_ttl_seconds or (is_completed and idle >= self.completed_ttl_seconds):
+            self.sweep()
+            return None
+        with conn:
+            conn.execute("UPDATE sessions SET last_access = ? WHERE session_id = ?", (time.time(), session_id))
+        session = pickle.loads(data)
+        session._store_version = version
+        return session
+
+    def save(self, session):
+        # The version the caller read is not part of the stored state
+        expected = version = session.__dict__.pop('_store_version', None)
+        data = pickle.dumps(session, protocol=pickle.HIGHEST_PROTOCOL)
+        row = (data, int(bool(getattr(session, 'is_completed', False))), time.time(), len(data))
+        conn = self._connect()
+        try:
+            with conn:
+                if expected is None:
+                    try:
+                        conn.execute(
+                            "INSERT INTO sessions (session_id, data, is_completed, last_access, size_bytes, version) VALUES (?, ?, ?, ?, ?, 0)",
+                            (session.session_id,) + row,
+                        )
+                    except sqlite3.IntegrityError:
+                        raise SessionConflict(f"Session {session.session_id} already exists") from None
+                    version = 0
+                else:
+                    updated = conn.execute(
+                        "UPDATE sessions SET data = ?, is_completed = ?, last_access = ?, size_bytes = ?, version = version + 1 "
+                        "WHERE session_id = ? AND version = ?",
+                        row + (session.session_id, expected),
+                    ).rowcount
+                    if not updated:
+                        raise SessionConflict(f"Session {session.session_id} was modified by another request or expired")
+                    version = expected + 1
+                count = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+                if count > self.max_sessions:
+                    excess = count - self.max_sessions
+                    conn.execute(
+                        "DELETE FROM sessions WHERE session_id IN (SELECT session_id FROM sessions ORDER BY last_access LIMIT ?)",
+                        (excess,),
+                    )
+                    with self._lock:
+                        self.evictions['max_sessions'] += excess
+        except SessionConflict:
+            with self._lock:
+                self.conflicts += 1
+            raise
+        finally:
+            if version is not None:
+                session._store_version = version
+
+    def delete(self, session_id):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def save_job(self, record):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO feedback_jobs (job_id, session_id, status, data, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (record['job_id'], record.get('session_id'), record['status'], json.dumps(record), time.time()),
+            )
+
+    def get_job(self, job_id):
+        row = self._connect().execute("SELECT data FROM feedback_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def sweep(self):
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            completed = conn.execute(
+                "DELETE FROM sessions WHERE is_completed = 1 AND last_access <= ?", (now - self.completed_ttl_seconds,)
+            ).rowcount
+            idle = conn.execute(
+                "DELETE FROM sessions WHERE last_access <= ?", (now - self.idle_ttl_seconds,)
+            ).rowcount
+            conn.execute("DELETE FROM feedback_jobs WHERE updated_at <= ?", (now - self.job_ttl_seconds,))
+        with self._lock:
+            self.evictions['completed_ttl'] += completed
+            self.evictions['idle_ttl'] += idle
+        return completed + idle
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def stats(self):
+        conn = self._connect()
+        sessions, completed, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(is_completed), 0), COALESCE(SUM(size_bytes), 0) FROM sessions"
+        ).fetchone()
+        jobs = conn.execute("SELECT COUNT(*) FROM feedback_jobs").fetchone()[0]
+        with self._lock:
+            evictions = dict(self.evictions)
+            conflicts = self.conflicts
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'sessions': sessions,
+            'active': sessions - completed,
+            'completed': completed,
+            'stored_bytes': size,
+            'max_sessions': self.max_sessions,
+            'feedback_jobs': jobs,
+            'save_conflicts': conflicts,
+            'evictions': evictions,
+        }
+
+
+def start_sweeper(store, interval_seconds=60):
+    """Background thread that expires idle/completed sessions even when nobody reads them"""
+    def loop():
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                removed = store.sweep()
+                if removed:
+                    print(f"🧹 Expired {removed} interview sessions")
+            except Exception as e:
+                print(f"⚠️ Session sweep failed: {e}")
+
+    thread = threading.Thread(target=loop, name='session-sweeper', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,105 @@
+"""Offline stand-in for the AssemblyAI StreamingClient.
+
+Selected with STT_BACKEND=local so the client-audio ingestion path can be run
+and load-tested without network access or an API key. It speaks the same
+interface (on/connect/stream/set_params/disconnect) and emits the same events,
+but instead of real words each voiced stretch of audio becomes one turn whose
+transcript is produced by `transcript_fn` (a placeholder by default).
+"""
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+from assemblyai.streaming.v3 import (
+    BeginEvent,
+    StreamingEvents,
+    TerminationEvent,
+    TurnEvent,
+)
+
+
+def placeholder_transcript(turn_order, seconds):
+    return f"[speech segment {turn_order + 1}, {seconds:.1f}s]"
+
+
+class LocalStreamingClient:
+    def __init__(self, transcript_fn=placeholder_transcript, energy_threshold=500, end_of_turn_ms=600):
+        self.transcript_fn = transcript_fn
+        self.energy_threshold = energy_threshold
+        self.end_of_turn_ms = end_of_turn_ms
+        self._handlers = {}
+        self._sample_rate = 16000
+        self._stopped = threading.Event()
+        self._audio_seconds = 0.0
+
+    def on(self, event, handler):
+        self._handlers.setdefault(event, []).append(handler)
+
+    def _emit(self, event, payload):
+        for handler in self._handlers.get(event, ()):
+            handler(self, payload)
+
+    def connect(self, params):
+        self._sample_rate = params.sample_rate
+        self._emit(StreamingEvents.Begin, BeginEvent(
+            id=str(uuid.uuid4()),
+            expires_at=datetime.now() + timedelta(hours=1),
+        ))
+
+    def set_params(self, params):
+        pass
+
+    def _turn(self, turn_order, seconds):
+        return TurnEvent(
+            type='Turn',
+            turn_order=turn_order,
+            turn_is_formatted=True,
+            end_of_turn=True,
+            transcript=self.transcript_fn(turn_order, seconds),
+            end_of_turn_confidence=1.0,
+            words=[],
+        )
+
+    def stream(self, audio):
+        """Consume PCM16 chunks, emitting a turn after each voiced stretch followed by a pause"""
+        turn_order = 0
+        voiced = 0.0
+        silence = 0.0
+        for chunk in audio:
+            if self._stopped.is_set():
+                break
+            samples = np.frombuffer(chunk, dtype=np.int16)
+            if not len(samples):
+                continue
+            seconds = len(samples) / self._sample_rate
+            self._audio_seconds += seconds
+            rms = float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+            if rms >= self.energy_threshold:
+                voiced += seconds
+                silence = 0.0
+            elif voiced:
+                silence += seconds
+                if silence * 1000 >= self.end_of_turn_ms:
+                    self._emit(StreamingEvents.Turn, self._turn(turn_order, voiced))
+                    turn_order += 1
+                    voiced = silence = 0.0
+        if voiced and not self._stopped.is_set():
+            self._emit(StreamingEvents.Turn, self._turn(turn_order, voiced))
+
+    def disconnect(self, terminate=False):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if terminate:
+            self._emit(StreamingEvents.Termination, TerminationEvent(
+                audio_duration_seconds=int(self._audio_seconds),
+                session_duration_seconds=int(self._audio_seconds),
+            ))
+
+
+def local_client_factory(transcript_fn=placeholder_transcript):
+    """Factory creating one LocalStreamingClient per recognition"""
+    def create():
+        return LocalStreamingClient(transcript_fn=transcript_fn)
+    return create
@@ -0,0 +1,316 @@
+"""Per-session AssemblyAI speech recognition.
+
+STT state used to live in module globals (is_streaming, stop_event,
+client_instance, transcribed_text, ...), so a process could only run one /stt
+at a time and a second caller corrupted the first caller's transcript. Each
+recognition now gets its own STTSession with its own state, stop event,
+client and handlers, and STTManager keys them by interview session id.
+
+Endpointing happens inline on the audio chunks (see vad.py): the session ends
+itself when the speaker stops talking, using pause statistics that STTManager
+keeps per interview session across turns.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Type
+
+import assemblyai as aai
+from assemblyai.streaming.v3 import (
+    BeginEvent,
+    StreamingClient,
+    StreamingClientOptions,
+    StreamingError,
+    StreamingEvents,
+    StreamingParameters,
+    StreamingSessionParameters,
+    TerminationEvent,
+    TurnEvent,
+)
+
+import metrics
+from vad import FRAME_MS, MAX_DURATION, NO_SPEECH, Endpointer, PauseStats
+
+SAMPLE_RATE = 16000
+
+STT_TIME_TO_FINAL = metrics.histogram(
+    'stt_time_to_final_transcript_seconds',
+    'Time from the start of a recognition until its final transcript is available',
+)
+STT_FINALIZATION = metrics.histogram(
+    'stt_finalization_seconds',
+    'Time from the end-of-speech decision until the recognizer delivered the final transcript',
+)
+STT_RECOGNITIONS = metrics.counter(
+    'stt_recognitions_total',
+    'Finished recognitions by end reason',
+    ['reason'],
+)
+
+
+def assemblyai_client_factory(api_key, api_host="streaming.assemblyai.com"):
+    """Factory creating one AssemblyAI StreamingClient per recognition"""
+    def create():
+        return StreamingClient(
+            StreamingClientOptions(
+                api_key=api_key,
+                api_host=api_host,
+            )
+        )
+    return create
+
+
+class ControlledMicrophoneStream:
+    """Wrapper for MicrophoneStream with start/stop control"""
+    def __init__(self, stt_session, sample_rate=SAMPLE_RATE):
+        self.stt_session = stt_session
+        self.sample_rate = sample_rate
+        self.mic_stream = None
+
+    def __iter__(self):
+        self.mic_stream = aai.extras.MicrophoneStream(sample_rate=self.sample_rate)
+        return self
+
+    def _close(self):
+        if self.mic_stream:
+            try:
+                self.mic_stream.close()
+            except:
+                pass
+
+    def __next__(self):
+        # Check if we should stop
+        if not self.stt_session.is_streaming:
+            self._close()
+            raise StopIteration
+
+        # Get next audio chunk and let the endpointer decide whether the answer is over
+        chunk = next(self.mic_stream)
+        if not self.stt_session.process_audio(chunk):
+            self._close()
+            raise StopIteration
+        return chunk
+
+
+class STTSession:
+    """State and handlers for one streaming recognition"""
+
+    def __init__(self, key, client_factory, silence_timeout=5, max_duration=30, pause_stats=None):
+        self.key = key
+        self.client_factory = client_factory
+        self.silence_timeout = silence_timeout
+        self.max_duration = max_duration
+        self.pause_stats = pause_stats or PauseStats()
+
+        # Set once the recognition should end, whoever decided it (endpointer, caller, error)
+        self.stop_event = threading.Event()
+        self.end_reason = None
+        self.ended_at = None
+        self.endpointer = None
+        self.client = None
+        self.transcribed_text = ""
+        self.transcription_complete = False
+        self.last_audio_time = time.time()
+        self.started_at = None
+        self._stop_callbacks = []
+        self._disconnected = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_streaming(self):
+        return self.started_at is not None and not self.stop_event.is_set()
+
+    # ---------- AssemblyAI event handlers ----------
+
+    def on_begin(self, client: Type[StreamingClient], event: BeginEvent):
+        print(f"[{self.key}] Session started: {event.id}")
+
+    def on_turn(self, client: Type[StreamingClient], event: TurnEvent):
+        # Update last audio time whenever we get any transcript
+        self.last_audio_time = time.time()
+
+        # Skip empty transcripts
+        if event.transcript.strip():
+            print(f"[{self.key}] Transcribed: {event.transcript} ({event.end_of_turn})")
+            self.transcribed_text = event.transcript
+
+        if event.end_of_turn and not event.turn_is_formatted:
+            params = StreamingSessionParameters(
+                format_turns=True,
+            )
+            client.set_params(params)
+
+        # Mark transcription as complete when we have a full turn
+        if event.end_of_turn and event.transcript.strip():
+            self.transcription_complete = True
+
+    def on_terminated(self, client: Type[StreamingClient], event: TerminationEvent):
+        print(f"[{self.key}] Session terminated: {event.audio_duration_seconds} seconds of audio processed")
+
+    def on_error(self, client: Type[StreamingClient], error: StreamingError):
+        print(f"[{self.key}] Error occurred: {error}")
+
+    # ---------- lifecycle ----------
+
+    def add_stop_callback(self, callback):
+        """Call callback when the recognition ends, e.g. to wake an audio source blocked on input"""
+        self._stop_callbacks.append(callback)
+
+    def _end(self, reason):
+        if self.stop_event.is_set():
+            return
+        self.end_reason = reason
+        self.ended_at = time.time()
+        self.stop_event.set()
+        for callback in self._stop_callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def _disconnect(self):
+        with self._lock:
+            client = self.client
+            if self._disconnected or not client:
+                return
+            self._disconnected = True
+        try:
+            client.disconnect(terminate=True)
+        except:
+            pass
+
+    def stop(self, reason='stopped'):
+        """Stop this recognition and force its client to disconnect"""
+        self._end(reason)
+        self._disconnect()
+
+    def process_audio(self, chunk):
+        """Run endpointing on one chunk from the audio path; returns False once the recognition should end"""
+        self.last_audio_time = time.time()
+        if self.stop_event.is_set():
+            return False
+        reason = self.endpointer.process(chunk)
+        if reason:
+            if reason == MAX_DURATION:
+                print(f"🕒 [{self.key}] Maximum STT session time reached ({self.max_duration} seconds). Auto-stopping.")
+            elif reason == NO_SPEECH:
+                print(f"🕒 [{self.key}] No speech detected for {self.silence_timeout} seconds. Auto-stopping STT.")
+            else:
+                print(f"🕒 [{self.key}] End of speech after {self.endpointer.hangover_frames * FRAME_MS} ms of silence.")
+            self._end(reason)
+            return False
+        return True
+
+    def idle_timeout(self):
+        """Seconds an audio source may wait for more input before the recognition is abandoned"""
+        return max(0.0, self.silence_timeout - (time.time() - self.last_audio_time))
+
+    def run(self, audio_source=None, sample_rate=SAMPLE_RATE):
+        """Stream audio (the server microphone unless audio_source is given) until stopped and return the transcribed text"""
+        self.started_at = time.time()
+        self.last_audio_time = self.started_at
+        self.endpointer = Endpointer(sample_rate, self.pause_stats, self.silence_timeout, self.max_duration)
+
+        print(f"\n[{self.key}] [Starting AssemblyAI speech recognition...]")
+        print(f"⏰ STT will auto-stop {self.pause_stats.hangover():.1f}s after you finish speaking "
+              f"({self.silence_timeout}s if nothing is said)")
+
+        client = self.client_factory()
+        self.client = client
+
+        client.on(StreamingEvents.Begin, self.on_begin)
+        client.on(StreamingEvents.Turn, self.on_turn)
+        client.on(StreamingEvents.Termination, self.on_terminated)
+        client.on(StreamingEvents.Error, self.on_error)
+
+        try:
+            client.connect(
+                StreamingParameters(
+                    sample_rate=sample_rate,
+                    format_turns=True
+                )
+            )
+            client.stream(audio_source or ControlledMicrophoneStream(self, sample_rate=sample_rate))
+
+        except Exception as e:
+            if not self.stop_event.is_set():  # Only print error if not intentionally stopped
+                print(f"\n[{self.key}] [Error during streaming: {e}]")
+        finally:
+            # Graceful terminate waits for the final turns before returning
+            self._end('stream_ended')
+            self._disconnect()
+            self.client = None
+            finished_at = time.time()
+            STT_RECOGNITIONS.inc(reason=self.end_reason)
+            if self.transcribed_text:
+                STT_TIME_TO_FINAL.observe(finished_at - self.started_at)
+                STT_FINALIZATION.observe(finished_at - self.ended_at)
+            print(f"\n[{self.key}] [Speech recognition session ended: {self.end_reason}]")
+
+        return self.transcribed_text
+
+
+class STTSessionBusy(Exception):
+    """Raised when a recognition is already running for the same key"""
+
+
+class STTManager:
+    """Runs independent recognitions concurrently, keyed by interview session id"""
+
+    def __init__(self, client_factory, silence_timeout=5, max_duration=30, max_speakers=1000):
+        self.client_factory = client_factory
+        self.silence_timeout = silence_timeout
+        self.max_duration = max_duration
+        self.max_speakers = max_speakers
+        self._sessions = {}
+        # key -> PauseStats, so the hangover keeps adapting across one candidate's answers
+        self._pause_stats = OrderedDict()
+        self._lock = threading.Lock()
+
+    def pause_stats(self, key):
+        """Pause statistics for key (lock held)"""
+        stats = self._pause_stats.pop(key, None) or PauseStats()
+        self._pause_stats[key] = stats
+        while len(self._pause_stats) > self.max_speakers:
+            self._pause_stats.popitem(last=False)
+        return stats
+
+    def start(self, key=None):
+        """Register a new recognition for key (a fresh id when omitted)"""
+        key = key or str(uuid.uuid4())
+        with self._lock:
+            existing = self._sessions.get(key)
+            if existing and not existing.stop_event.is_set():
+                raise STTSessionBusy(f"Speech recognition already running for session {key}")
+            stt_session = STTSession(key, self.client_factory, self.silence_timeout, self.max_duration,
+                                     pause_stats=self.pause_stats(key))
+            self._sessions[key] = stt_session
+        return stt_session
+
+    def finish(self, stt_session):
+        with self._lock:
+            if self._sessions.get(stt_session.key) is stt_session:
+                del self._sessions[stt_session.key]
+
+    def recognize(self, key=None, audio_source=None, sample_rate=SAMPLE_RATE):
+        """Run one recognition to completion and return (key, transcribed text)"""
+        stt_session = self.start(key)
+        try:
+            return stt_session.key, stt_session.run(audio_source, sample_rate)
+        finally:
+            self.finish(stt_session)
+
+    def stop(self, key):
+        """Stop the recognition running for key; returns False if there is none"""
+        with self._lock:
+            stt_session = self._sessions.get(key)
+        if not stt_session:
+            return False
+        print(f"🛑 [{key}] Stopping speech recognition...")
+        stt_session.stop()
+        return True
+
+    def active_keys(self):
+        with self._lock:
+            return [key for key, stt_session in self._sessions.items() if stt_session.is_streaming]
@@ -4,13 +4,15 @@ import time
 
 BASE_URL = "http://localhost:5000"
 
-def speak_text(text):
-    """Call TTS endpoint to speak the text"""
+def speak_text(text, session_id=None):
+    """Call TTS endpoint to speak the text (session_id lets the server reuse pre-synthesized audio)"""
     try:
         tts_data = {
             'text': text,
             'speaker': 'en_10'
         }
+        if session_id:
+            tts_data['session_id'] = session_id
         
         print("🔊 Playing audio...")
         tts_response = requests.post(
@@ -30,11 +32,11 @@ def speak_text(text):
         print(f"❌ TTS call failed: {e}")
         return False
 
-def listen_for_speech():
+def listen_for_speech(session_id=None):
     """Call STT endpoint to listen for user speech"""
     try:
         print("🎤 Listening for your response... (Speak now)")
-        stt_response = requests.get(f"{BASE_URL}/stt")
+        stt_response = requests.get(f"{BASE_URL}/stt", params={'session_id': session_id} if session_id else None)
         
         if stt_response.status_code == 200:
             stt_data = stt_response.json()
@@ -53,6 +55,21 @@ def listen_for_speech():
         print(f"❌ STT call failed: {e}")
         return None
 
+def wait_for_feedback(feedback_url, timeout=120):
+    """Poll the feedback job until it finishes"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        feedback_response = requests.get(f"{BASE_URL}{feedback_url}")
+        if feedback_response.status_code != 200:
+            return f"❌ Feedback Error: {feedback_response.text}"
+        feedback_data = feedback_response.json()
+        if feedback_data['status'] == 'completed':
+            return feedback_data['feedback']
+        if feedback_data['status'] == 'failed':
+            return f"❌ Feedback generation failed: {feedback_data.get('error')}"
+        time.sleep(1)
+    return "❌ Timed out waiting for feedback"
+
 def test_interview_flow():
     """Test the complete flexible interview flow with TTS and STT"""
     
@@ -74,7 +91,7 @@ def test_interview_flow():
         
         # Speak and show the first question
         print(f"📋 Session ID: {session_id}")
-        speak_text(start_data['message'])
+        speak_text(start_data['message'], session_id)
         print(f"🤖 AI: {start_data['message']}")
         print(f"🔢 Questions asked: {start_data['question_number']}")
         print("💡 Say 'stop', 'end', or 'finish' to end the interview and get feedback")
@@ -83,7 +100,7 @@ def test_interview_flow():
         # Continue with responses
         while True:
             # Listen for user's speech response
-            user_input = listen_for_speech()
+            user_input = listen_for_speech(session_id)
             
             if user_input is None:
                 print("🔄 Failed to get speech input. Please try typing your response:")
@@ -111,7 +128,7 @@ def test_interview_flow():
             
             if response_data.get('status') == 'completed':
                 # Speak and show the final message
-                speak_text(response_data['message'])
+                speak_text(response_data['message'], session_id)
                 print(f"🤖 AI: {response_data['message']}")
                 
                 print("\n🎯" + "="*60)
@@ -120,7 +137,8 @@ def test_interview_flow():
                 
                 # Speak a brief summary of feedback
                 speak_text("Interview completed. Here is your feedback summary.")
-                print(f"\n{response_data['feedback']}")
+                print("⏳ Waiting for feedback...")
+                print(f"\n{wait_for_feedback(response_data['feedback_url'])}")
                 print(f"\n📈 Interview Summary:")
                 print(f"   Total questions asked: {response_data['total_questions_asked']}")
                 print(f"   Duration: {response_data['duration_minutes']} minutes")
@@ -128,7 +146,7 @@ def test_interview_flow():
                 break
             else:
                 # Speak and show the next question
-                speak_text(response_data['message'])
+                speak_text(response_data['message'], session_id)
                 print(f"🤖 AI: {response_data['message']}")
                 print(f"🔢 Questions asked so far: {response_data['question_number']}")
                 print("-" * 70)
@@ -0,0 +1,22 @@
+"""CI entry point: a short in-process load test against the fake backends.
+
+Needs only requirements.txt plus pytest; no API keys, models, torch or audio
+devices. Run from this directory with `python -m pytest -q`.
+"""
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_fake_interviews_meet_latency_budget(tmp_path):
+    env = dict(os.environ, LLM_BACKEND='fake', STT_BACKEND='fake', TTS_BACKEND='fake', SESSION_STORE='memory')
+    result = subprocess.run(
+        [sys.executable, 'load_test.py', '--candidates', '6', '--arrival-rate', '20', '--turns', '2',
+         '--llm-latency', 'fixed:5', '--stt-latency', 'fixed:5', '--json', str(tmp_path / 'summary.json'),
+         '--max-p95', 'start-interview=2000', 'respond=2000', 'feedback-ready=5000'],
+        cwd=HERE, env=env, capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stdout[-4000:] + result.stderr[-4000:]
+    assert (tmp_path / 'summary.json').exists()
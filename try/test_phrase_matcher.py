@@ -0,0 +1,41 @@
+"""Vocabulary checks: everyday English must not read as a skill, nor technical answers as introductions."""
+import pytest
+
+from phrase_matcher import PhraseMatcher, load_vocabulary
+
+matcher = PhraseMatcher(load_vocabulary())
+
+
+@pytest.mark.parametrize("text", [
+    "I can express myself clearly in meetings.",
+    "A swift reply to the customer matters.",
+    "We shipped it in the spring.",
+    "The containers of food were labelled.",
+    "I took the helm of the project.",
+    "Lambda calculus was my favourite course.",
+    "I handled the rest of the release myself.",
+    "Coffee makes me go faster.",
+])
+def test_everyday_words_are_not_skills(text):
+    assert matcher.match(text)['skills'] == []
+
+
+@pytest.mark.parametrize("text, skill", [
+    ("Most of my backend work is Spring Boot.", "java"),
+    ("I built the API with Express.js.", "node"),
+    ("The app UI is written in SwiftUI.", "swift"),
+    ("The resize job runs on AWS Lambda.", "aws"),
+    ("We deploy with Helm charts.", "kubernetes"),
+    ("I designed the REST APIs for billing.", "rest"),
+    ("Everything runs containerized behind a load balancer.", "docker"),
+])
+def test_qualified_forms_still_match(text, skill):
+    assert skill in matcher.match(text)['skills']
+
+
+@pytest.mark.parametrize("text", [
+    "I set position: absolute on the tooltip.",
+    "Uploads are handled by background workers.",
+])
+def test_technical_answers_are_not_intro_cues(text):
+    assert matcher.match(text)['intro_cues'] == []
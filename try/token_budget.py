@@ -0,0 +1,211 @@
+"""Token-budgeted conversation context for open-ended interviews.
+
+Interviews have no question limit, so the Q&A list grows without bound.
+Prompts built from it must not. ConversationBudget keeps the last K exchanges
+verbatim and folds everything older into a rolling summary per session. The
+summary is updated on a small background pool as the interview goes on, so
+no request ever waits for it. render() assembles summary plus recent
+exchanges under a token budget. The per-turn prompt at turn 100 is then the
+same size as at turn 5, and the final feedback prompt stays under its budget
+however long the interview ran.
+
+Summaries are kept in-process per session id (bounded LRU). If a summary is
+missing or behind (a restart, another worker, a fold still running),
+render() falls back to compact one-line versions of the unsummarized
+exchanges, still within the budget.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Gemini averages roughly 4 characters per token on English text
+CHARS_PER_TOKEN = 4
+COMPACT_LINE_TOKENS = 40
+# Section headers and separators in render()
+SECTION_OVERHEAD_TOKENS = 32
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+def clip_text(text, max_tokens, keep='head'):
+    """Shorten text to about max_tokens, on a word boundary, keeping the head or the tail"""
+    text = text or ''
+    max_chars = max(0, max_tokens) * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 1:
+        return ''
+    if keep == 'tail':
+        clipped = text[len(text) - max_chars + 1:]
+        space = clipped.find(' ')
+        return '…' + (clipped[space + 1:] if 0 <= space < len(clipped) // 2 else clipped)
+    clipped = text[:max_chars - 1]
+    space = clipped.rfind(' ')
+    return (clipped[:space] if space > len(clipped) // 2 else clipped) + '…'
+
+
+def format_exchange(qa, max_tokens=None):
+    """One Q&A pair verbatim; the answer is clipped first when over max_tokens"""
+    question, answer = qa.get('question') or '', qa.get('answer') or ''
+    text = f"Q: {question}\nA: {answer}"
+    if max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return text
+    question = clip_text(question, max(8, max_tokens // 4))
+    answer = clip_text(answer, max_tokens - estimate_tokens(f"Q: {question}\nA: "))
+    return f"Q: {question}\nA: {answer}"
+
+
+def compact_exchange(qa, max_tokens=COMPACT_LINE_TOKENS):
+    """One-line stand-in for an exchange that has not been summarized yet"""
+    question = clip_text(qa.get('question') or '', max_tokens // 3)
+    answer = clip_text(qa.get('answer') or '', max_tokens - estimate_tokens(question) - 4)
+    return f"- {question} → {answer}"
+
+
+def fallback_summary(previous, exchanges, max_tokens):
+    """Summary without the LLM: compact lines appended to the previous summary, oldest dropped first"""
+    lines = [previous] if previous else []
+    lines += [compact_exchange(qa) for qa in exchanges]
+    return clip_text("\n".join(lines), max_tokens, keep='tail')
+
+
+class SummaryState:
+    def __init__(self):
+        self.summary = ''
+        self.covered = 0          # leading Q&A pairs folded into summary
+        self.latest = []          # newest Q&A snapshot seen for the session
+        self.folding = False
+        self.updated_at = None
+
+
+class ConversationBudget:
+    def __init__(self, summarize_fn, keep_recent=4, summary_tokens=400, fold_batch=4,
+                 max_sessions=1000, max_workers=2):
+        """summarize_fn(previous_summary, exchanges, max_tokens) -> new summary text.
+
+        Exchanges are folded fold_batch at a time, once that many have aged out of the recent window.
+        """
+        self.summarize_fn = summarize_fn
+        self.keep_recent = keep_recent
+        self.summary_tokens = summary_tokens
+        self.fold_batch = fold_batch
+        self.max_sessions = max_sessions
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='summary')
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        self.folds = 0
+        self.fold_failures = 0
+        self.fold_seconds = 0.0
+
+    def _state(self, session_id, create=False):
+        state = self._states.get(session_id)
+        if state is None and create:
+            state = self._states[session_id] = SummaryState()
+            while len(self._states) > self.max_sessions:
+                self._states.popitem(last=False)
+        if state is not None:
+            self._states.move_to_end(session_id)
+        return state
+
+    def observe(self, session_id, qa_pairs):
+        """Note the session's latest Q&A list; schedules a background fold once enough older pairs pile up"""
+        with self._lock:
+            state = self._state(session_id, create=True)
+            state.latest = list(qa_pairs)
+            if not state.folding and self._foldable(state) >= self.fold_batch:
+                state.folding = True
+                self._executor.submit(self._fold, session_id, state)
+
+    def _foldable(self, state):
+        return len(state.latest) - self.keep_recent - state.covered
+
+    def _fold(self, session_id, state):
+        while True:
+            with self._lock:
+                # One batch per summarization call, so its prompt stays bounded too
+                end = min(len(state.latest) - self.keep_recent, state.covered + self.fold_batch)
+                exchanges = state.latest[state.covered:end]
+                previous = state.summary
+                if len(exchanges) < self.fold_batch:
+                    state.folding = False
+                    return
+            start = time.time()
+            failed = False
+            try:
+                summary = clip_text(self.summarize_fn(previous, exchanges, self.summary_tokens),
+                                    self.summary_tokens, keep='tail')
+            except Exception as e:
+                print(f"⚠️ Summary update failed for session {session_id}, using compact lines: {e}")
+                summary = fallback_summary(previous, exchanges, self.summary_tokens)
+                failed = True
+            with self._lock:
+                state.summary = summary
+                state.covered = end
+                state.updated_at = time.time()
+                self.folds += 1
+                self.fold_failures += failed
+                self.fold_seconds += time.time() - start
+
+    def render(self, session_id, qa_pairs, max_tokens, keep_recent=None):
+        """Summary, unsummarized older exchanges and the most recent ones, under max_tokens"""
+        keep_recent = self.keep_recent if keep_recent is None else keep_recent
+        with self._lock:
+            state = self._state(session_id)
+            summary, covered = (state.summary, state.covered) if state else ('', 0)
+        covered = min(covered, len(qa_pairs))
+        recent_start = max(covered, len(qa_pairs) - keep_recent)
+
+        sections = []
+        remaining = max_tokens - SECTION_OVERHEAD_TOKENS
+        if summary:
+            summary = clip_text(summary, min(self.summary_tokens, remaining // 3), keep='tail')
+            sections.append(f"Earlier in the interview (summary):\n{summary}")
+            remaining -= estimate_tokens(sections[-1])
+
+        # Recent exchanges verbatim, each clipped to an equal share of what the summary left
+        recent = qa_pairs[recent_start:]
+        older_share = remaining // 4 if recent_start > covered else 0
+        recent_lines = []
+        per_exchange = (remaining - older_share) // max(1, len(recent))
+        for qa in recent:
+            recent_lines.append(format_exchange(qa, per_exchange))
+
+        # Older exchanges the summary does not cover yet, compacted, newest kept first
+        gap = qa_pairs[covered:recent_start]
+        gap_lines = []
+        budget = older_share
+        for qa in reversed(gap):
+            line = compact_exchange(qa)
+            if estimate_tokens(line) > budget:
+                break
+            gap_lines.insert(0, line)
+            budget -= estimate_tokens(line)
+        if gap:
+            omitted = len(gap) - len(gap_lines)
+            header = "Earlier exchanges (not yet summarized):"
+            if omitted:
+                header += f" ({omitted} older exchanges omitted)"
+            sections.append("\n".join([header] + gap_lines))
+
+        if recent_lines:
+            sections.append("Most recent exchanges:\n" + "\n\n".join(recent_lines))
+        return "\n\n".join(sections)
+
+    def forget(self, session_id):
+        with self._lock:
+            self._states.pop(session_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._states),
+                'folding': sum(1 for state in self._states.values() if state.folding),
+                'folds': self.folds,
+                'fold_failures': self.fold_failures,
+                'avg_fold_seconds': round(self.fold_seconds / self.folds, 3) if self.folds else None,
+                'keep_recent': self.keep_recent,
+                'summary_tokens': self.summary_tokens,
+            }
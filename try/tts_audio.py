@@ -0,0 +1,65 @@
+"""Helpers for turning Silero TTS output into WAV/PCM16 bytes for HTTP responses."""
+import struct
+
+import numpy as np
+
+# 16-bit mono PCM, the format every browser <audio> element can play
+SAMPLE_WIDTH = 2
+CHANNELS = 1
+
+# Placeholder size used when the total length is not known up front (streamed WAV)
+UNKNOWN_SIZE = 0xFFFFFFFF
+
+# Bytes per chunk written to the HTTP response
+DEFAULT_CHUNK_SIZE = 16384
+
+
+def audio_to_pcm16(audio):
+    """Convert a float waveform in [-1, 1] (torch tensor or numpy array) to PCM16 bytes"""
+    if hasattr(audio, "detach"):
+        audio = audio.detach().cpu().numpy()
+    samples = np.clip(np.asarray(audio, dtype=np.float32), -1.0, 1.0)
+    return (samples * 32767.0).astype("<i2").tobytes()
+
+
+def pcm16_to_array(pcm):
+    """Convert PCM16 bytes back into an int16 numpy array (e.g. for sounddevice playback)"""
+    return np.frombuffer(pcm, dtype="<i2")
+
+
+def wav_header(sample_rate, data_size=None):
+    """Build a 44-byte RIFF/WAVE header for PCM16 mono audio.
+
+    When data_size is None the RIFF and data chunk sizes are set to the
+    streaming placeholder, which players treat as "read until EOF".
+    """
+    byte_rate = sample_rate * CHANNELS * SAMPLE_WIDTH
+    block_align = CHANNELS * SAMPLE_WIDTH
+
+    if data_size is None:
+        riff_size = UNKNOWN_SIZE
+        data_size = UNKNOWN_SIZE
+    else:
+        riff_size = 36 + data_size
+
+    return (
+        b"RIFF"
+        + struct.pack("<I", riff_size)
+        + b"WAVE"
+        + b"fmt "
+        + struct.pack("<IHHIIHH", 16, 1, CHANNELS, sample_rate, byte_rate, block_align, SAMPLE_WIDTH * 8)
+        + b"data"
+        + struct.pack("<I", data_size)
+    )
+
+
+def iter_wav_chunks(pcm, sample_rate, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield a complete WAV file (header first, then PCM) in chunks for a streamed response"""
+    yield wav_header(sample_rate, len(pcm))
+    for offset in range(0, len(pcm), chunk_size):
+        yield pcm[offset:offset + chunk_size]
+
+
+def silence_pcm16(sample_rate, duration_ms):
+    """PCM16 bytes of silence, used as a short gap between pipelined sentences"""
+    return b"\x00\x00" * int(sample_rate * duration_ms / 1000)
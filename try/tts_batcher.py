@@ -0,0 +1,193 @@
+"""Micro-batching TTS inference worker.
+
+Flask request threads submit synthesis requests to a queue instead of calling
+the shared Silero model directly. A single worker thread collects requests
+that arrive within a small window (max_wait_ms) or until max_batch_size is
+reached, groups them by voice settings and runs one batch per group, then
+hands each caller its own slice of the output.
+
+Only models whose apply_tts takes a list of texts (accepts_batched_texts)
+actually batch. For the others the worker just serializes requests onto one
+thread, so app.py enables it by default only for batching models.
+"""
+import inspect
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+def accepts_batched_texts(model):
+    """True when the model's apply_tts takes a list of texts in one call"""
+    try:
+        return "texts" in inspect.signature(model.apply_tts).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def silero_batch_apply(model, inference_mode=None):
+    """Build a synthesize_batch(texts, speaker, sample_rate, put_accent, put_yo) function for a Silero model.
+
+    Models whose apply_tts accepts a list of texts get a single batched call.
+    The v3 packages only take one text per call, so those run back-to-back on
+    the worker thread - still one inference stream instead of N competing ones.
+    inference_mode defaults to torch.inference_mode.
+    """
+    if inference_mode is None:
+        import torch
+        inference_mode = torch.inference_mode
+
+    accepts_texts = accepts_batched_texts(model)
+
+    def synthesize_batch(texts, speaker, sample_rate, put_accent, put_yo):
+        with inference_mode():
+            if accepts_texts:
+                return list(model.apply_tts(
+                    texts=texts,
+                    speaker=speaker,
+                    sample_rate=sample_rate,
+                    put_accent=put_accent,
+                    put_yo=put_yo,
+                ))
+            return [
+                model.apply_tts(
+                    text=text,
+                    speaker=speaker,
+                    sample_rate=sample_rate,
+                    put_accent=put_accent,
+                    put_yo=put_yo,
+                )
+                for text in texts
+            ]
+
+    return synthesize_batch
+
+
+class _Request:
+    __slots__ = ("text", "group", "future", "enqueued_at")
+
+    def __init__(self, text, group):
+        self.text = text
+        self.group = group
+        self.future = Future()
+        self.enqueued_at = time.time()
+
+
+class TTSBatchWorker:
+    """Dedicated inference thread that batches concurrent TTS requests"""
+
+    def __init__(self, synthesize_batch, max_batch_size=8, max_wait_ms=10):
+        self.synthesize_batch = synthesize_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.requests = 0
+        self.deduplicated = 0
+        self.max_batch_seen = 0
+        self.total_queue_wait = 0.0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="tts-batch-worker", daemon=True)
+            self._thread.start()
+        return self
+
+    def after_fork(self):
+        """Start over in a forked child: the parent's thread is gone and its queue may still reference it"""
+        self._queue = queue.Queue()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        return self.start()
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout)
+
+    def submit(self, text, speaker, sample_rate, put_accent=True, put_yo=True, timeout=None):
+        """Queue one synthesis and block until its audio is ready"""
+        request = _Request(text, (speaker, int(sample_rate), bool(put_accent), bool(put_yo)))
+        self._queue.put(request)
+        return request.future.result(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'requests': self.requests,
+                'deduplicated': self.deduplicated,
+                'avg_batch_size': round(self.requests / self.batches, 2) if self.batches else None,
+                'max_batch_size_seen': self.max_batch_seen,
+                'avg_queue_wait_ms': round(self.total_queue_wait / self.requests * 1000, 2) if self.requests else None,
+                'queue_depth': self._queue.qsize(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+            }
+
+    # ---------- worker thread ----------
+
+    def _collect(self, first):
+        """Gather requests until the batch is full or the wait window closes"""
+        batch = [first]
+        deadline = time.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.time()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self._stopping.set()
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while not self._stopping.is_set():
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = self._collect(first)
+
+            groups = {}
+            for request in batch:
+                groups.setdefault(request.group, []).append(request)
+
+            started_at = time.time()
+            for (speaker, sample_rate, put_accent, put_yo), requests in groups.items():
+                # Identical texts in one window share a single synthesis
+                texts = list(dict.fromkeys(r.text for r in requests))
+                try:
+                    outputs = self.synthesize_batch(texts, speaker, sample_rate, put_accent, put_yo)
+                    by_text = dict(zip(texts, outputs))
+                    for request in requests:
+                        request.future.set_result(by_text[request.text])
+                except Exception as e:
+                    for request in requests:
+                        if not request.future.done():
+                            request.future.set_exception(e)
+
+                with self._lock:
+                    self.batches += 1
+                    self.requests += len(requests)
+                    self.deduplicated += len(requests) - len(texts)
+                    self.max_batch_seen = max(self.max_batch_seen, len(requests))
+                    self.total_queue_wait += sum(started_at - r.enqueued_at for r in requests)
+
+        # Fail anything still queued so callers do not hang on shutdown
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None and not request.future.done():
+                request.future.set_exception(RuntimeError("TTS batch worker stopped"))
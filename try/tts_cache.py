@@ -0,0 +1,150 @@
+"""Content-addressed cache for synthesized TTS audio.
+
+Audio is stored as PCM16 bytes under a SHA-256 key of everything that affects
+the waveform. Lookups go memory (LRU, bounded by bytes) -> disk (zlib
+compressed files) -> miss. Disk hits are promoted back into memory.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+
+
+def make_cache_key(text, speaker, sample_rate, put_accent, put_yo, model_id):
+    """Stable content address for one synthesis request"""
+    payload = json.dumps(
+        [text, speaker, int(sample_rate), bool(put_accent), bool(put_yo), model_id],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Two-tier (memory LRU + disk) cache of PCM16 audio keyed by make_cache_key()"""
+
+    def __init__(self, max_memory_bytes=64 * 1024 * 1024, disk_dir=None, compress_level=6):
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = disk_dir
+        self.compress_level = compress_level
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_writes = 0
+        self.disk_errors = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    # ---------- public API ----------
+
+    def get(self, key):
+        """Return cached PCM16 bytes for key, or None on a miss"""
+        with self._lock:
+            pcm = self._memory.get(key)
+            if pcm is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return pcm
+
+        pcm = self._read_disk(key)
+        with self._lock:
+            if pcm is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store_memory(key, pcm)
+        return pcm
+
+    def put(self, key, pcm):
+        """Store PCM16 bytes in both tiers"""
+        with self._lock:
+            self._store_memory(key, pcm)
+        self._write_disk(key, pcm)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'max_memory_bytes': self.max_memory_bytes,
+                'disk_dir': self.disk_dir,
+                'disk_writes': self.disk_writes,
+                'disk_errors': self.disk_errors,
+            }
+
+    # ---------- memory tier ----------
+
+    def _store_memory(self, key, pcm):
+        """Insert into the LRU and evict from the cold end until under budget (lock held)"""
+        size = len(pcm)
+        if size > self.max_memory_bytes:
+            return
+
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+
+        self._memory[key] = pcm
+        self._memory_bytes += size
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions += 1
+
+    # ---------- disk tier ----------
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.pcm.z")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                return zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error) as e:
+            print(f"⚠️ TTS cache read failed for {key[:12]}: {e}")
+            with self._lock:
+                self.disk_errors += 1
+            return None
+
+    def _write_disk(self, key, pcm):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(pcm, self.compress_level))
+            os.replace(tmp_path, path)
+            with self._lock:
+                self.disk_writes += 1
+        except OSError as e:
+            print(f"⚠️ TTS cache write failed for {key[:12]}: {e}")
+            with self._lock:
+                self.disk_errors += 1
@@ -0,0 +1,365 @@
+"""Multi-replica TTS executor sized to the machine's cores.
+
+Torch sizes its intra-op pool to every core in the process, so concurrent
+apply_tts calls on one shared model oversubscribe the CPU and slow each
+other down. TTSExecutor runs K replica processes instead. Each replica
+is pinned to its own slice of the cores (os.sched_setaffinity), caps torch at
+threads_per_replica and runs inference under torch.inference_mode().
+
+Forking a process that runs other threads can copy a lock some thread
+holds at that instant into the child, where nobody will ever release it. So
+start() must be called eagerly, before the process starts any threads: at
+import when serving directly, or in the worker's post-fork hook (app.after_fork)
+under a preloading gunicorn master, which then never forks any replicas itself.
+start() forks a single-threaded spawner process that holds the model, and the
+spawner forks every replica, both at start and when one dies. The weights are
+therefore shared copy-on-write by all replicas, restarted ones included, and
+nothing is ever forked from the threaded serving process after start().
+submit() does not start replicas lazily.
+
+Each replica has its own request and result pipes. A replica that dies closes
+its result pipe, so its pending requests fail right away rather than waiting
+out their timeout, and a new replica is forked in its place. Requests go to the
+replica with the fewest outstanding requests and time out after
+request_timeout seconds by default. stats() reports queue depth and
+per-replica utilization (busy time / uptime).
+
+    TTS_REPLICAS=auto                 # cores // TTS_REPLICA_THREADS replicas
+    TTS_REPLICAS=4 TTS_REPLICA_THREADS=2
+    TTS_REPLICA_TIMEOUT_SECONDS=60
+
+Find the throughput knee for a machine with bench_tts_replicas.py.
+"""
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from contextlib import nullcontext
+from multiprocessing import connection, reduction
+
+import numpy as np
+
+
+def available_cores():
+    """Cores this process may run on (respects taskset/cgroup affinity where the OS exposes it)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(multiprocessing.cpu_count()))
+
+
+def plan_replicas(replicas, threads_per_replica, cores=None):
+    """Core slices for each replica; 'auto' (or 0) replicas fills the cores at threads_per_replica each"""
+    cores = available_cores() if cores is None else list(cores)
+    threads_per_replica = max(1, int(threads_per_replica))
+    if replicas in (None, '', 'auto', 0, '0'):
+        replicas = max(1, len(cores) // threads_per_replica)
+    replicas = max(1, int(replicas))
+    # Wrap around when asked for more threads than there are cores, so replicas share instead of failing
+    return [[cores[(i * threads_per_replica + j) % len(cores)] for j in range(threads_per_replica)]
+            for i in range(replicas)]
+
+
+def _replica_main(index, model, cores, threads, requests, results):
+    """Replica process: pin, cap torch threads, then synthesize until a None request arrives"""
+    try:
+        import torch
+    except ImportError:
+        torch = None  # the fake model used by load tests
+
+    if cores and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError as e:
+            print(f"⚠️ TTS replica {index} could not pin to cores {cores}: {e}")
+    if torch is not None:
+        torch.set_num_threads(threads)
+    results.send((None, 'ready', os.getpid(), 0.0))
+
+    with torch.inference_mode() if torch is not None else nullcontext():
+        while True:
+            try:
+                request = requests.recv()
+            except EOFError:
+                break  # the executor went away
+            if request is None:
+                break
+            request_id, text, speaker, sample_rate, put_accent, put_yo = request
+            start = time.time()
+            try:
+                audio = model.apply_tts(text=text, speaker=speaker, sample_rate=sample_rate,
+                                        put_accent=put_accent, put_yo=put_yo)
+                if hasattr(audio, 'detach'):
+                    audio = audio.detach().cpu().numpy()
+                results.send((request_id, 'ok', np.asarray(audio, dtype=np.float32), time.time() - start))
+            except Exception as e:
+                results.send((request_id, 'error', f"{type(e).__name__}: {e}", time.time() - start))
+
+
+def _spawner_main(model, control, executor_control):
+    """Spawner process: fork a replica per (index, cores, threads) message and hand back its pipe ends"""
+    executor_control.close()  # so the spawner sees EOF once the executor's process is gone
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # exited replicas are reaped automatically
+    while True:
+        try:
+            message = control.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        index, cores, threads = message
+        request_reader, request_writer = multiprocessing.Pipe(duplex=False)
+        result_reader, result_writer = multiprocessing.Pipe(duplex=False)
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            control.close()
+            request_writer.close()
+            result_reader.close()
+            code = 0
+            try:
+                _replica_main(index, model, cores, threads, request_reader, result_writer)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        # Only the replica keeps its ends, so its result pipe closes as soon as it exits
+        request_reader.close()
+        result_writer.close()
+        control.send(pid)
+        reduction.send_handle(control, request_writer.fileno(), os.getppid())
+        reduction.send_handle(control, result_reader.fileno(), os.getppid())
+        request_writer.close()
+        result_reader.close()
+
+
+class _Replica:
+    def __init__(self, index, cores, threads):
+        self.index = index
+        self.cores = cores
+        self.threads = threads
+        self.pid = None
+        self.requests = None     # Connection this process sends requests on
+        self.results = None      # Connection this process receives results on
+        self.pending = {}        # request id -> Future
+        self.started_at = None
+        self.busy_seconds = 0.0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+
+
+class TTSExecutor:
+    """K pinned Silero replica processes behind a least-outstanding dispatcher"""
+
+    def __init__(self, model, replicas='auto', threads_per_replica=1, cores=None, start_timeout=60,
+                 request_timeout=60, check_interval=1.0):
+        self.model = model
+        self.threads_per_replica = max(1, int(threads_per_replica))
+        self.start_timeout = start_timeout
+        self.request_timeout = request_timeout
+        self.check_interval = check_interval
+        self._context = multiprocessing.get_context('fork')
+        self._replicas = [_Replica(i, slice_, self.threads_per_replica)
+                          for i, slice_ in enumerate(plan_replicas(replicas, self.threads_per_replica, cores))]
+        self._spawner = None
+        self._control = None
+        self._control_lock = threading.Lock()
+        self._collector = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._stopping = threading.Event()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """Fork the spawner and replicas and wait until each has pinned itself; call before starting threads"""
+        with self._start_lock:
+            if self._started:
+                return self
+            if threading.active_count() > 1:
+                print(f"⚠️ Forking TTS replicas from a process running {threading.active_count()} threads: "
+                      f"{', '.join(t.name for t in threading.enumerate())}")
+            self._start()
+            self._started = True
+        return self
+
+    def _start(self):
+        self._stopping = threading.Event()
+        self._control, spawner_control = self._context.Pipe()
+        self._spawner = self._context.Process(target=_spawner_main, args=(self.model, spawner_control, self._control),
+                                              name='tts-spawner', daemon=True)
+        self._spawner.start()
+        spawner_control.close()
+
+        for replica in self._replicas:
+            replica.pending = {}
+            replica.started_at = time.time()
+            replica.busy_seconds = 0.0
+            self._spawn(replica)
+        deadline = time.time() + self.start_timeout
+        for replica in self._replicas:
+            if not replica.results.poll(max(0.0, deadline - time.time())):
+                self._shutdown()
+                raise RuntimeError(f"TTS replicas not ready after {self.start_timeout}s")
+            replica.results.recv()  # 'ready'
+        self._collector = threading.Thread(target=self._collect, name='tts-executor', daemon=True)
+        self._collector.start()
+        print(f"✅ TTS executor: {len(self._replicas)} replicas x {self.threads_per_replica} torch threads, "
+              f"cores {[replica.cores for replica in self._replicas]}")
+
+    def after_fork(self):
+        """Forget the spawner and replicas inherited from a parent process; call start() next"""
+        # The inherited locks may have been held by a parent thread at fork time
+        self._start_lock = threading.Lock()
+        self._control_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._started = False
+        self._spawner, self._control = None, None
+        for replica in self._replicas:
+            replica.pid, replica.requests, replica.results, replica.pending = None, None, None, {}
+
+    def _spawn(self, replica):
+        """Have the spawner fork a replica and attach to its pipes"""
+        with self._control_lock:
+            self._control.send((replica.index, replica.cores, replica.threads))
+            pid = self._control.recv()
+            requests = connection.Connection(reduction.recv_handle(self._control), readable=False)
+            results = connection.Connection(reduction.recv_handle(self._control), writable=False)
+        with self._lock:
+            replica.pid, replica.requests, replica.results = pid, requests, results
+
+    def stop(self, timeout=5):
+        if not self._started:
+            return
+        self._started = False
+        self._stopping.set()
+        if self._collector is not None:
+            self._collector.join(timeout)
+        self._shutdown()
+        self._fail_pending(self._replicas, RuntimeError("TTS executor stopped"))
+
+    def _shutdown(self):
+        for replica in self._replicas:
+            with self._lock:
+                requests, results = replica.requests, replica.results
+                replica.requests = replica.results = None
+            if requests is not None:
+                try:
+                    requests.send(None)
+                except OSError:
+                    pass
+                requests.close()
+            if results is not None:
+                results.close()
+        if self._control is not None:
+            try:
+                self._control.send(None)
+            except OSError:
+                pass
+            self._control.close()
+            self._control = None
+        if self._spawner is not None:
+            self._spawner.join(5)
+            self._spawner = None
+
+    def submit(self, text, speaker, sample_rate, put_accent=True, put_yo=True, timeout=None):
+        """Run one synthesis on the least-loaded replica and block until its audio is ready (or timeout)"""
+        if not self._started:
+            raise RuntimeError("TTS executor not started; call start() before this process starts threads")
+        future = Future()
+        with self._lock:
+            replica = min(self._replicas, key=lambda r: (r.requests is None, len(r.pending), r.index))
+            if replica.requests is None:
+                raise RuntimeError("No TTS replica is running")
+            request_id = next(self._ids)
+            replica.pending[request_id] = future
+            # Send under the lock so a restart cannot swap the pipe between registering and sending
+            try:
+                replica.requests.send((request_id, text, speaker, int(sample_rate), bool(put_accent), bool(put_yo)))
+            except OSError:
+                del replica.pending[request_id]
+                raise RuntimeError(f"TTS replica {replica.index} exited") from None
+        return future.result(self.request_timeout if timeout is None else timeout)
+
+    def _collect(self):
+        """Resolve futures as replicas answer; restart any replica whose result pipe closed"""
+        while not self._stopping.is_set():
+            with self._lock:
+                replicas = {replica.results: replica for replica in self._replicas if replica.results is not None}
+            for results in connection.wait(list(replicas), timeout=self.check_interval):
+                replica = replicas[results]
+                try:
+                    request_id, status, payload, seconds = results.recv()
+                except (EOFError, OSError):
+                    if not self._stopping.is_set():
+                        self._restart(replica)
+                    continue
+                if status == 'ready':
+                    continue
+                with self._lock:
+                    future = replica.pending.pop(request_id, None)
+                    replica.busy_seconds += seconds
+                    replica.completed += status == 'ok'
+                    replica.failed += status != 'ok'
+                if future is None:
+                    continue
+                if status == 'ok':
+                    future.set_result(payload)
+                else:
+                    future.set_exception(RuntimeError(payload))
+
+    def _restart(self, replica):
+        print(f"⚠️ TTS replica {replica.index} (pid {replica.pid}) exited, restarting")
+        # Detach the dead pipes and take its pending requests in one step, so none lands in between
+        with self._lock:
+            futures = list(replica.pending.values())
+            replica.pending = {}
+            dead = (replica.requests, replica.results)
+            replica.pid = replica.requests = replica.results = None
+            replica.restarts += 1
+        for conn in dead:
+            conn.close()
+        for future in futures:
+            if not future.done():
+                future.set_exception(RuntimeError(f"TTS replica {replica.index} exited"))
+        try:
+            self._spawn(replica)
+        except Exception as e:
+            print(f"❌ TTS replica {replica.index} could not be restarted: {e}")
+
+    def _fail_pending(self, replicas, error):
+        with self._lock:
+            futures = [future for replica in replicas for future in replica.pending.values()]
+            for replica in replicas:
+                replica.pending = {}
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            replicas = [{
+                'index': replica.index,
+                'pid': replica.pid,
+                'cores': replica.cores,
+                'threads': replica.threads,
+                'outstanding': len(replica.pending),
+                'completed': replica.completed,
+                'failed': replica.failed,
+                'restarts': replica.restarts,
+                'utilization': round(replica.busy_seconds / (now - replica.started_at), 3) if replica.started_at else None,
+            } for replica in self._replicas]
+        return {
+            'started': self._started,
+            'replicas': replicas,
+            'threads_per_replica': self.threads_per_replica,
+            # One request per replica is running; the rest are waiting
+            'queue_depth': sum(max(0, replica['outstanding'] - 1) for replica in replicas),
+            'in_flight': sum(min(1, replica['outstanding']) for replica in replicas),
+        }
@@ -0,0 +1,175 @@
+"""Opt-in optimized CPU inference for the Silero TTS model.
+
+The Silero package wraps its network in a plain Python object. optimize_model()
+finds the torch modules inside and applies the cheapest CPU speed-up each
+one allows:
+
+- eager nn.Module: dynamic int8 quantization of its Linear/LSTM/GRU layers
+- TorchScript module: torch.jit.freeze (constants folded, attributes inlined),
+  then optimize_for_inference
+
+Any step the model does not support is skipped, and the original module is
+kept. Only the applied steps are reported. The first apply_tts call also
+pays for lazy initialization (graph profiling, allocator warm-up) per
+speaker, so warm_up_speakers() runs one synthesis for each configured
+speaker before traffic arrives.
+
+    TTS_OPTIMIZE=auto|quantize|freeze     # 0 (default) leaves the model untouched
+    TTS_WARMUP_SPEAKERS=en_10,en_21
+
+Compare quality and speed against the unmodified model with:
+
+    python tts_optimize.py report [--mode auto] [--speakers en_10 en_21]
+"""
+import argparse
+import time
+
+import numpy as np
+
+OPTIMIZE_MODES = ('0', 'auto', 'quantize', 'freeze')
+
+REPORT_TEXTS = [
+    "Hello! Welcome to your interview.",
+    "Thank you for sharing that. What would you say is the most challenging aspect?",
+    "Can you explain the difference between a process and a thread?",
+]
+
+
+def _inner_modules(model):
+    """(attribute name, module) for each torch module held directly by the Silero wrapper"""
+    import torch
+
+    if isinstance(model, torch.nn.Module):
+        return [(None, model)]
+    return [(name, value) for name, value in vars(model).items() if isinstance(value, torch.nn.Module)]
+
+
+def _optimize_module(module, mode):
+    """Return (module, step name) for the first step that applies, or (module, None)"""
+    import torch
+
+    module.eval()
+    if isinstance(module, torch.jit.ScriptModule):
+        if mode in ('auto', 'freeze'):
+            try:
+                frozen = torch.jit.freeze(module)
+                try:
+                    return torch.jit.optimize_for_inference(frozen), 'freeze+optimize_for_inference'
+                except Exception:
+                    return frozen, 'freeze'
+            except Exception as e:
+                print(f"⚠️ TorchScript freeze not applicable: {e}")
+        return module, None
+    if mode in ('auto', 'quantize'):
+        try:
+            quantized = torch.quantization.quantize_dynamic(module, {torch.nn.Linear, torch.nn.LSTM, torch.nn.GRU}, dtype=torch.qint8)
+            return quantized, 'quantize_dynamic_int8'
+        except Exception as e:
+            print(f"⚠️ Dynamic quantization not applicable: {e}")
+    return module, None
+
+
+def optimize_model(model, mode='auto'):
+    """Optimize the Silero model in place where it allows it; returns (model, applied steps)"""
+    if mode in (None, '', '0'):
+        return model, []
+    if mode not in OPTIMIZE_MODES:
+        raise ValueError(f"Unknown TTS_OPTIMIZE mode '{mode}', expected one of {list(OPTIMIZE_MODES)}")
+
+    applied = []
+    for name, module in _inner_modules(model):
+        optimized, step = _optimize_module(module, mode)
+        if step is None:
+            continue
+        if name is None:
+            model = optimized
+        else:
+            setattr(model, name, optimized)
+        applied.append(f"{name or 'model'}:{step}")
+    return model, applied
+
+
+def warm_up_speakers(synthesize, speakers, text=REPORT_TEXTS[0], sample_rate=24000):
+    """Run one synthesis per speaker; returns {speaker: seconds}"""
+    timings = {}
+    for speaker in speakers:
+        start = time.time()
+        synthesize(text, speaker, sample_rate)
+        timings[speaker] = round(time.time() - start, 3)
+    return timings
+
+
+def compare_outputs(baseline, candidate):
+    """Length difference, max absolute difference and signal-to-noise ratio (dB) of candidate vs baseline"""
+    baseline = np.asarray(baseline, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    overlap = min(len(baseline), len(candidate))
+    error = baseline[:overlap] - candidate[:overlap]
+    noise = float(np.mean(error ** 2)) if overlap else 0.0
+    signal = float(np.mean(baseline[:overlap] ** 2)) if overlap else 0.0
+    return {
+        'length_diff': len(candidate) - len(baseline),
+        'max_abs_diff': float(np.max(np.abs(error))) if overlap else 0.0,
+        'snr_db': round(float(10 * np.log10(signal / noise)), 1) if noise > 0 else float('inf'),
+    }
+
+
+def _synthesize(model, text, speaker, sample_rate):
+    import torch
+
+    with torch.inference_mode():
+        audio = model.apply_tts(text=text, speaker=speaker, sample_rate=sample_rate, put_accent=True, put_yo=True)
+    return audio.detach().cpu().numpy() if hasattr(audio, 'detach') else np.asarray(audio)
+
+
+def _real_time_factor(model, texts, speaker, sample_rate, repeats):
+    """Best-of-repeats synthesis time over audio duration, plus the last outputs"""
+    outputs, best = [], None
+    for _ in range(repeats):
+        start = time.time()
+        outputs = [_synthesize(model, text, speaker, sample_rate) for text in texts]
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    audio_seconds = sum(len(audio) for audio in outputs) / sample_rate
+    return best / audio_seconds, outputs
+
+
+def report(mode, speakers, sample_rate, repeats):
+    """Print real-time factor and output difference of the optimized model against the baseline"""
+    from model_store import load_tts_model
+
+    print("🔄 Loading baseline and optimized copies of the Silero model...")
+    baseline = load_tts_model("v3_en")
+    optimized, applied = optimize_model(load_tts_model("v3_en"), mode)
+    print(f"🔧 Applied: {', '.join(applied) or 'nothing (model allows none of the steps)'}")
+
+    for label, model in (("baseline", baseline), ("optimized", optimized)):
+        timings = warm_up_speakers(lambda text, speaker, rate: _synthesize(model, text, speaker, rate),
+                                   speakers, sample_rate=sample_rate)
+        print(f"🔥 {label} warm-up: {timings}")
+
+    print(f"\n{'speaker':<10} {'baseline RTF':>13} {'optimized RTF':>14} {'speed-up':>9} "
+          f"{'max |diff|':>11} {'SNR dB':>8} {'len diff':>9}")
+    for speaker in speakers:
+        base_rtf, base_audio = _real_time_factor(baseline, REPORT_TEXTS, speaker, sample_rate, repeats)
+        opt_rtf, opt_audio = _real_time_factor(optimized, REPORT_TEXTS, speaker, sample_rate, repeats)
+        diffs = [compare_outputs(b, o) for b, o in zip(base_audio, opt_audio)]
+        print(f"{speaker:<10} {base_rtf:>13.3f} {opt_rtf:>14.3f} {base_rtf / opt_rtf:>8.2f}x "
+              f"{max(d['max_abs_diff'] for d in diffs):>11.4f} {min(d['snr_db'] for d in diffs):>8.1f} "
+              f"{max(abs(d['length_diff']) for d in diffs):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Optimized CPU inference for Silero TTS')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    report_parser = subparsers.add_parser('report', help='Compare real-time factor and output against the baseline')
+    report_parser.add_argument('--mode', choices=OPTIMIZE_MODES[1:], default='auto')
+    report_parser.add_argument('--speakers', nargs='+', default=['en_10'])
+    report_parser.add_argument('--sample-rate', type=int, default=24000)
+    report_parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    report(args.mode, args.speakers, args.sample_rate, args.repeats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Sentence-pipelined TTS: speak sentence 1 while sentence 2 is still being synthesized."""
+import queue
+import re
+import threading
+import time
+
+from tts_audio import silence_pcm16, wav_header
+
+# Split on whitespace after ., ! or ? (optionally followed by a closing quote/bracket)
+_SENTENCE_BOUNDARY = re.compile(r'(?:(?<=[.!?])|(?<=[.!?]["\')\]]))\s+')
+
+# Silero handles up to ~1000 characters per call; keep pipeline units well below that
+MAX_SENTENCE_CHARS = 400
+
+
+def split_sentences(text, max_chars=MAX_SENTENCE_CHARS):
+    """Split text into sentence-sized pieces suitable for one apply_tts call each"""
+    pieces = []
+    for sentence in _SENTENCE_BOUNDARY.split(text.strip()):
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        # Break overly long sentences at commas/semicolons, then at word boundaries
+        while len(sentence) > max_chars:
+            cut = max(sentence.rfind(", ", 0, max_chars), sentence.rfind("; ", 0, max_chars))
+            if cut <= 0:
+                cut = sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(sentence[:cut + 1].strip())
+            sentence = sentence[cut + 1:].strip()
+        if sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+class PipelineStats:
+    """Running time-to-first-audio and total-time figures for pipelined requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.sentences = 0
+        self.total_ttfa_ms = 0.0
+        self.total_time_ms = 0.0
+        self.last = None
+
+    def record(self, sentences, ttfa_ms, total_ms):
+        with self._lock:
+            self.requests += 1
+            self.sentences += sentences
+            self.total_ttfa_ms += ttfa_ms
+            self.total_time_ms += total_ms
+            self.last = {'sentences': sentences, 'ttfa_ms': ttfa_ms, 'total_ms': total_ms}
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'sentences': self.sentences,
+                'avg_ttfa_ms': round(self.total_ttfa_ms / self.requests, 1) if self.requests else None,
+                'avg_total_ms': round(self.total_time_ms / self.requests, 1) if self.requests else None,
+                'last': self.last,
+            }
+
+
+class PipelineError(RuntimeError):
+    """A sentence failed to synthesize; raised to the consumer of iter_pipelined_wav"""
+
+
+def iter_pipelined_wav(sentences, synthesize, sample_rate, stats=None, prefetch=2, gap_ms=120):
+    """Yield a streamed WAV: header, then each sentence's PCM as soon as it is ready.
+
+    `synthesize(sentence)` must return PCM16 bytes. A producer thread runs up to
+    `prefetch` sentences ahead of the consumer, so synthesis of sentence N+1
+    overlaps with sending sentence N. Closing the generator (client disconnect)
+    stops the producer after its current sentence. A synthesis failure is
+    raised from the generator as PipelineError.
+    """
+    start_time = time.time()
+    ready = queue.Queue(maxsize=max(1, prefetch))
+    cancelled = threading.Event()
+    done = object()
+
+    def put(item):
+        """Wait for queue space, giving up only once the consumer has gone away"""
+        while not cancelled.is_set():
+            try:
+                ready.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def produce():
+        try:
+            for sentence in sentences:
+                if cancelled.is_set():
+                    return
+                put(synthesize(sentence))
+        except Exception as e:
+            print(f"❌ Pipelined TTS error: {e}")
+            put(PipelineError(e))
+        finally:
+            put(done)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    gap = silence_pcm16(sample_rate, gap_ms)
+    ttfa_ms = None
+    sent = 0
+    try:
+        yield wav_header(sample_rate)
+        while True:
+            pcm = ready.get()
+            if pcm is done:
+                break
+            if isinstance(pcm, PipelineError):
+                # Fail the response instead of ending it as if the audio were complete
+                raise pcm
+            if ttfa_ms is None:
+                ttfa_ms = round((time.time() - start_time) * 1000, 1)
+            elif gap:
+                yield gap
+            sent += 1
+            yield pcm
+    finally:
+        cancelled.set()
+        total_ms = round((time.time() - start_time) * 1000, 1)
+        if stats is not None and ttfa_ms is not None:
+            stats.record(sent, ttfa_ms, total_ms)
+        print(f"🔊 Pipelined TTS: {sent}/{len(sentences)} sentences, first audio {ttfa_ms} ms, total {total_ms} ms")
@@ -0,0 +1,216 @@
+"""Background pre-synthesis of the texts an interview is likely to speak.
+
+The greeting is fixed as soon as /api/start-interview returns, and the card's
+prepared questions usually come back in the interviewer's later messages,
+verbatim or wrapped in a short lead-in. SessionAudioPrefetcher queues one
+low-priority synthesis per such text when the session starts, and keeps the
+audio in a per-session cache. The queue only runs while no foreground /tts
+synthesis is in flight, so prefetching uses the idle CPU between turns.
+
+lookup() then splits a message into prepared and unprepared parts. A
+message that equals a prepared text is served as is. A message that contains
+one only needs its lead-in and tail synthesized. If the prepared text is
+still being synthesized in the background, audio() waits for it instead of
+starting the same synthesis a second time. If it is still queued, the caller
+claims it and synthesizes it right away.
+
+Per-session audio is bounded by total bytes and evicted least recently used
+first.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+_WHITESPACE = re.compile(r'\s+')
+# A lead-in or tail made only of punctuation is dropped instead of synthesized
+_SPOKEN = re.compile(r'\w')
+
+
+def normalize_text(text):
+    return _WHITESPACE.sub(' ', text or '').strip()
+
+
+class _Entry:
+    __slots__ = ('session_id', 'text', 'future', 'claimed')
+
+    def __init__(self, session_id, text):
+        self.session_id = session_id
+        self.text = text
+        self.future = Future()
+        self.claimed = False
+
+
+class _SessionAudio:
+    def __init__(self, speaker, sample_rate):
+        self.speaker = speaker
+        self.sample_rate = sample_rate
+        self.entries = OrderedDict()  # normalized text -> _Entry, in scheduling order
+        self.bytes = 0
+
+
+class SessionAudioPrefetcher:
+    def __init__(self, synthesize_pcm, max_bytes=64 * 1024 * 1024, max_texts=20, wait_seconds=30):
+        """synthesize_pcm(text, speaker, sample_rate) -> PCM16 bytes"""
+        self.synthesize_pcm = synthesize_pcm
+        self.max_bytes = max_bytes
+        self.max_texts = max_texts
+        self.wait_seconds = wait_seconds
+
+        self._sessions = OrderedDict()
+        self._jobs = deque()              # _Entry, oldest session first
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._foreground = 0
+        self._bytes = 0
+        self._thread = None
+
+        self.synthesized = 0
+        self.synthesis_seconds = 0.0
+        self.hits = {'exact': 0, 'contains': 0}
+        self.misses = 0
+        self.claimed = 0
+        self.failures = 0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='tts-prefetch', daemon=True)
+            self._thread.start()
+        return self
+
+    def after_fork(self):
+        """Start over in a forked worker: the parent's thread and queued jobs do not carry over"""
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._sessions, self._jobs, self._foreground, self._bytes = OrderedDict(), deque(), 0, 0
+        self._thread = None
+        return self.start()
+
+    def schedule(self, session_id, texts, speaker, sample_rate):
+        """Queue background synthesis of texts (greeting first, then questions) for a session"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or (session.speaker, session.sample_rate) != (speaker, sample_rate):
+                session = self._sessions[session_id] = _SessionAudio(speaker, sample_rate)
+            self._sessions.move_to_end(session_id)
+            queued = 0
+            for text in texts:
+                key = normalize_text(text)
+                if not key or key in session.entries or len(session.entries) >= self.max_texts:
+                    continue
+                entry = session.entries[key] = _Entry(session_id, key)
+                self._jobs.append(entry)
+                queued += 1
+            self._idle.notify()
+            return queued
+
+    def forget(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._bytes -= session.bytes
+
+    @contextmanager
+    def foreground(self):
+        """Mark a foreground synthesis; background jobs wait until none is running"""
+        with self._lock:
+            self._foreground += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._foreground -= 1
+                self._idle.notify()
+
+    def lookup(self, session_id, text, speaker, sample_rate):
+        """Split text into [(segment, entry or None)] around the longest prepared text it contains.
+
+        Returns None when the session has nothing prepared in text for this voice.
+        """
+        key = normalize_text(text)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or (session.speaker, session.sample_rate) != (speaker, sample_rate):
+                self.misses += session is not None
+                return None
+            self._sessions.move_to_end(session_id)
+            entry = session.entries.get(key)
+            if entry is not None:
+                self.hits['exact'] += 1
+                return [(key, entry)]
+            contained = [e for prepared, e in session.entries.items() if prepared in key]
+            if not contained:
+                self.misses += 1
+                return None
+            entry = max(contained, key=lambda e: len(e.text))
+            self.hits['contains'] += 1
+
+        start = key.index(entry.text)
+        segments = [(key[:start].strip(), None), (entry.text, entry), (key[start + len(entry.text):].strip(), None)]
+        return [(segment, e) for segment, e in segments if e is not None or _SPOKEN.search(segment)]
+
+    def audio(self, entry, speaker, sample_rate):
+        """PCM for a prepared entry: finished audio, the running job's result, or synthesized here if still queued"""
+        with self._lock:
+            claim = not entry.claimed
+            entry.claimed = True
+            self.claimed += claim
+        if claim:
+            # Still queued: take it over instead of waiting behind other sessions' jobs
+            self._synthesize(entry, speaker, sample_rate)
+        return entry.future.result(self.wait_seconds)
+
+    def _synthesize(self, entry, speaker, sample_rate):
+        start = time.time()
+        try:
+            pcm = self.synthesize_pcm(entry.text, speaker, sample_rate)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            entry.future.set_exception(e)
+            return
+        with self._lock:
+            self.synthesized += 1
+            self.synthesis_seconds += time.time() - start
+            session = self._sessions.get(entry.session_id)
+            if session is not None and session.entries.get(entry.text) is entry:
+                session.bytes += len(pcm)
+                self._bytes += len(pcm)
+                self._evict()
+        entry.future.set_result(pcm)
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            _, session = self._sessions.popitem(last=False)
+            self._bytes -= session.bytes
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._jobs or self._foreground:
+                    self._idle.wait()
+                entry = self._jobs.popleft()
+                session = self._sessions.get(entry.session_id)
+                if session is None or entry.claimed:
+                    continue  # evicted, or a /tts request took it over
+                entry.claimed = True
+                speaker, sample_rate = session.speaker, session.sample_rate
+            self._synthesize(entry, speaker, sample_rate)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'queued': len(self._jobs),
+                'foreground_in_flight': self._foreground,
+                'synthesized': self.synthesized,
+                'avg_synthesis_ms': round(self.synthesis_seconds / self.synthesized * 1000, 1) if self.synthesized else None,
+                'hits': dict(self.hits),
+                'misses': self.misses,
+                'claimed_by_requests': self.claimed,
+                'failures': self.failures,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,139 @@
+"""Frame-level voice activity detection and end-of-speech endpointing.
+
+Runs inline on every audio chunk handed to the recognizer, so no extra thread
+polls for silence. Each chunk is split into 20 ms frames and classified by RMS
+energy against an adaptive noise floor. An utterance ends once the trailing
+silence exceeds a hangover time that adapts to the speaker: the pauses they
+make mid-answer are recorded and the hangover tracks their upper percentile,
+so fast talkers are cut off sooner and deliberate speakers are not cut off
+while thinking.
+"""
+import threading
+from collections import deque
+
+import numpy as np
+
+FRAME_MS = 20
+
+END_OF_SPEECH = 'end_of_speech'
+NO_SPEECH = 'no_speech'
+MAX_DURATION = 'max_duration'
+
+
+class PauseStats:
+    """Rolling record of one speaker's mid-utterance pauses, used to size the hangover"""
+
+    def __init__(self, default_hangover=1.2, min_hangover=0.6, max_hangover=2.5,
+                 percentile=90, margin=0.25, min_samples=5, window=50):
+        self.default_hangover = default_hangover
+        self.min_hangover = min_hangover
+        self.max_hangover = max_hangover
+        self.percentile = percentile
+        self.margin = margin
+        self.min_samples = min_samples
+        self._pauses = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._pauses.append(seconds)
+
+    def hangover(self):
+        with self._lock:
+            pauses = list(self._pauses)
+        if len(pauses) < self.min_samples:
+            return self.default_hangover
+        value = float(np.percentile(pauses, self.percentile)) + self.margin
+        return min(self.max_hangover, max(self.min_hangover, value))
+
+    def snapshot(self):
+        with self._lock:
+            count = len(self._pauses)
+        return {'pauses': count, 'hangover_seconds': round(self.hangover(), 3)}
+
+
+class EnergyVAD:
+    """Classifies PCM16 frames as speech or silence against an adaptive noise floor"""
+
+    def __init__(self, sample_rate, min_energy=300.0, noise_ratio=3.0, noise_adapt=0.05):
+        self.frame_samples = sample_rate * FRAME_MS // 1000
+        self.min_energy = min_energy
+        self.noise_ratio = noise_ratio
+        self.noise_adapt = noise_adapt
+        self.noise_floor = None
+        self._pending = np.zeros(0, dtype=np.int16)
+
+    def frames(self, chunk):
+        """Speech/silence flags for every complete frame in chunk (partial frames carry over)"""
+        samples = np.concatenate([self._pending, np.frombuffer(chunk, dtype=np.int16)])
+        count = len(samples) // self.frame_samples
+        self._pending = samples[count * self.frame_samples:]
+        if not count:
+            return []
+        frames = samples[:count * self.frame_samples].reshape(count, self.frame_samples).astype(np.float32)
+        energies = np.sqrt(np.mean(frames ** 2, axis=1))
+
+        flags = []
+        for energy in energies:
+            if self.noise_floor is None:
+                self.noise_floor = min(energy, self.min_energy)
+            is_speech = energy >= max(self.min_energy, self.noise_floor * self.noise_ratio)
+            if not is_speech:
+                self.noise_floor += self.noise_adapt * (energy - self.noise_floor)
+            flags.append(is_speech)
+        return flags
+
+
+class Endpointer:
+    """Decides when a recognition should end, from the audio stream alone.
+
+    process() returns None while listening, or the reason to stop:
+    END_OF_SPEECH after speech followed by the speaker's hangover of silence,
+    NO_SPEECH when nothing was said within no_speech_timeout, and
+    MAX_DURATION once max_duration seconds of audio have been received.
+    """
+
+    def __init__(self, sample_rate, pause_stats, no_speech_timeout=5.0, max_duration=30.0,
+                 min_speech_ms=60, min_pause_ms=150):
+        self.vad = EnergyVAD(sample_rate)
+        self.pause_stats = pause_stats
+        self.no_speech_timeout = no_speech_timeout
+        self.max_duration = max_duration
+        self.min_speech_frames = max(1, min_speech_ms // FRAME_MS)
+        self.min_pause_frames = max(1, min_pause_ms // FRAME_MS)
+        self.hangover_frames = self._hangover_frames()
+
+        self.frames_seen = 0
+        self.speech_started = False
+        self._voiced_run = 0
+        self._silent_run = 0
+
+    def _hangover_frames(self):
+        return int(self.pause_stats.hangover() * 1000) // FRAME_MS
+
+    @property
+    def audio_seconds(self):
+        return self.frames_seen * FRAME_MS / 1000.0
+
+    def process(self, chunk):
+        for is_speech in self.vad.frames(chunk):
+            self.frames_seen += 1
+            if is_speech:
+                self._voiced_run += 1
+                if self._voiced_run >= self.min_speech_frames:
+                    if self.speech_started and self._silent_run >= self.min_pause_frames:
+                        # Speaker resumed after a pause - learn from it
+                        self.pause_stats.record(self._silent_run * FRAME_MS / 1000.0)
+                        self.hangover_frames = self._hangover_frames()
+                    self.speech_started = True
+                    self._silent_run = 0
+            else:
+                self._voiced_run = 0
+                self._silent_run += 1
+                if self.speech_started and self._silent_run >= self.hangover_frames:
+                    return END_OF_SPEECH
+                if not self.speech_started and self.audio_seconds >= self.no_speech_timeout:
+                    return NO_SPEECH
+            if self.audio_seconds >= self.max_duration:
+                return MAX_DURATION
+        return None